@@ -0,0 +1,77 @@
+import argparse
+import time
+import numpy as np
+import torch  # type: ignore
+from src.ai.agent import create_search
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.res_net import ResNet, model_sizes
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+
+
+def benchmark(
+    mode: str, workers: int, num_searches: int, repeats: int, model: ResNet
+) -> float:
+    """Simulations per second of ``mode`` searches of the opening position."""
+    helper = AIGameStateTransitionHelper()
+    args = {
+        **AI_ARGS,
+        "num_searches": num_searches,
+        "parallel_mode": None if mode == "single" else mode,
+        "search_workers": workers,
+    }
+    search = create_search(args, helper, model)
+    state = helper.get_initial_state(GameState())
+    # the first search also starts the worker processes
+    search.search(state.copy())
+    start = time.perf_counter()
+    for _ in range(repeats):
+        search.search(state.copy())
+    elapsed = time.perf_counter() - start
+    if hasattr(search, "close"):
+        search.close()
+    # root parallel searches ceil(num_searches / workers) per worker
+    simulations = num_searches
+    if mode == "root":
+        simulations = -(-num_searches // workers) * workers
+    return simulations * repeats / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report MCTS simulations per second as the worker count grows."
+    )
+    parser.add_argument(
+        "--mode", choices=("single", "root", "tree"), default="root", help="Search."
+    )
+    parser.add_argument(
+        "--workers", type=str, default="1,2,4,8", help="Comma separated counts."
+    )
+    parser.add_argument("--searches", type=int, default=400, help="Per move.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed searches.")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Defaults to a random network of 9 blocks of 128 channels.",
+    )
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    np.random.seed(0)
+    state_dict = torch.load(args.model, map_location="cpu") if args.model else None
+    sizes = model_sizes(state_dict) if state_dict is not None else (9, 128)
+    model = ResNet(AIGameStateTransitionHelper(), *sizes, torch.device("cpu"))
+    if state_dict is not None:
+        model.load_state_dict(state_dict)
+    model.eval()
+    baseline = None
+    print(f"{'workers':>8} {'sims/sec':>10} {'speedup':>8}")
+    for workers in [int(count) for count in args.workers.split(",")]:
+        rate = benchmark(args.mode, workers, args.searches, args.repeats, model)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.model_export import (
+    ExportedModel,
+    export_onnx,
+    export_torchscript,
+    parity_report,
+    sample_positions,
+)
+from src.ai.res_net import ResNet, model_sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export model.pt to TorchScript and/or ONNX with Conv+BN fused."
+    )
+    parser.add_argument("model", type=str, help="Path of the model.pt state_dict.")
+    parser.add_argument(
+        "--format",
+        choices=("torchscript", "onnx", "both"),
+        default="torchscript",
+        help="Artifacts to write.",
+    )
+    parser.add_argument(
+        "--output-dir", type=str, default=None, help="Defaults to the model's."
+    )
+    parser.add_argument(
+        "--positions", type=int, default=512, help="Positions of the parity check."
+    )
+    args = parser.parse_args()
+
+    helper = AIGameStateTransitionHelper()
+    state_dict = torch.load(args.model, map_location="cpu")
+    model = ResNet(helper, *model_sizes(state_dict), torch.device("cpu"))
+    model.load_state_dict(state_dict)
+    model.eval()
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.model))
+    name = os.path.splitext(os.path.basename(args.model))[0]
+    positions = sample_positions(args.positions)
+
+    formats = ("torchscript", "onnx") if args.format == "both" else (args.format,)
+    for backend in formats:
+        if backend == "torchscript":
+            path = os.path.join(output_dir, f"{name}.ts")
+            export_torchscript(model, path)
+        else:
+            path = os.path.join(output_dir, f"{name}.onnx")
+            export_onnx(model, path)
+        print(f"Wrote {path}")
+        report = parity_report(model, ExportedModel(backend, path), positions)
+        for key, value in report.items():
+            print(f"  {key}: {value:.6g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.model_export import (
+    ExportedModel,
+    example_input,
+    parity_report,
+    sample_positions,
+)
+from src.ai.quantization import (
+    QUANTIZATION_MODES,
+    load_calibration_planes,
+    quantize_model,
+    save_quantized,
+)
+from src.ai.res_net import ResNet, model_sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Quantize model.pt to an int8 TorchScript artifact."
+    )
+    parser.add_argument("model", type=str, help="Path of the model.pt state_dict.")
+    parser.add_argument(
+        "--mode", choices=QUANTIZATION_MODES, default="static", help="Quantization."
+    )
+    parser.add_argument(
+        "--calibration",
+        type=str,
+        default=None,
+        help="Stored positions (.npy or .npz), else positions of random games.",
+    )
+    parser.add_argument(
+        "--output", type=str, default=None, help="Defaults to model.int8.ts."
+    )
+    parser.add_argument(
+        "--positions", type=int, default=512, help="Positions of the accuracy check."
+    )
+    args = parser.parse_args()
+
+    helper = AIGameStateTransitionHelper()
+    state_dict = torch.load(args.model, map_location="cpu")
+    model = ResNet(helper, *model_sizes(state_dict), torch.device("cpu"))
+    model.load_state_dict(state_dict)
+    model.eval()
+    output = args.output or f"{os.path.splitext(args.model)[0]}.int8.ts"
+    if args.calibration:
+        calibration_planes = load_calibration_planes(args.calibration, helper)
+    else:
+        # seeded apart from the accuracy check positions
+        calibration_states = sample_positions(args.positions, seed=1)
+        calibration_planes = helper.get_encoded_states(calibration_states)
+
+    quantized = quantize_model(model, args.mode, calibration_planes)
+    save_quantized(quantized, example_input(model), output)
+    print(f"Wrote {output}")
+    report = parity_report(
+        model, ExportedModel("torchscript", output), sample_positions(args.positions)
+    )
+    for key, value in report.items():
+        print(f"  {key}: {value:.6g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import time
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.model_export import BACKENDS, ExportedModel, InferenceModel
+from src.ai.res_net import ResNet, model_sizes
+from src.ai.search_pool import create_search_pool, worker_count
+from src.ai.self_play import ShardWriter, play_games
+from src.ai.vectorized_self_play import play_lockstep_games
+from src.config.settings import AI_ARGS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate self-play training data as .npz shards and a manifest."
+    )
+    parser.add_argument("output_dir", type=str, help="Directory of the shards.")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Defaults to a random network of 9 blocks of 128 channels.",
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="eager", help="Model format."
+    )
+    parser.add_argument("--games", type=int, default=100, help="Games to play.")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Processes, 0 for every core."
+    )
+    parser.add_argument("--searches", type=int, default=200, help="Per move.")
+    parser.add_argument(
+        "--temperature-moves", type=int, default=16, help="Sampled opening moves."
+    )
+    parser.add_argument(
+        "--lockstep",
+        type=int,
+        default=0,
+        help="Games each worker steps together, batching their network calls.",
+    )
+    parser.add_argument(
+        "--shard-size", type=int, default=16384, help="Positions per shard."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game.")
+    args = parser.parse_args()
+
+    model: InferenceModel
+    if args.backend == "eager":
+        torch.manual_seed(args.seed)
+        state_dict = torch.load(args.model, map_location="cpu") if args.model else None
+        # the sizes of the weights, else those train.py defaults to
+        sizes = model_sizes(state_dict) if state_dict is not None else (9, 128)
+        model = ResNet(AIGameStateTransitionHelper(), *sizes, torch.device("cpu"))
+        if state_dict is not None:
+            model.load_state_dict(state_dict)
+        model.eval()
+    else:
+        model = ExportedModel(args.backend, args.model)
+    search_args = {
+        **AI_ARGS,
+        "num_searches": args.searches,
+        "search_workers": args.workers,
+    }
+    writer = ShardWriter(
+        args.output_dir,
+        args.shard_size,
+        {"model": args.model, "num_searches": args.searches},
+    )
+    workers = worker_count(search_args)
+    start = time.perf_counter()
+    with create_search_pool(search_args, model, workers) as pool:
+        if args.lockstep > 0:
+            records = play_lockstep_games(
+                pool, args.games, args.lockstep, args.temperature_moves, args.seed
+            )
+        else:
+            records = play_games(pool, args.games, args.temperature_moves, args.seed)
+        for game, record in enumerate(records, 1):
+            writer.add(record)
+            positions = writer.manifest["positions"] + writer.pending_positions
+            elapsed = time.perf_counter() - start
+            print(
+                f"game {game}/{args.games}: {len(record[0])} positions, "
+                f"{positions} in total, {game / elapsed * 3600:.0f} games/hour"
+            )
+    manifest = writer.close()
+    print(
+        f"Wrote {manifest['positions']} positions of {manifest['games']} games "
+        f"to {args.output_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import signal
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.inference_server import InferenceServer
+from src.ai.model_export import BACKENDS, ExportedModel, InferenceModel
+from src.ai.res_net import ResNet, model_sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve batched model evaluations to the agents of this machine."
+    )
+    parser.add_argument("model", type=str, help="model.pt or an exported artifact.")
+    parser.add_argument("address", type=str, help="Path of the Unix socket.")
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="eager", help="Model format."
+    )
+    parser.add_argument(
+        "--max-batch-size", type=int, default=64, help="States per forward pass."
+    )
+    parser.add_argument(
+        "--max-wait", type=float, default=0.002, help="Seconds a batch may wait."
+    )
+    args = parser.parse_args()
+
+    model: InferenceModel
+    if args.backend == "eager":
+        state_dict = torch.load(args.model, map_location="cpu")
+        model = ResNet(
+            AIGameStateTransitionHelper(),
+            *model_sizes(state_dict),
+            torch.device("cpu"),
+        )
+        model.load_state_dict(state_dict)
+        model.eval()
+    else:
+        model = ExportedModel(args.backend, args.model)
+    server = InferenceServer(
+        model, args.max_batch_size, args.max_wait, address=args.address
+    )
+    server.start()
+    print(f"Serving {args.model} on {args.address}, set AI_ARGS['inference_server']")
+    # blocked only now, so the server process does not inherit the mask
+    stop_signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+    signal.sigwait(stop_signals)
+    server.stop()
+    print(f"Mean batch size: {server.mean_batch_size():.2f}")
+
+
+if __name__ == "__main__":
+    main()
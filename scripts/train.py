@@ -0,0 +1,101 @@
+import argparse
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.res_net import ResNet
+from src.ai.training import (
+    ReplayBufferDataset,
+    create_data_loader,
+    format_metrics,
+    load_training_state,
+    train,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Train the network on the positions of a replay buffer."
+    )
+    parser.add_argument("buffer_dir", type=str, help="Replay buffer directory.")
+    parser.add_argument("output_dir", type=str, help="Directory of the checkpoints.")
+    parser.add_argument(
+        "--self-play",
+        type=str,
+        nargs="*",
+        default=[],
+        help="Self-play directories to add to the buffer first.",
+    )
+    parser.add_argument("--init", type=str, default=None, help="Weights to start from.")
+    parser.add_argument("--steps", type=int, default=10000, help="Optimizer steps.")
+    parser.add_argument("--batch-size", type=int, default=256, help="Per step.")
+    parser.add_argument("--lr", type=float, default=1e-3, help="Learning rate.")
+    parser.add_argument(
+        "--weight-decay", type=float, default=1e-4, help="AdamW weight decay."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="DataLoader worker processes."
+    )
+    parser.add_argument(
+        "--prefetch", type=int, default=4, help="Batches each worker prepares ahead."
+    )
+    parser.add_argument(
+        "--checkpoint-interval", type=int, default=1000, help="Steps per checkpoint."
+    )
+    parser.add_argument(
+        "--log-interval", type=int, default=100, help="Steps per logged loss."
+    )
+    parser.add_argument(
+        "--augment",
+        action="store_true",
+        help="Put every position under a random symmetry of the board.",
+    )
+    parser.add_argument(
+        "--bf16", action="store_true", help="bfloat16 autocast of the forward pass."
+    )
+    parser.add_argument("--blocks", type=int, default=9, help="Residual blocks.")
+    parser.add_argument("--hidden", type=int, default=128, help="Hidden channels.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sampling.")
+    args = parser.parse_args()
+
+    buffer = ReplayBuffer(args.buffer_dir)
+    for directory in args.self_play:
+        print(f"Added {buffer.add_self_play(directory)} positions of {directory}")
+    if len(buffer) == 0:
+        parser.error(f"{args.buffer_dir} holds no positions")
+
+    torch.manual_seed(args.seed)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = ResNet(AIGameStateTransitionHelper(), args.blocks, args.hidden, device)
+    if args.init:
+        model.load_state_dict(torch.load(args.init, map_location=device))
+    optimizer = torch.optim.AdamW(
+        model.parameters(), lr=args.lr, weight_decay=args.weight_decay
+    )
+    start_step = load_training_state(model, optimizer, args.output_dir)
+    if start_step:
+        print(f"Resuming from step {start_step}")
+    loader = create_data_loader(
+        ReplayBufferDataset(
+            args.buffer_dir, args.batch_size, args.seed, augment=args.augment
+        ),
+        args.workers,
+        args.prefetch,
+        device,
+    )
+    step = train(
+        model,
+        optimizer,
+        loader,
+        args.steps,
+        args.output_dir,
+        args.checkpoint_interval,
+        bfloat16=args.bf16,
+        start_step=start_step,
+        log_interval=args.log_interval,
+        on_metrics=lambda step, metrics: print(format_metrics(step, metrics)),
+    )
+    print(f"Trained to step {step}, latest weights in {args.output_dir}/model.pt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.checkpoints import publish_checkpoint
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.res_net import ResNet
+from src.ai.self_play_actors import SelfPlayActors
+from src.ai.training import (
+    ReplayBufferDataset,
+    create_data_loader,
+    format_metrics,
+    load_training_state,
+    train,
+)
+from src.config.settings import AI_ARGS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Self-play actors feeding a replay buffer while a learner trains on "
+            "it and publishes the checkpoints the actors play with."
+        )
+    )
+    parser.add_argument("buffer_dir", type=str, help="Replay buffer directory.")
+    parser.add_argument(
+        "output_dir",
+        type=str,
+        help="Directory of the checkpoints, which AI_ARGS['checkpoint_dir'] may watch.",
+    )
+    parser.add_argument("--init", type=str, default=None, help="Weights to start from.")
+    parser.add_argument("--actors", type=int, default=2, help="Self-play processes.")
+    parser.add_argument("--searches", type=int, default=200, help="Per move.")
+    parser.add_argument(
+        "--temperature-moves", type=int, default=16, help="Sampled opening moves."
+    )
+    parser.add_argument(
+        "--lockstep", type=int, default=0, help="Games each actor steps together."
+    )
+    parser.add_argument(
+        "--window", type=int, default=1_000_000, help="Newest positions sampled."
+    )
+    parser.add_argument(
+        "--min-positions",
+        type=int,
+        default=10000,
+        help="Positions in the buffer before training starts.",
+    )
+    parser.add_argument("--steps", type=int, default=100000, help="Optimizer steps.")
+    parser.add_argument(
+        "--publish-interval",
+        type=int,
+        default=500,
+        help="Steps per checkpoint published to the actors.",
+    )
+    parser.add_argument(
+        "--keep-checkpoints", type=int, default=20, help="Versions left on disk."
+    )
+    parser.add_argument("--batch-size", type=int, default=256, help="Per step.")
+    parser.add_argument("--lr", type=float, default=1e-3, help="Learning rate.")
+    parser.add_argument(
+        "--weight-decay", type=float, default=1e-4, help="AdamW weight decay."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="DataLoader worker processes."
+    )
+    parser.add_argument(
+        "--prefetch", type=int, default=4, help="Batches each worker prepares ahead."
+    )
+    parser.add_argument(
+        "--log-interval", type=int, default=100, help="Steps per logged loss."
+    )
+    parser.add_argument(
+        "--augment",
+        action="store_true",
+        help="Put every position under a random symmetry of the board.",
+    )
+    parser.add_argument(
+        "--bf16", action="store_true", help="bfloat16 autocast of the forward pass."
+    )
+    parser.add_argument("--blocks", type=int, default=9, help="Residual blocks.")
+    parser.add_argument("--hidden", type=int, default=128, help="Hidden channels.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the actors.")
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = ResNet(AIGameStateTransitionHelper(), args.blocks, args.hidden, device)
+    if args.init:
+        model.load_state_dict(torch.load(args.init, map_location=device))
+    optimizer = torch.optim.AdamW(
+        model.parameters(), lr=args.lr, weight_decay=args.weight_decay
+    )
+    start_step = load_training_state(model, optimizer, args.output_dir)
+    # the weights the actors start with
+    publish_checkpoint(model, args.output_dir, start_step, args.keep_checkpoints)
+
+    search_args = {
+        **AI_ARGS,
+        "num_searches": args.searches,
+        # one search per actor process
+        "parallel_mode": None,
+        "determinizations": 0,
+    }
+    buffer = ReplayBuffer(args.buffer_dir, args.window)
+    with SelfPlayActors(
+        search_args,
+        args.output_dir,
+        buffer,
+        args.actors,
+        args.temperature_moves,
+        args.lockstep,
+        args.seed,
+    ) as actors:
+        print(f"Waiting for {args.min_positions} positions")
+        actors.wait_for_positions(args.min_positions)
+        loader = create_data_loader(
+            ReplayBufferDataset(
+                args.buffer_dir, args.batch_size, args.seed, augment=args.augment
+            ),
+            args.workers,
+            args.prefetch,
+            device,
+        )
+        step = train(
+            model,
+            optimizer,
+            loader,
+            args.steps,
+            args.output_dir,
+            args.publish_interval,
+            bfloat16=args.bf16,
+            start_step=start_step,
+            log_interval=args.log_interval,
+            on_metrics=lambda step, metrics: print(format_metrics(step, metrics)),
+            keep_checkpoints=args.keep_checkpoints,
+        )
+        print(
+            f"Trained to step {step} on {actors.games} games, "
+            f"games per checkpoint version: {actors.versions}"
+        )
+
+
+if __name__ == "__main__":
+    main()
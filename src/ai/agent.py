@@ -1,31 +1,185 @@
+from typing import Any, Dict, Optional, Tuple, Union
 import torch  # type: ignore
 import numpy as np
+from src.ai.checkpoints import CheckpointWatcher
+from src.ai.compact_state import CompactState
+from src.ai.determinized_mcts import DeterminizedMCTS
+from src.ai.inference_client import InferenceClient
 from src.ai.mcts import MCTS
+from src.ai.model_export import BACKENDS, ExportedModel, InferenceModel
+from src.ai.parallel_mcts import RootParallelMCTS, TreeParallelMCTS
+from src.ai.search_tree import SearchTree
 from src.models.piece_action import PieceAction, PieceActionType
 from src.ai.piece_action_code import PIECE_ACTION_DECODE_ACTION
 from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
 from src.game_state import GameState
-from src.ai.res_net import ResNet
+from src.ai.res_net import ResNet, model_sizes
 from src.config.settings import AI_ARGS
 
 
+def same_public_position(state: np.ndarray, other: np.ndarray) -> bool:
+    """Whether two AI states agree on everything but the face-down identities."""
+    return (
+        np.array_equal(state[0], other[0])
+        and np.array_equal(state[2][0][:6], other[2][0][:6])
+        and np.array_equal(
+            np.where(state[0] == 100, 0, state[1]),
+            np.where(other[0] == 100, 0, other[1]),
+        )
+    )
+
+
+def create_search(
+    args: Dict[str, Any],
+    ai_game_state_transition_helper: AIGameStateTransitionHelper,
+    model: InferenceModel,
+) -> Union[MCTS, DeterminizedMCTS, RootParallelMCTS]:
+    """The search configured by ``args``: determinized, parallel or plain MCTS."""
+    if args.get("determinizations", 0) > 0:
+        return DeterminizedMCTS(args, ai_game_state_transition_helper, model)
+    match (args.get("parallel_mode")):
+        case "root":
+            return RootParallelMCTS(args, ai_game_state_transition_helper, model)
+        case "tree":
+            return TreeParallelMCTS(args, ai_game_state_transition_helper, model)
+    return MCTS(args, ai_game_state_transition_helper, model)
+
+
 class Agent:
-    def __init__(self, ai_model_path: str) -> None:
+    def __init__(self, ai_model_path: str, backend: Optional[str] = None) -> None:
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.ai_game_state_transition_helper = AIGameStateTransitionHelper()
-        self.model = ResNet(self.ai_game_state_transition_helper, 9, 128, self.device)
-        self.mcts: MCTS
+        # "eager" loads a state_dict into ResNet, "torchscript" and "onnx" load
+        # an artifact written by scripts/export_model.py
+        self.backend = backend or str(AI_ARGS.get("inference_backend", "eager"))
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {self.backend}")
+        self.model: InferenceModel
+        self.mcts: Union[MCTS, DeterminizedMCTS, RootParallelMCTS]
+        # subtree of the last chosen action and the state it stands for,
+        # searched again from the opponent's reply when it is in the tree
+        self.search_root: Optional[Tuple[SearchTree, int]] = None
+        self.search_root_state: Optional[CompactState] = None
+        # newer weights of AI_ARGS["checkpoint_dir"], taken up by reload_model
+        self.checkpoint_watcher: Optional[CheckpointWatcher] = None
         self.initialization(ai_model_path)
 
     def initialization(self, ai_model_path: str) -> None:
-        self.model.load_state_dict(torch.load(ai_model_path, map_location=self.device))  # type: ignore
-        self.model.eval()  # type: ignore
-        self.mcts = MCTS(AI_ARGS, self.ai_game_state_transition_helper, self.model)
+        if AI_ARGS.get("inference_server") is not None:
+            self.model = InferenceClient(str(AI_ARGS["inference_server"]))
+        elif self.backend == "eager":
+            self.model = self.load_resnet(
+                torch.load(ai_model_path, map_location=self.device)
+            )
+        else:
+            self.model = ExportedModel(self.backend, ai_model_path)
+        self.mcts = create_search(
+            AI_ARGS, self.ai_game_state_transition_helper, self.model
+        )
+        checkpoint_dir = AI_ARGS.get("checkpoint_dir")
+        if isinstance(checkpoint_dir, str) and isinstance(self.model, ResNet):
+            self.checkpoint_watcher = CheckpointWatcher(checkpoint_dir)
+            self.reload_model()
+
+    def load_resnet(self, state_dict: Dict[str, torch.Tensor]) -> ResNet:
+        """ResNet in eval mode of the sizes ``state_dict`` was saved with."""
+        model = ResNet(
+            self.ai_game_state_transition_helper, *model_sizes(state_dict), self.device
+        )
+        model.load_state_dict(state_dict)
+        model.eval()
+        return model
+
+    def reload_model(self) -> Optional[int]:
+        """
+        Switches to the newest checkpoint of the watched directory when it is
+        newer than the weights in use, and returns its version. The weights
+        are loaded into a new ResNet and search, which then replace the ones in
+        use in a single assignment, so a move is never searched with a
+        half-loaded model.
+        """
+        if self.checkpoint_watcher is None:
+            return None
+        latest = self.checkpoint_watcher.poll(self.device)
+        if latest is None:
+            return None
+        version, state_dict = latest
+        model = self.load_resnet(state_dict)
+        previous_search = self.mcts
+        self.model = model
+        self.mcts = create_search(AI_ARGS, self.ai_game_state_transition_helper, model)
+        # the kept subtree was searched with the old weights
+        self.search_root = None
+        self.search_root_state = None
+        if isinstance(previous_search, (DeterminizedMCTS, RootParallelMCTS)):
+            previous_search.close()
+        return version
+
+    def new_game(self) -> None:
+        """Forgets the kept subtree and the search statistics of the last game."""
+        self.search_root = None
+        self.search_root_state = None
+        if isinstance(self.mcts, MCTS):
+            self.mcts.new_game()
+        else:
+            # the worker processes keep their own tables, and start afresh
+            # with the pool the next search creates
+            self.mcts.close()
+
+    def find_reusable_root(self, state: np.ndarray) -> Optional[SearchTree]:
+        """
+        Subtree of the kept node whose position is ``state``, if any. Only the
+        public part of the positions is compared, since the hidden identities
+        of the search may have been shuffled by the chance nodes.
+        """
+        if self.search_root is None or self.search_root_state is None:
+            return None
+        tree, node = self.search_root
+        for child in tree.children(node):
+            if tree.is_chance[child]:
+                # the outcome is the identity the reveal actually turned up
+                square = PIECE_ACTION_DECODE_ACTION[int(tree.action[child])][0]
+                child = tree.find_outcome(child, state[1][square])
+                if child < 0:
+                    continue
+            if not tree.is_expanded(child):
+                continue
+            self.search_root_state.make(
+                int(tree.action[child]), int(tree.outcome[child]) or None
+            )
+            reusable = same_public_position(self.search_root_state.to_array(), state)
+            self.search_root_state.unmake()
+            if reusable:
+                return tree.extract_subtree(child)
+        return None
+
+    def keep_subtree(self, state: np.ndarray, action: int) -> None:
+        self.search_root = None
+        self.search_root_state = None
+        tree = self.mcts.tree
+        if not AI_ARGS.get("reuse_tree", False) or tree is None:
+            return
+        for child in tree.children(0):
+            if tree.action[child] != action:
+                continue
+            child = int(child)
+            if tree.is_chance[child]:
+                square = PIECE_ACTION_DECODE_ACTION[action][0]
+                child = tree.find_outcome(child, state[1][square])
+            if child < 0 or not tree.is_expanded(child):
+                return
+            self.search_root = (tree, child)
+            self.search_root_state = CompactState.from_array(state)
+            self.search_root_state.make(action)
+            return
 
     def predict(self, game_state: GameState) -> PieceAction:
+        self.reload_model()
         state = self.ai_game_state_transition_helper.get_initial_state(game_state)
-        mcts_probs = self.mcts.search(state)
-        action = PIECE_ACTION_DECODE_ACTION[np.argmax(mcts_probs).astype(int)]
+        mcts_probs = self.mcts.search(state, self.find_reusable_root(state))
+        action_index = int(np.argmax(mcts_probs))
+        self.keep_subtree(state, action_index)
+        action = PIECE_ACTION_DECODE_ACTION[action_index]
         match (action[1]):
             case 0:
                 piece_action_type = PieceActionType.REVEAL
@@ -1,9 +1,41 @@
 from typing import List, Optional, Tuple
 import numpy as np
-from src.ai.piece_action_code import PIECE_ACTION_DECODE_ACTION, PIECE_ACTION_ENCODE
+from src.ai.bitboard import BitboardPosition, legal_action_masks, occupancy_mask
+from src.ai.piece_action_code import ACTION_SIZE, PIECE_ACTION_DECODE_ACTION
 from src.game_state import GameState
-from src.models.piece import PieceColor
+from src.models.cannon_attack_table import cannon_jump_targets
 from src.models.player import PlayerColor
+from src.models.zobrist import (
+    COLOR_KEYS,
+    COVERED_KEYS,
+    IDENTITY_COUNT,
+    IDLE_STEP_LIMIT,
+    SIDE_TO_MOVE_KEY,
+    SQUARE_COUNT,
+    compute_hash,
+    idle_step_key,
+    join_key,
+    piece_key,
+    split_key,
+)
+
+# The Zobrist key is kept in the unused tail of the header plane, as four
+# 16-bit limbs so it fits whatever integer type the array uses.
+HASH_ROW = (2, 3)
+HASH_COLUMNS = slice(4, 8)
+
+# PUBLIC_PIECE_KEYS[square][code]: code is the identity of a revealed piece,
+# COVERED_CODE for a covered piece whatever it hides, and 0 (key 0) for none
+COVERED_CODE = IDENTITY_COUNT
+PUBLIC_PIECE_KEYS = np.array(
+    [
+        [0]
+        + [piece_key(square, identity, False) for identity in range(1, COVERED_CODE)]
+        + [COVERED_KEYS[square]]
+        for square in range(SQUARE_COUNT)
+    ],
+    dtype=np.uint64,
+)
 
 
 class AIGameStateTransitionHelper:
@@ -11,7 +43,7 @@ class AIGameStateTransitionHelper:
     def __init__(self) -> None:
         self.row_count = 4
         self.column_count = 8
-        self.action_size = 456
+        self.action_size = ACTION_SIZE
 
     def to_coordinates(self, index: int) -> Tuple[int, int]:
         row = index // 8
@@ -27,9 +59,7 @@ class AIGameStateTransitionHelper:
                 state[1][row][col] = 0
             else:
                 state[0][row][col] = 100 if piece.covered else piece.piece_type.value
-                state[1][row][col] = (piece.piece_type.value) + (
-                    10 if piece.piece_color == PieceColor.RED else 20
-                )
+                state[1][row][col] = piece.get_identity()
         current_player = game_state.get_current_player()
         current_player_index = game_state.current_player_index
         # current player
@@ -69,6 +99,7 @@ class AIGameStateTransitionHelper:
             )
         )
         state[2][0][5] = game_state.idle_steps
+        self.set_state_hash(state, self.compute_state_hash(state))
         return state
 
     def get_enemy_player_index(self, index: int) -> int:
@@ -85,8 +116,12 @@ class AIGameStateTransitionHelper:
 
     def get_next_state(self, state: np.ndarray, action: int) -> np.ndarray:
         action_decode = PIECE_ACTION_DECODE_ACTION[action]
+        key = self.state_hash(state) ^ idle_step_key(state[2][0][5])
         if action_decode[1] == 0:  # reveal
             row, col = action_decode[0]
+            identity = state[1][row][col]
+            key ^= piece_key(row * 8 + col, identity, True)
+            key ^= piece_key(row * 8 + col, identity, False)
             state[0][row][col] = state[1][row][col] % 10
             state[2][0][5] = 0
             if state[2][0][1] == 0:  # assing color
@@ -96,9 +131,12 @@ class AIGameStateTransitionHelper:
                 state[2][0][opisite_player] = self.get_enemy_player_color(
                     state[2][0][current_player]
                 )
+                key ^= COLOR_KEYS[0] ^ COLOR_KEYS[state[2][0][1]]
         elif action_decode[1] == 1:  # move
             row1, col1 = action_decode[0]
             row2, col2 = action_decode[2]
+            key ^= piece_key(row1 * 8 + col1, state[1][row1][col1], False)
+            key ^= piece_key(row2 * 8 + col2, state[1][row1][col1], False)
             state[0][row1][col1], state[0][row2][col2] = (
                 state[0][row2][col2],
                 state[0][row1][col1],
@@ -111,6 +149,9 @@ class AIGameStateTransitionHelper:
         elif action_decode[1] == 2:  # eat
             row1, col1 = action_decode[0]
             row2, col2 = action_decode[2]
+            key ^= piece_key(row1 * 8 + col1, state[1][row1][col1], False)
+            key ^= piece_key(row2 * 8 + col2, state[1][row2][col2], False)
+            key ^= piece_key(row2 * 8 + col2, state[1][row1][col1], False)
             state[0][row1][col1], state[0][row2][col2] = 0, state[0][row1][col1]
             state[1][row1][col1], state[1][row2][col2] = 0, state[1][row1][col1]
             state[2][0][5] = 0
@@ -119,83 +160,21 @@ class AIGameStateTransitionHelper:
                 state[2][0][4] -= 1
             else:
                 state[2][0][3] -= 1
+        self.set_state_hash(state, key ^ idle_step_key(state[2][0][5]))
         return state
 
     def get_valid_moves(self, state: np.ndarray) -> np.ndarray:
-        action_mask = np.zeros(456, dtype=np.uint8)
+        action_mask = np.zeros(self.action_size, dtype=np.uint8)
         action_mask[self.calculate_valid_action(state, state[2][0][0])] = 1
         return action_mask
 
-    def calculate_valid_action(self, state: np.ndarray, player: int) -> List[int]:
-        color = state[2][0][player]
-        actions = []
-        for row in range(4):
-            for col in range(8):
-                if state[0][row][col] == 0:
-                    continue
-                if state[0][row][col] == 100:  # covered
-                    actions.append(
-                        PIECE_ACTION_ENCODE[f"({row},{col})-REVEAL-({row},{col})"]
-                    )
-                elif state[1][row][col] // 10 == color:
-                    actions.extend(self.generate_move_action(state, row, col))
-                    actions.extend(self.generate_eat_action(state, player, row, col))
-        return actions
-
-    def generate_move_action(self, state: np.ndarray, row: int, col: int) -> List[int]:
-        dirs = [-1, 0, 1, 0, -1]
-        actions = []
-        for i in range(4):
-            next_x = row + dirs[i]
-            next_y = col + dirs[i + 1]
-            if (
-                next_x < 0
-                or next_x >= 4
-                or next_y < 0
-                or next_y >= 8
-                or state[0][next_x][next_y] != 0
-            ):
-                continue
-            actions.append(
-                PIECE_ACTION_ENCODE[f"({row},{col})-MOVE-({next_x},{next_y})"]
-            )
-        return actions
-
-    def generate_eat_action(
-        self, state: np.ndarray, player: int, row: int, col: int
-    ) -> List[int]:
-        actions = []
-        if state[0][row][col] == 6:
-            for next_x, next_y in self.generate_cannon_potential_attack_positions(
-                state, row, col
-            ):
-                enemy_piece1 = state[0][next_x][next_y]
-                enemy_piece2 = state[1][next_x][next_y]
+    def get_valid_moves_batch(self, states: np.ndarray) -> np.ndarray:
+        """get_valid_moves of every state of a (B, 3, 4, 8) batch, as (B, 456)."""
+        return legal_action_masks(states)
 
-                if enemy_piece1 == 100 or (enemy_piece2 // 10) == state[2][0][player]:
-                    continue
-                actions.append(
-                    PIECE_ACTION_ENCODE[f"({row},{col})-EAT-({next_x},{next_y})"]
-                )
-            return actions
-        dirs = [-1, 0, 1, 0, -1]
-        for i in range(4):
-            next_x = row + dirs[i]
-            next_y = col + dirs[i + 1]
-            if next_x < 0 or next_x >= 4 or next_y < 0 or next_y >= 8:
-                continue
-            enemy_piece1 = state[0][next_x][next_y]
-            enemy_piece2 = state[1][next_x][next_y]
-            if (
-                enemy_piece1 != 0
-                and enemy_piece1 != 100
-                and (enemy_piece2 // 10) != state[2][0][player]
-                and self.can_defeat(state[0][row][col], enemy_piece1)
-            ):
-                actions.append(
-                    PIECE_ACTION_ENCODE[f"({row},{col})-EAT-({next_x},{next_y})"]
-                )
-        return actions
+    def calculate_valid_action(self, state: np.ndarray, player: int) -> List[int]:
+        color = int(state[2][0][player])
+        return BitboardPosition.from_state(state).legal_actions(color)
 
     def can_defeat(self, mine: int, enemy: int) -> bool:
         match (mine):
@@ -209,27 +188,11 @@ class AIGameStateTransitionHelper:
 
     def generate_cannon_potential_attack_positions(
         self, state: np.ndarray, row: int, col: int
-    ):
-        potential_targets: List[Tuple[int, int]] = []
-        dirs = [-1, 0, 1, 0, -1]
-
-        for i in range(4):
-            jump_over = False
-            current_x, current_y = row, col
-            while True:
-                current_x += dirs[i]
-                current_y += dirs[i + 1]
-                if not (0 <= current_x < 4 and 0 <= current_y < 8):
-                    break
-                next_piece = state[0][current_x][current_y]
-                if next_piece == 0:
-                    continue
-                if not jump_over:
-                    jump_over = True
-                else:
-                    potential_targets.append((current_x, current_y))
-                    break
-        return potential_targets
+    ) -> List[Tuple[int, int]]:
+        return [
+            self.to_coordinates(target)
+            for target in cannon_jump_targets(row * 8 + col, occupancy_mask(state[0]))
+        ]
 
     def check_win(
         self, state: np.ndarray, action: Optional[int], current: bool = False
@@ -252,10 +215,23 @@ class AIGameStateTransitionHelper:
     ) -> Tuple[int, bool]:
         if self.check_win(state, action, current):
             return abs(state[2][0][3] - state[2][0][4]), True
-        if state[2][0][5] >= 30:
+        if state[2][0][5] >= IDLE_STEP_LIMIT:
             return 0, True
         return 0, False
 
+    def get_values_and_terminated_batch(
+        self, states: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        get_value_and_terminated(state, action, current=True) of every state of
+        a (B, 3, 4, 8) batch reached by some action.
+        """
+        headers = states[:, 2, 0]
+        rest = np.where(headers[:, 0] == 1, headers[:, 3], headers[:, 4])
+        won = (rest == 0) | ~np.any(self.get_valid_moves_batch(states), axis=1)
+        values = np.where(won, np.abs(headers[:, 3] - headers[:, 4]), 0)
+        return values, won | (headers[:, 5] >= IDLE_STEP_LIMIT)
+
     def get_opponent(self, player: int) -> int:
         return -player
 
@@ -264,31 +240,66 @@ class AIGameStateTransitionHelper:
 
     def change_perspective(self, state: np.ndarray) -> np.ndarray:
         state[2][0][0] = 2 if state[2][0][0] == 1 else 1
+        self.set_state_hash(state, self.state_hash(state) ^ SIDE_TO_MOVE_KEY)
         return state
 
+    def compute_state_hash(self, state: np.ndarray) -> int:
+        return compute_hash(
+            state[1].ravel().tolist(),
+            (state[0] == 100).ravel().tolist(),
+            state[2][0][0] == 2,
+            int(state[2][0][1]),
+            int(state[2][0][5]),
+        )
+
+    def state_hash(self, state: np.ndarray) -> int:
+        """64-bit Zobrist key of the state, kept up to date by get_next_state."""
+        return join_key(state[HASH_ROW][HASH_COLUMNS])
+
+    def set_state_hash(self, state: np.ndarray, key: int) -> None:
+        state[HASH_ROW][HASH_COLUMNS] = split_key(key)
+
+    def public_hashes(self, states: np.ndarray) -> np.ndarray:
+        """
+        64-bit keys of the pieces on view in a (B, 3, 4, 8) batch of states:
+        revealed pieces by identity and covered ones without it, so states
+        differing only in what the covered pieces hide share a key.
+        """
+        codes = np.where(states[:, 0] == 100, COVERED_CODE, states[:, 1])
+        keys = PUBLIC_PIECE_KEYS[
+            np.arange(SQUARE_COUNT), codes.reshape(len(states), SQUARE_COUNT)
+        ]
+        return np.bitwise_xor.reduce(keys, axis=1)
+
     def get_encoded_state(self, state: np.ndarray) -> np.ndarray:
-        features = np.array(state[0])
-        color = state[2][0][state[2][0][0]]
-        for row in range(4):
-            for col in range(8):
-                if state[0][row][col] == 0 or state[0][row][col] == 100:
-                    continue
-                features[row][col] *= 1 if ((state[1][row][col] // 10) == color) else -1
+        return self.get_encoded_states(state[np.newaxis])[0]
 
-        channels = 16
-        encoded_features = np.zeros(
-            (channels, features.shape[0], features.shape[1]), dtype=np.float32
+    def get_encoded_states(
+        self, states: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        One-hot planes of a (B, 3, 4, 8) batch of states, as (B, 16, 4, 8)
+        float32 written into ``out`` when given. Plane 0 marks the empty
+        squares, planes 1 to 7 the pieces of the side to move by type, planes
+        8 to 14 the opponent's, and plane 15 the covered pieces.
+        """
+        visible = states[:, 0]
+        identities = states[:, 1]
+        batch = np.arange(len(states))
+        colors = states[batch, 2, 0, states[:, 2, 0, 0]]
+        planes = np.where(
+            identities // 10 == colors[:, np.newaxis, np.newaxis], visible, visible + 7
         )
-        # No Piece
-        encoded_features[0] = (features == 0).astype(np.float32)
-        # "Red pieces" and "Black pieces" each with numbers 1 to 7.
-        # "The positive and negative signs are based on both sides. "From our perspective, all our pieces will be positive."
-        for i in range(1, 8):
-            encoded_features[i] = (features == i).astype(np.float32)
-            encoded_features[i + 7] = (features == -i).astype(np.float32)
-        # Covered Piece
-        encoded_features[15] = (features == 100).astype(np.float32)
-        return encoded_features
+        planes[visible == 0] = 0
+        planes[visible == 100] = 15
+        if out is None:
+            out = np.zeros(
+                (len(states), 16, self.row_count, self.column_count), np.float32
+            )
+        else:
+            out.fill(0)
+        np.put_along_axis(out, planes[:, np.newaxis], 1, axis=1)
+        return out
 
     def count_covered_pieces_number(self, state: np.ndarray) -> int:
         return np.count_nonzero(state[0] == 100)
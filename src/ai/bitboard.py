@@ -0,0 +1,205 @@
+from typing import Iterator, List, Tuple
+import numpy as np
+from src.ai.piece_action_code import (
+    ACTION_FROM,
+    ACTION_ID,
+    ACTION_KIND,
+    ACTION_SIZE,
+    ACTION_TO,
+    COLUMN_COUNT,
+    EAT,
+    MOVE,
+    REVEAL,
+    ROW_COUNT,
+    SQUARE_COUNT,
+)
+from src.models.cannon_attack_table import DIRECTIONS, cannon_jump_targets
+from src.models.piece import PieceType
+
+FULL_MASK = (1 << SQUARE_COUNT) - 1
+# bit of every square, to build a mask from a board array in one product
+SQUARE_BITS = np.left_shift(1, np.arange(SQUARE_COUNT, dtype=np.int64))
+
+COVERED = 100
+CANNON = PieceType.CANNON.value
+
+
+def to_square(row: int, col: int) -> int:
+    return row * COLUMN_COUNT + col
+
+
+def occupancy_mask(visible: np.ndarray) -> int:
+    """Mask of the occupied squares of a (4, 8) board of visible values."""
+    return int(SQUARE_BITS @ (visible.ravel() != 0))
+
+
+def iterate_bits(mask: int) -> Iterator[int]:
+    """Yields the square index of every set bit, lowest square first."""
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length() - 1
+        mask ^= lowest_bit
+
+
+def _build_adjacent_masks() -> List[int]:
+    masks = []
+    for square in range(SQUARE_COUNT):
+        row, col = divmod(square, COLUMN_COUNT)
+        mask = 0
+        for d_row, d_col in DIRECTIONS:
+            next_row, next_col = row + d_row, col + d_col
+            if 0 <= next_row < ROW_COUNT and 0 <= next_col < COLUMN_COUNT:
+                mask |= 1 << to_square(next_row, next_col)
+        masks.append(mask)
+    return masks
+
+
+def _build_defeatable_types() -> List[Tuple[int, ...]]:
+    defeatable_types: List[Tuple[int, ...]] = [()]
+    for piece_type in PieceType:
+        defeatable_types.append(
+            tuple(enemy.value for enemy in PieceType if piece_type.can_defeat(enemy))
+        )
+    return defeatable_types
+
+
+ADJACENT_MASKS = _build_adjacent_masks()
+# action index lookups as plain lists, cheaper than NumPy for scalar access
+REVEAL_ACTION: List[int] = ACTION_ID[:, REVEAL, :].diagonal().tolist()
+MOVE_ACTION: List[List[int]] = ACTION_ID[:, MOVE, :].tolist()
+EAT_ACTION: List[List[int]] = ACTION_ID[:, EAT, :].tolist()
+# (current square, action kind, next square) for every action index
+ACTION_DECODE: List[Tuple[int, int, int]] = list(
+    zip(ACTION_FROM.tolist(), ACTION_KIND.tolist(), ACTION_TO.tolist())
+)
+DEFEATABLE_TYPES = _build_defeatable_types()
+
+
+def _build_jump_screens() -> np.ndarray:
+    """
+    JUMP_SCREENS[action, square] is set for the squares strictly between the
+    two squares of a cannon jump, where the one screen must stand.
+    """
+    screens = np.zeros((len(ACTION_DECODE), SQUARE_COUNT), dtype=np.int8)
+    for action, (current, kind, following) in enumerate(ACTION_DECODE):
+        if kind != EAT or ADJACENT_MASKS[current] >> following & 1:
+            continue
+        row, col = divmod(current, COLUMN_COUNT)
+        next_row, next_col = divmod(following, COLUMN_COUNT)
+        d_row = (next_row > row) - (next_row < row)
+        d_col = (next_col > col) - (next_col < col)
+        for step in range(1, max(abs(next_row - row), abs(next_col - col))):
+            screens[action, to_square(row + d_row * step, col + d_col * step)] = 1
+    return screens
+
+
+JUMP_SCREENS = _build_jump_screens()
+_IS_JUMP = JUMP_SCREENS.any(axis=1)
+# action indices of each kind, eats split into adjacent ones and cannon jumps
+REVEALS = np.flatnonzero(ACTION_KIND == REVEAL)
+MOVES = np.flatnonzero(ACTION_KIND == MOVE)
+ADJACENT_EATS = np.flatnonzero((ACTION_KIND == EAT) & ~_IS_JUMP)
+JUMPS = np.flatnonzero(_IS_JUMP)
+# float, so the screens of a batch are counted by one BLAS product
+_JUMP_SCREENS_T = JUMP_SCREENS[JUMPS].T.astype(np.float32)
+# CAN_DEFEAT[mine, enemy] by piece value, the cannon's adjacent eats excluded
+CAN_DEFEAT = np.zeros((COVERED + 1, COVERED + 1), dtype=bool)
+for _piece, _preys in enumerate(DEFEATABLE_TYPES):
+    if _piece != CANNON:
+        CAN_DEFEAT[_piece, list(_preys)] = True
+
+
+def legal_action_masks(states: np.ndarray) -> np.ndarray:
+    """
+    (B, 456) uint8 legal action masks of a (B, 3, 4, 8) batch of AI states for
+    their side to move, the batched form of BitboardPosition.legal_actions.
+    """
+    visible = states[:, 0].reshape(len(states), SQUARE_COUNT)
+    owners = states[:, 1].reshape(len(states), SQUARE_COUNT) // 10
+    colors = states[np.arange(len(states)), 2, 0, states[:, 2, 0, 0]]
+    face_up = (visible != 0) & (visible != COVERED)
+    # no pieces are owned while the colors are unassigned (color 0)
+    own = face_up & (owners == colors[:, np.newaxis])
+    enemy = face_up & (owners == 3 - colors[:, np.newaxis])
+
+    masks = np.zeros((len(states), ACTION_SIZE), dtype=np.uint8)
+    masks[:, REVEALS] = visible[:, ACTION_FROM[REVEALS]] == COVERED
+    masks[:, MOVES] = own[:, ACTION_FROM[MOVES]] & (visible[:, ACTION_TO[MOVES]] == 0)
+    masks[:, ADJACENT_EATS] = (
+        own[:, ACTION_FROM[ADJACENT_EATS]]
+        & enemy[:, ACTION_TO[ADJACENT_EATS]]
+        & CAN_DEFEAT[
+            visible[:, ACTION_FROM[ADJACENT_EATS]], visible[:, ACTION_TO[ADJACENT_EATS]]
+        ]
+    )
+    screens = (visible != 0).astype(np.float32) @ _JUMP_SCREENS_T
+    masks[:, JUMPS] = (
+        own[:, ACTION_FROM[JUMPS]]
+        & (visible[:, ACTION_FROM[JUMPS]] == CANNON)
+        & enemy[:, ACTION_TO[JUMPS]]
+        & (screens == 1)
+    )
+    return masks
+
+
+class BitboardPosition:
+    """
+    Bitboard view of an AI state array (see AIGameStateTransitionHelper).
+    Square ``row * 8 + col`` maps to bit ``row * 8 + col`` of every mask.
+    """
+
+    __slots__ = ("pieces", "occupied", "covered", "color_masks", "type_masks")
+
+    def __init__(self, visible: List[int], identities: List[int]) -> None:
+        self.pieces = visible
+        self.occupied = 0
+        self.covered = 0
+        # index 0 is unused so masks can be looked up by color / piece value
+        self.color_masks = [0, 0, 0]
+        self.type_masks = [0] * 8
+        for square, piece in enumerate(visible):
+            if piece == 0:
+                continue
+            bit = 1 << square
+            self.occupied |= bit
+            if piece == COVERED:
+                self.covered |= bit
+            else:
+                self.color_masks[identities[square] // 10] |= bit
+                self.type_masks[piece] |= bit
+
+    @classmethod
+    def from_state(cls, state: np.ndarray) -> "BitboardPosition":
+        return cls(state[0].ravel().tolist(), state[1].ravel().tolist())
+
+    def cannon_targets(self, square: int) -> int:
+        targets = 0
+        for target in cannon_jump_targets(square, self.occupied):
+            targets |= 1 << target
+        return targets
+
+    def legal_actions(self, color: int) -> List[int]:
+        actions = [REVEAL_ACTION[square] for square in iterate_bits(self.covered)]
+        if color not in (1, 2):
+            return actions
+        own = self.color_masks[color]
+        enemy = self.color_masks[3 - color]
+        empty = ~self.occupied & FULL_MASK
+        type_masks = self.type_masks
+        prey_masks = [
+            enemy & sum(type_masks[prey] for prey in preys)
+            for preys in DEFEATABLE_TYPES
+        ]
+        for square in iterate_bits(own):
+            move_action = MOVE_ACTION[square]
+            eat_action = EAT_ACTION[square]
+            for target in iterate_bits(ADJACENT_MASKS[square] & empty):
+                actions.append(move_action[target])
+            piece = self.pieces[square]
+            if piece == CANNON:
+                targets = self.cannon_targets(square) & enemy
+            else:
+                targets = ADJACENT_MASKS[square] & prey_masks[piece]
+            for target in iterate_bits(targets):
+                actions.append(eat_action[target])
+        return actions
@@ -0,0 +1,97 @@
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+import torch  # type: ignore
+
+LATEST_NAME = "latest.json"
+
+StateDict = Dict[str, torch.Tensor]
+
+
+def save_checkpoint(model: torch.nn.Module, path: str) -> None:
+    """
+    Writes the model's state_dict, which Agent.initialization loads as is.
+    The file is replaced at once, so a reader never sees half of it.
+    """
+    temporary_path = f"{path}.tmp"
+    torch.save(model.state_dict(), temporary_path)
+    os.replace(temporary_path, path)
+
+
+def checkpoint_name(version: int) -> str:
+    return f"model-{version:07d}.pt"
+
+
+def publish_checkpoint(
+    model: torch.nn.Module,
+    directory: str,
+    version: int,
+    keep: Optional[int] = None,
+) -> None:
+    """
+    Writes the weights as version ``version`` of ``directory``, then points
+    latest.json at it, so watchers only ever see complete checkpoints. With
+    ``keep``, only that many of the newest versions are left on disk.
+    """
+    os.makedirs(directory, exist_ok=True)
+    save_checkpoint(model, os.path.join(directory, checkpoint_name(version)))
+    latest_path = os.path.join(directory, LATEST_NAME)
+    temporary_path = f"{latest_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump({"version": version, "file": checkpoint_name(version)}, file)
+    os.replace(temporary_path, latest_path)
+    if keep is None:
+        return
+    versions = sorted(
+        int(name[len("model-") : -len(".pt")])
+        for name in os.listdir(directory)
+        if name.startswith("model-") and name.endswith(".pt")
+    )
+    for old_version in versions[:-keep]:
+        os.remove(os.path.join(directory, checkpoint_name(old_version)))
+
+
+def latest_checkpoint(directory: str) -> Optional[Tuple[int, str]]:
+    """Version and path of the newest checkpoint published to ``directory``."""
+    try:
+        with open(os.path.join(directory, LATEST_NAME), encoding="utf-8") as file:
+            latest = json.load(file)
+    except FileNotFoundError:
+        return None
+    return latest["version"], os.path.join(directory, latest["file"])
+
+
+class CheckpointWatcher:
+    """
+    Polls the checkpoints a learner publishes to ``directory``. ``poll`` only
+    reads latest.json when its modification time changed, so it is cheap
+    enough to call before every game or move.
+    """
+
+    def __init__(self, directory: str, version: int = -1) -> None:
+        self.directory = directory
+        # newest version handed out
+        self.version = version
+        self.modified: Optional[int] = None
+
+    def poll(self, map_location: Any = "cpu") -> Optional[Tuple[int, StateDict]]:
+        """Version and weights of a newer checkpoint, None when there is none."""
+        try:
+            modified = os.stat(os.path.join(self.directory, LATEST_NAME)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if modified == self.modified:
+            return None
+        latest = latest_checkpoint(self.directory)
+        if latest is None or latest[0] <= self.version:
+            self.modified = modified
+            return None
+        version, path = latest
+        try:
+            state_dict = torch.load(path, map_location=map_location)
+        except FileNotFoundError:
+            # pruned by a newer publication, which the next poll picks up
+            return None
+        self.modified = modified
+        self.version = version
+        return version, state_dict
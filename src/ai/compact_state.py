@@ -0,0 +1,173 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from src.ai.ai_game_state_transition_helper import HASH_COLUMNS, HASH_ROW
+from src.ai.bitboard import ACTION_DECODE, BitboardPosition
+from src.models.zobrist import (
+    COLOR_KEYS,
+    SIDE_TO_MOVE_KEY,
+    idle_step_key,
+    join_key,
+    piece_key,
+    split_key,
+)
+
+COVERED_FLAG = 0x80
+IDENTITY_MASK = 0x7F
+# identities go up to 27 (black soldier)
+IDENTITY_COUNT = 28
+
+# header layout, identical to state[2][0][0:6] of the AI state array
+CURRENT_PLAYER = 0
+REST_PIECES = (3, 4)  # rest pieces of player 1, player 2
+IDLE_STEPS = 5
+HEADER_SIZE = 6
+
+# action, current square, current byte, next square, next byte, header, key
+UndoEntry = Tuple[int, int, int, int, int, Tuple[int, ...], int]
+
+
+class CompactState:
+    """
+    Compact counterpart of the (3, 4, 8) AI state array.
+
+    ``board`` is 32 bytes, one per square: the piece identity (10 + type for red,
+    20 + type for black) with COVERED_FLAG set while the piece is face down, or 0
+    for an empty square. ``header`` holds the current player, the colors of
+    player 1 and 2, their rest pieces and the idle steps. ``key`` is the Zobrist
+    key, updated incrementally like the one of the state array.
+
+    ``make`` applies an action and hands the turn over (``get_next_state``
+    followed by ``change_perspective``); ``unmake`` restores the previous state
+    from ``undo_stack``, which may be shared between states. A reveal may be
+    given the identity it turns up, which is then swapped with a face-down
+    piece of that identity so the hidden pool stays the same.
+    """
+
+    __slots__ = ("board", "header", "key", "undo_stack")
+
+    def __init__(
+        self,
+        board: bytearray,
+        header: List[int],
+        key: int,
+        undo_stack: Optional[List[UndoEntry]] = None,
+    ) -> None:
+        self.board = board
+        self.header = header
+        self.key = key
+        self.undo_stack: List[UndoEntry] = [] if undo_stack is None else undo_stack
+
+    @classmethod
+    def from_array(cls, state: np.ndarray) -> "CompactState":
+        board = np.where(state[0] == 100, state[1] | COVERED_FLAG, state[1])
+        return cls(
+            bytearray(board.astype(np.uint8).tobytes()),
+            state[2][0][:HEADER_SIZE].tolist(),
+            join_key(state[HASH_ROW][HASH_COLUMNS]),
+        )
+
+    def to_array(self) -> np.ndarray:
+        board = np.frombuffer(bytes(self.board), dtype=np.uint8).reshape(4, 8)
+        identities = board & IDENTITY_MASK
+        state = np.zeros((3, 4, 8), dtype=int)
+        state[0] = np.where(board & COVERED_FLAG, 100, identities % 10)
+        state[1] = identities
+        state[2][0][:HEADER_SIZE] = self.header
+        state[HASH_ROW][HASH_COLUMNS] = split_key(self.key)
+        return state
+
+    def copy(self) -> "CompactState":
+        return CompactState(bytearray(self.board), list(self.header), self.key)
+
+    def state_hash(self) -> int:
+        return self.key
+
+    def to_bitboard(self) -> BitboardPosition:
+        board = self.board
+        return BitboardPosition(
+            [0 if b == 0 else 100 if b & COVERED_FLAG else b % 10 for b in board],
+            [b & IDENTITY_MASK for b in board],
+        )
+
+    def hidden_pool(self) -> np.ndarray:
+        """Number of face-down pieces of each identity."""
+        pool = np.zeros(IDENTITY_COUNT, dtype=np.int64)
+        for b in self.board:
+            if b & COVERED_FLAG:
+                pool[b & IDENTITY_MASK] += 1
+        return pool
+
+    def legal_actions(self) -> List[int]:
+        header = self.header
+        return self.to_bitboard().legal_actions(header[header[CURRENT_PLAYER]])
+
+    def make(self, action: int, identity: Optional[int] = None) -> None:
+        board = self.board
+        header = self.header
+        current, kind, following = ACTION_DECODE[action]
+        if kind == 0 and identity not in (None, board[current] & IDENTITY_MASK):
+            # the undo entry restores the swapped square as the "next" one
+            following = board.index(identity | COVERED_FLAG)
+        self.undo_stack.append(
+            (
+                action,
+                current,
+                board[current],
+                following,
+                board[following],
+                tuple(header),
+                self.key,
+            )
+        )
+        player = header[CURRENT_PLAYER]
+        key = self.key ^ idle_step_key(header[IDLE_STEPS]) ^ SIDE_TO_MOVE_KEY
+        if kind == 0:  # reveal
+            if following != current:
+                # only a given identity moves the reveal to another square
+                assert identity is not None
+                hidden = board[current] & IDENTITY_MASK
+                key ^= piece_key(current, hidden, True) ^ piece_key(
+                    following, identity, True
+                )
+                key ^= piece_key(current, identity, True) ^ piece_key(
+                    following, hidden, True
+                )
+                board[current], board[following] = board[following], board[current]
+            identity = board[current] & IDENTITY_MASK
+            key ^= piece_key(current, identity, True) ^ piece_key(
+                current, identity, False
+            )
+            board[current] = identity
+            header[IDLE_STEPS] = 0
+            if header[1] == 0:  # assign color
+                color = identity // 10
+                header[player] = color
+                header[3 - player] = 3 - color
+                key ^= COLOR_KEYS[0] ^ COLOR_KEYS[header[1]]
+        elif kind == 1:  # move
+            identity = board[current]
+            key ^= piece_key(current, identity, False) ^ piece_key(
+                following, identity, False
+            )
+            board[current], board[following] = 0, identity
+            header[IDLE_STEPS] += 1
+        else:  # eat
+            identity = board[current]
+            key ^= piece_key(current, identity, False)
+            key ^= piece_key(following, board[following], False)
+            key ^= piece_key(following, identity, False)
+            board[current], board[following] = 0, identity
+            header[IDLE_STEPS] = 0
+            header[REST_PIECES[2 - player]] -= 1
+        header[CURRENT_PLAYER] = 3 - player
+        self.key = key ^ idle_step_key(header[IDLE_STEPS])
+
+    def unmake(self) -> int:
+        action, current, current_byte, following, following_byte, header, key = (
+            self.undo_stack.pop()
+        )
+        self.board[current] = current_byte
+        self.board[following] = following_byte
+        self.header[:] = header
+        self.key = key
+        return action
@@ -0,0 +1,117 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+import numpy as np
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.mcts import MCTS, forced_action_probs
+from src.ai.model_export import InferenceModel
+from src.ai.search_pool import (
+    create_search_pool,
+    search_visit_counts,
+    submit_search,
+    worker_count,
+)
+from src.ai.search_tree import SearchTree
+
+
+class DeterminizedMCTS:
+    """
+    Determinized (information set) search. Each move samples ``determinizations``
+    layouts of the face-down pieces, consistent with the revealed ones, runs
+    an independent MCTS of num_searches simulations on each and adds up the
+    root visit counts. Reveals are plain actions within a determinization.
+    The time budget is for the whole move, shared by the searches.
+
+    The searches run in a pool of worker processes kept between moves, or
+    in this process when search_workers is 1.
+    """
+
+    def __init__(
+        self,
+        args: Dict[str, Any],
+        ai_game_state_transition_helper: AIGameStateTransitionHelper,
+        model: InferenceModel,
+    ):
+        self.args = {**args, "chance_nodes": False}
+        self.model = model
+        self.ai_game_state_transition_helper = ai_game_state_transition_helper
+        # no tree is kept, so the agent does not reuse one
+        self.tree = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.local_mcts: Optional[MCTS] = None
+
+    def sample_determinization(self, state: np.ndarray) -> np.ndarray:
+        """Copy of ``state`` with the face-down identities shuffled."""
+        determinization = state.copy()
+        covered = np.flatnonzero(state[0] == 100)
+        determinization[1].flat[covered] = np.random.permutation(state[1].flat[covered])
+        helper = self.ai_game_state_transition_helper
+        helper.set_state_hash(
+            determinization, helper.compute_state_hash(determinization)
+        )
+        return determinization
+
+    def search(
+        self,
+        state: np.ndarray,
+        tree: Optional[SearchTree] = None,
+        num_searches: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Returns the visit distribution over the actions of ``state``. Each
+        determinization runs up to ``num_searches`` simulations, and all of
+        them ``time_budget`` seconds (both default to the args); ``tree`` is
+        not used.
+        """
+        forced_probs = forced_action_probs(self.ai_game_state_transition_helper, state)
+        if forced_probs is not None:
+            return forced_probs
+        determinizations = [
+            self.sample_determinization(state)
+            for _ in range(self.args.get("determinizations", 8))
+        ]
+        seeds = np.random.randint(2**31, size=len(determinizations)).tolist()
+        # the time budget is for the whole move, not for each determinization
+        if time_budget is None:
+            time_budget = self.args.get("time_budget")
+        workers = worker_count(self.args)
+        visit_counts = np.zeros(self.ai_game_state_transition_helper.action_size)
+        if workers > 1:
+            if self.pool is None:
+                self.pool = create_search_pool(self.args, self.model, workers)
+            # each worker runs its share of the searches one after another
+            share = time_budget
+            if time_budget is not None:
+                share = time_budget / math.ceil(len(determinizations) / workers)
+            futures = [
+                submit_search(self.pool, determinization, seed, num_searches, share)
+                for determinization, seed in zip(determinizations, seeds)
+            ]
+            for future in futures:
+                visit_counts += future.result()
+        else:
+            if self.local_mcts is None:
+                self.local_mcts = MCTS(
+                    self.args, self.ai_game_state_transition_helper, self.model
+                )
+            deadline = None if time_budget is None else time.monotonic() + time_budget
+            for index, (determinization, seed) in enumerate(
+                zip(determinizations, seeds)
+            ):
+                share = None
+                if deadline is not None:
+                    # the searches left share the time left
+                    share = max(0.0, deadline - time.monotonic()) / (
+                        len(determinizations) - index
+                    )
+                visit_counts += search_visit_counts(
+                    self.local_mcts, determinization, seed, num_searches, share
+                )
+        return visit_counts / np.sum(visit_counts)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+# public position hash, color to move
+EvaluationKey = Tuple[int, int]
+
+
+class EvaluationCache:
+    """
+    Bounded LRU map from (public position hash, color to move) to the network
+    output of the position: the softmaxed, masked policy and the value.
+
+    One cache may be shared by every MCTS of a process, so lookups and
+    stores are serialized by a lock. The arrays stored are never written to.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.entries: "OrderedDict[EvaluationKey, Tuple[np.ndarray, float]]" = (
+            OrderedDict()
+        )
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, key: EvaluationKey) -> Optional[Tuple[np.ndarray, float]]:
+        with self.lock:
+            evaluation = self.entries.get(key)
+            if evaluation is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return evaluation
+
+    def store(self, key: EvaluationKey, policy: np.ndarray, value: float) -> None:
+        with self.lock:
+            self.entries[key] = (policy, value)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
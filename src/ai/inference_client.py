@@ -0,0 +1,45 @@
+import threading
+from multiprocessing.connection import Client, Connection
+from typing import Any, Dict, Optional, Tuple
+import torch  # type: ignore
+
+
+class InferenceClient:
+    """
+    Connection to an InferenceServer, called like ResNet: a (B, 16, 4, 8)
+    tensor in, policy logits and values out. Calls from several threads are
+    serialized. The Unix socket is only opened on the first call and is not
+    pickled, so a client can be handed to worker processes.
+    """
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.device = torch.device("cpu")
+        self.connection: Optional[Connection] = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"address": self.address}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["address"])  # type: ignore
+
+    def __call__(self, states: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        with self.lock:
+            if self.connection is None:
+                self.connection = Client(self.address, family="AF_UNIX")
+            self.connection.send(states.cpu().numpy())
+            reply = self.connection.recv()
+        if isinstance(reply, Exception):
+            raise reply
+        policies, values = reply
+        return torch.from_numpy(policies), torch.from_numpy(values)
+
+    def eval(self) -> "InferenceClient":
+        return self
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
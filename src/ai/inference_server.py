@@ -0,0 +1,205 @@
+import os
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.inference_client import InferenceClient
+from src.ai.model_export import InferenceModel
+from src.ai.search_pool import load_model, model_source, spawn_context
+
+# client connection and its (B, 16, 4, 8) encoded states, None asking to stop
+InferenceRequest = Tuple[Connection, Optional[np.ndarray]]
+# requests of a batch, the stop request (None) left out
+InferenceBatch = List[Tuple[Connection, np.ndarray]]
+
+
+def _read_requests(
+    connection: Connection, requests: "queue.Queue[InferenceRequest]"
+) -> None:
+    try:
+        while True:
+            requests.put((connection, connection.recv()))
+    except (EOFError, OSError):
+        # the client closed its end
+        connection.close()
+
+
+def _accept_clients(
+    listener: Listener, requests: "queue.Queue[InferenceRequest]"
+) -> None:
+    while True:
+        try:
+            connection = listener.accept()
+        except OSError:
+            return
+        threading.Thread(
+            target=_read_requests, args=(connection, requests), daemon=True
+        ).start()
+
+
+def next_batch(
+    requests: "queue.Queue[InferenceRequest]", max_batch_size: int, max_wait: float
+) -> Tuple[InferenceBatch, bool]:
+    """
+    Requests holding up to ``max_batch_size`` states, or as many as arrived
+    within ``max_wait`` seconds of the first, and whether to stop serving.
+    """
+    connection, states = requests.get()
+    if states is None:
+        return [], True
+    batch = [(connection, states)]
+    size = len(states)
+    deadline = time.monotonic() + max_wait
+    while size < max_batch_size:
+        try:
+            connection, states = requests.get(
+                timeout=max(deadline - time.monotonic(), 0)
+            )
+        except queue.Empty:
+            break
+        if states is None:
+            return batch, True
+        batch.append((connection, states))
+        size += len(states)
+    return batch, False
+
+
+def _reply(connection: Connection, reply: Any) -> None:
+    try:
+        connection.send(reply)
+    except OSError:
+        # the client went away while its states were evaluated
+        pass
+
+
+def serve(
+    listener: Listener,
+    model: InferenceModel,
+    max_batch_size: int,
+    max_wait: float,
+    ready: Any,
+    batches: Any,
+    positions: Any,
+) -> None:
+    """Answers the requests of the clients of ``listener`` until asked to stop."""
+    requests: "queue.Queue[InferenceRequest]" = queue.Queue()
+    threading.Thread(
+        target=_accept_clients, args=(listener, requests), daemon=True
+    ).start()
+    ready.set()
+    stopped = False
+    while not stopped:
+        batch, stopped = next_batch(requests, max_batch_size, max_wait)
+        if len(batch) == 0:
+            continue
+        states = np.concatenate([states for _, states in batch])
+        try:
+            with torch.no_grad():
+                policies, values = model(torch.from_numpy(states).to(model.device))
+            policies, values = policies.cpu().numpy(), values.cpu().numpy()
+        except Exception as error:
+            for connection, _ in batch:
+                _reply(connection, error)
+            continue
+        with batches.get_lock():
+            batches.value += 1
+        with positions.get_lock():
+            positions.value += len(states)
+        start = 0
+        for connection, request_states in batch:
+            end = start + len(request_states)
+            _reply(connection, (policies[start:end], values[start:end]))
+            start = end
+
+
+def _run_server(
+    address: str,
+    source: Tuple[Any, ...],
+    max_batch_size: int,
+    max_wait: float,
+    ready: Any,
+    batches: Any,
+    positions: Any,
+) -> None:
+    # Ctrl+C reaches the whole process group, the parent stops the server
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    model = load_model(source, AIGameStateTransitionHelper())
+    # closing the listener also removes the socket file
+    with Listener(address, family="AF_UNIX") as listener:
+        serve(listener, model, max_batch_size, max_wait, ready, batches, positions)
+
+
+class InferenceServer:
+    """
+    Process holding the only copy of the network for every search of the
+    machine. Clients send encoded states over a Unix socket; requests from
+    different games are batched until ``max_batch_size`` states are waiting
+    or the first one has waited ``max_wait`` seconds.
+
+    Without an ``address`` the socket is created in a private temporary
+    directory, which is removed by ``stop``.
+    """
+
+    def __init__(
+        self,
+        model: InferenceModel,
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+        address: Optional[str] = None,
+    ) -> None:
+        self.directory: Optional[str] = None
+        if not address:
+            self.directory = tempfile.mkdtemp(prefix="inference-server-")
+            address = os.path.join(self.directory, "socket")
+        self.address = address
+        context = spawn_context()
+        self.ready = context.Event()
+        self.batches = context.Value("q", 0)
+        self.positions = context.Value("q", 0)
+        self.process = context.Process(
+            target=_run_server,
+            args=(
+                self.address,
+                model_source(model),
+                max_batch_size,
+                max_wait,
+                self.ready,
+                self.batches,
+                self.positions,
+            ),
+            daemon=True,
+        )
+
+    def start(self, timeout: float = 60.0) -> None:
+        self.process.start()
+        if not self.ready.wait(timeout):
+            self.process.terminate()
+            raise RuntimeError("The inference server did not start")
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            with Client(self.address, family="AF_UNIX") as connection:
+                connection.send(None)
+            self.process.join()
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def client(self) -> InferenceClient:
+        return InferenceClient(self.address)
+
+    def mean_batch_size(self) -> float:
+        return self.positions.value / self.batches.value if self.batches.value else 0.0
+
+    def __enter__(self) -> "InferenceServer":
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
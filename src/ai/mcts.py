@@ -1,9 +1,71 @@
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
 import torch  # type: ignore
 import numpy as np
 from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
-from src.ai.res_net import ResNet
-from src.ai.node import Node
+from src.ai.compact_state import CompactState
+from src.ai.evaluation_cache import EvaluationCache, EvaluationKey
+from src.ai.model_export import InferenceModel
+from src.ai.search_tree import SearchTree
+from src.ai.symmetry import SymmetricModel
+from src.ai.transposition_table import TranspositionTable
+
+
+def forced_action_probs(
+    ai_game_state_transition_helper: AIGameStateTransitionHelper, state: np.ndarray
+) -> Optional[np.ndarray]:
+    """The distribution of the only legal action of ``state``, if there is one."""
+    valid_moves = ai_game_state_transition_helper.get_valid_moves(state)
+    if np.count_nonzero(valid_moves) != 1:
+        return None
+    return valid_moves.astype(np.float64)
+
+
+class SearchBudget:
+    """
+    Simulation and wall-clock budget of one search. The search is over when
+    either runs out, or, with ``early_stop``, when the most visited root child
+    leads the second by more visits than the simulations left can give.
+    With a time budget, the simulations left are estimated from the rate so
+    far.
+    """
+
+    def __init__(
+        self,
+        num_searches: int,
+        time_budget: Optional[float] = None,
+        early_stop: bool = True,
+        simulations: int = 0,
+    ) -> None:
+        self.num_searches = num_searches
+        self.early_stop = early_stop
+        self.start_simulations = min(simulations, num_searches)
+        self.start_time = time.monotonic()
+        self.deadline = None if time_budget is None else self.start_time + time_budget
+
+    def remaining(self, simulations: int) -> float:
+        remaining: float = self.num_searches - simulations
+        if self.deadline is not None:
+            now = time.monotonic()
+            if now >= self.deadline:
+                return 0
+            done = simulations - self.start_simulations
+            if done > 0:
+                rate = done / (now - self.start_time)
+                remaining = min(remaining, rate * (self.deadline - now))
+        return remaining
+
+    def is_exhausted(self, tree: SearchTree, simulations: int) -> bool:
+        remaining = self.remaining(simulations)
+        if remaining <= 0:
+            return True
+        if not self.early_stop:
+            return False
+        children = tree.children(0)
+        if len(children) < 2:
+            return True
+        runner_up, best = np.partition(tree.visit_count[children], -2)[-2:]
+        return best - runner_up > remaining
 
 
 class MCTS:
@@ -11,17 +73,127 @@ class MCTS:
         self,
         args: Dict[str, Any],
         ai_game_state_transition_helper: AIGameStateTransitionHelper,
-        model: ResNet,
+        model: InferenceModel,
+        evaluation_cache: Optional[EvaluationCache] = None,
     ):
         self.args = args
-        self.model = model
+        self.model: Union[InferenceModel, SymmetricModel] = (
+            SymmetricModel(model) if args.get("symmetry_averaging", False) else model
+        )
         self.ai_game_state_transition_helper = ai_game_state_transition_helper
+        self.tree: Optional[SearchTree] = None
+        self.transposition_table: Optional[TranspositionTable] = (
+            TranspositionTable(args["transposition_table_size"])
+            if args.get("transposition_table_size", 0) > 0
+            else None
+        )
+        # network input of the leaves, grown to the largest batch seen
+        self.encoded_states = np.empty(
+            (
+                args.get("batch_size", 1),
+                16,
+                ai_game_state_transition_helper.row_count,
+                ai_game_state_transition_helper.column_count,
+            ),
+            dtype=np.float32,
+        )
+        # given to share one cache between searches, else one of our own
+        self.evaluation_cache: Optional[EvaluationCache] = evaluation_cache
+        if evaluation_cache is None and args.get("evaluation_cache_size", 0) > 0:
+            self.evaluation_cache = EvaluationCache(args["evaluation_cache_size"])
+
+    def new_game(self) -> None:
+        """
+        Forgets the transposition entries of earlier games. Their keys include
+        the hidden identities of their deals, so they are not met again and
+        would only crowd the entries of the new game out of the table.
+        """
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+
+    def evaluation_keys(self, states: List[np.ndarray]) -> List[EvaluationKey]:
+        """
+        Cache keys of a batch of states: the pieces on view and the color to
+        move, all the network input and the legal actions depend on. Unlike
+        the Zobrist key, they leave out the hidden identities of the covered
+        pieces, which the network cannot see.
+        """
+        stacked_states = np.stack(states)
+        colors = stacked_states[
+            np.arange(len(states)), 2, 0, stacked_states[:, 2, 0, 0]
+        ]
+        hashes = self.ai_game_state_transition_helper.public_hashes(stacked_states)
+        return list(zip(hashes.tolist(), colors.tolist()))
+
+    def evaluate(self, states: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Masked, normalized policies and values of a batch of leaf states.
+        Positions in the evaluation cache are not run through the network,
+        and a position repeated within the batch is run once.
+        """
+        if self.evaluation_cache is None:
+            return self.evaluate_with_model(states)
+        policies = np.empty(
+            (len(states), self.ai_game_state_transition_helper.action_size)
+        )
+        values = np.empty(len(states))
+        # first index in the batch of every key missing from the cache
+        missing: Dict[EvaluationKey, int] = {}
+        keys = self.evaluation_keys(states)
+        for index, key in enumerate(keys):
+            if key in missing:
+                continue
+            evaluation = self.evaluation_cache.lookup(key)
+            if evaluation is None:
+                missing[key] = index
+            else:
+                policies[index], values[index] = evaluation
+        if len(missing) > 0:
+            missing_policies, missing_values = self.evaluate_with_model(
+                [states[index] for index in missing.values()]
+            )
+            for key, policy, value in zip(missing, missing_policies, missing_values):
+                self.evaluation_cache.store(key, policy, float(value))
+            evaluated = dict(zip(missing, zip(missing_policies, missing_values)))
+            for index, key in enumerate(keys):
+                if key in evaluated:
+                    policies[index], values[index] = evaluated[key]
+        return policies, values
 
     @torch.no_grad()
-    def search(self, state: np.ndarray):
-        root = Node(
-            self.ai_game_state_transition_helper, self.args, state, visit_count=1
+    def evaluate_with_model(
+        self, states: List[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Masked, normalized policies and values of a batch, from the network."""
+        if len(states) > len(self.encoded_states):
+            self.encoded_states = np.empty(
+                (len(states), *self.encoded_states.shape[1:]), dtype=np.float32
+            )
+        stacked_states = np.stack(states)
+        encoded_states = self.ai_game_state_transition_helper.get_encoded_states(
+            stacked_states, self.encoded_states[: len(states)]
+        )
+        # the buffer is only reused once the forward pass is over
+        policies, values = self.model(
+            torch.from_numpy(encoded_states).to(self.model.device)
+        )
+        policies = torch.softmax(policies, axis=1).cpu().numpy()
+        valid_moves = self.ai_game_state_transition_helper.get_valid_moves_batch(
+            stacked_states
+        )
+        if not np.all(np.any(valid_moves, axis=1)):
+            raise Exception("Error")
+        policies *= valid_moves
+        totals = np.sum(policies, axis=1, keepdims=True)
+        np.divide(policies, totals, out=policies, where=totals > 0)
+        return policies, values.squeeze(1).cpu().numpy()
+
+    def expand_root(self, state: np.ndarray) -> SearchTree:
+        tree = SearchTree(
+            self.args.get("tree_capacity", 1 << 14),
+            self.args.get("chance_nodes", True),
         )
+        tree.visit_count[0] = 1
 
         policy, _ = self.model(
             torch.tensor(
@@ -45,48 +217,191 @@ class MCTS:
         policy *= valid_moves
         policy /= np.sum(policy)
 
-        root.expand(policy)
+        tree.expand(0, policy)
+        return tree
 
-        for _ in range(self.args["num_searches"]):
-            node = root
+    def add_root_noise(self, tree: SearchTree) -> None:
+        children = tree.children(0)
+        noise = np.random.dirichlet([self.args["dirichlet_alpha"]] * len(children))
+        tree.prior[children] = (1 - self.args["dirichlet_epsilon"]) * tree.prior[
+            children
+        ] + self.args["dirichlet_epsilon"] * noise
 
-            while node.is_fully_expanded():
-                node = node.select()
+    def prepare_tree(
+        self, state: np.ndarray, tree: Optional[SearchTree]
+    ) -> Tuple[SearchTree, int]:
+        """
+        The tree to search ``state`` with and the simulations it already holds.
+        A reused tree gets fresh root noise, a new one is expanded from the
+        network. The tree is left in self.tree.
+        """
+        if tree is not None and tree.is_expanded(0):
+            self.add_root_noise(tree)
+            simulations = int(tree.visit_count[0])
+        else:
+            tree = self.expand_root(state)
+            simulations = 0
+        self.tree = tree
+        return tree, simulations
 
-            value, is_terminal = (
-                self.ai_game_state_transition_helper.get_value_and_terminated(
-                    node.state, node.action_taken, current=True
-                )
+    def select_leaf(
+        self, tree: SearchTree, search_state: CompactState
+    ) -> Tuple[int, np.ndarray, int]:
+        """
+        Walks down from the root, adding virtual loss on the way, and returns
+        the leaf node, its state and its position hash. ``search_state`` is
+        back at the root afterwards.
+        """
+        c = self.args["C"]
+        virtual_loss = self.args.get("virtual_loss", 1.0)
+        outcome_cap = self.args.get("chance_outcome_cap", 4)
+        node = 0
+        while True:
+            if tree.is_chance[node]:
+                if not tree.is_expanded(node):
+                    tree.expand_chance(node, search_state.hidden_pool())
+                node = tree.select_outcome(node, outcome_cap)
+                search_state.make(int(tree.action[node]), int(tree.outcome[node]))
+            elif tree.is_expanded(node):
+                node = tree.select(node, c, virtual_loss)
+                # a reveal is made once its outcome is drawn
+                if not tree.is_chance[node]:
+                    search_state.make(int(tree.action[node]))
+            else:
+                break
+
+        leaf_state = search_state.to_array()
+        key = search_state.state_hash()
+        while search_state.undo_stack:
+            search_state.unmake()
+        return node, leaf_state, key
+
+    def resolve_leaf(
+        self,
+        tree: SearchTree,
+        node: int,
+        leaf_state: np.ndarray,
+        key: int,
+        outcome: Optional[Tuple[int, bool]] = None,
+    ) -> bool:
+        """
+        Backpropagates a terminal leaf or one found in the transposition
+        table. Returns False when the leaf needs the network. ``outcome`` is
+        the leaf's get_value_and_terminated, when already known.
+        """
+        value, is_terminal = (
+            outcome
+            if outcome is not None
+            else self.ai_game_state_transition_helper.get_value_and_terminated(
+                leaf_state,
+                None if node == 0 else int(tree.action[node]),
+                current=True,
+            )
+        )
+        # a float, as the value found in the transposition table
+        leaf_value: float = self.ai_game_state_transition_helper.get_opponent_value(
+            value
+        )
+        if not is_terminal:
+            entry = (
+                None
+                if self.transposition_table is None
+                else self.transposition_table.lookup(key)
             )
-            value = self.ai_game_state_transition_helper.get_opponent_value(value)
-            if not is_terminal:
-                policy, values = self.model(
-                    torch.tensor(
-                        self.ai_game_state_transition_helper.get_encoded_state(
-                            node.state
-                        ),
-                        device=self.model.device,
-                    ).unsqueeze(0)
-                )
-                policy = torch.softmax(policy, axis=1).squeeze(0).cpu().numpy()
-                valid_moves = self.ai_game_state_transition_helper.get_valid_moves(
-                    node.state
-                )
-                if len(np.where(valid_moves > 0)[0]) == 0:
-                    raise Exception("Error")
-                policy *= valid_moves
-                if np.sum(policy) > 0:
-                    policy /= np.sum(policy)
-
-                value = values.item()
-
-                node.expand(policy)
-
-            node.backpropagate(value)
-
-        action_probs = np.zeros(self.ai_game_state_transition_helper.action_size)
-        for child in root.children:
-            if child is not None:
-                action_probs[child.action_taken] = child.visit_count
+            if entry is None:
+                return False
+            tree.set_entry(node, entry)
+            if not tree.is_expanded(node):
+                tree.expand(node, entry.policy)
+            leaf_value = entry.value
+
+        tree.revert_virtual_loss(node)
+        tree.backpropagate(node, leaf_value)
+        return True
+
+    def complete_leaf(
+        self, tree: SearchTree, node: int, key: int, policy: np.ndarray, value: float
+    ) -> None:
+        """Expands and backpropagates a leaf with its network evaluation."""
+        if self.transposition_table is not None:
+            tree.set_entry(node, self.transposition_table.store(key, policy, value))
+        # the same leaf may have been selected twice in one batch
+        if not tree.is_expanded(node):
+            tree.expand(node, policy)
+        tree.revert_virtual_loss(node)
+        tree.backpropagate(node, value)
+
+    def visit_distribution(self, tree: SearchTree) -> np.ndarray:
+        action_probs = tree.root_visit_counts(
+            self.ai_game_state_transition_helper.action_size
+        )
+        if np.sum(action_probs) == 0:
+            # the budget ran out before the first simulation
+            children = tree.children(0)
+            action_probs[tree.action[children]] = tree.prior[children]
         action_probs /= np.sum(action_probs)
         return action_probs
+
+    def search_budget(
+        self,
+        simulations: int,
+        num_searches: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> SearchBudget:
+        """Budget of a search, num_searches and time_budget defaulting to the args."""
+        return SearchBudget(
+            self.args["num_searches"] if num_searches is None else num_searches,
+            self.args.get("time_budget") if time_budget is None else time_budget,
+            self.args.get("early_stop", True),
+            simulations,
+        )
+
+    @torch.no_grad()
+    def search(
+        self,
+        state: np.ndarray,
+        tree: Optional[SearchTree] = None,
+        num_searches: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ):
+        """
+        Returns the visit distribution over the actions of ``state``.
+        ``tree`` may be a subtree kept from an earlier search whose root is
+        ``state``; its statistics are kept and only the missing simulations
+        are run. The tree searched is left in self.tree.
+
+        The search runs up to ``num_searches`` simulations and, if given,
+        ``time_budget`` seconds (both default to the args), and stops early
+        once the best move is decided. With a single legal move it returns
+        at once, without a tree.
+        """
+        forced_probs = forced_action_probs(self.ai_game_state_transition_helper, state)
+        if forced_probs is not None:
+            self.tree = None
+            return forced_probs
+
+        # the only state of the search, walked down with make() and back with unmake()
+        search_state = CompactState.from_array(state)
+        tree, simulations = self.prepare_tree(state, tree)
+        budget = self.search_budget(simulations, num_searches, time_budget)
+        simulations = min(simulations, budget.num_searches)
+
+        batch_size = self.args.get("batch_size", 1)
+        while not budget.is_exhausted(tree, simulations):
+            # leaves waiting for the network: node, leaf state, position hash
+            pending: List[Tuple[int, np.ndarray, int]] = []
+            for _ in range(min(batch_size, budget.num_searches - simulations)):
+                simulations += 1
+                node, leaf_state, key = self.select_leaf(tree, search_state)
+                if not self.resolve_leaf(tree, node, leaf_state, key):
+                    pending.append((node, leaf_state, key))
+
+            if len(pending) == 0:
+                continue
+            policies, values = self.evaluate(
+                [leaf_state for _, leaf_state, _ in pending]
+            )
+            for (node, _, key), policy, value in zip(pending, policies, values):
+                self.complete_leaf(tree, node, key, policy, value)
+
+        return self.visit_distribution(tree)
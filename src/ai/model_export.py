@@ -0,0 +1,163 @@
+import copy
+import random
+import warnings
+from typing import Any, Dict, List, Tuple, Union
+import numpy as np
+import torch  # type: ignore
+from torch.ao.quantization import fuse_modules  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.inference_client import InferenceClient
+from src.ai.res_net import ResNet
+from src.game_state import GameState
+
+BACKENDS = ("eager", "torchscript", "onnx")
+
+
+def fusion_groups(model: ResNet) -> List[List[str]]:
+    """Conv + BN (+ ReLU) module groups of ``model`` that can be fused."""
+    groups = [
+        [f"{head}.0", f"{head}.1", f"{head}.2"]
+        for head in ("start_block", "policy_head", "value_head")
+    ]
+    for index in range(len(model.back_bone)):
+        # the ReLUs of a ResBlock are functional, so only Conv + BN fuse
+        groups.append([f"back_bone.{index}.conv1", f"back_bone.{index}.bn1"])
+        groups.append([f"back_bone.{index}.conv2", f"back_bone.{index}.bn2"])
+    return groups
+
+
+def fuse_conv_bn(model: ResNet) -> ResNet:
+    """Copy of ``model`` in eval mode with every BatchNorm folded into its Conv."""
+    fused = copy.deepcopy(model).eval()
+    return fuse_modules(fused, fusion_groups(fused))
+
+
+def example_input(model: ResNet, batch_size: int = 1) -> torch.Tensor:
+    helper = model.ai_game_state_transition_helper
+    return torch.zeros(
+        (batch_size, 16, helper.row_count, helper.column_count),
+        device=model.device,
+    )
+
+
+def save_torchscript(
+    module: torch.nn.Module, example: torch.Tensor, path: str
+) -> torch.jit.ScriptModule:
+    """Traces ``module`` on ``example``, freezes it and saves it to ``path``."""
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        traced = torch.jit.freeze(torch.jit.trace(module, example).eval())
+    traced.save(path)
+    return traced
+
+
+def export_torchscript(model: ResNet, path: str) -> torch.jit.ScriptModule:
+    """Saves the fused ``model`` to ``path`` as frozen TorchScript."""
+    fused = fuse_conv_bn(model)
+    return save_torchscript(fused, example_input(fused), path)
+
+
+def export_onnx(model: ResNet, path: str) -> None:
+    """Exports the fused ``model`` to ONNX, with a dynamic batch size."""
+    fused = fuse_conv_bn(model)
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        torch.onnx.export(
+            fused,
+            (example_input(fused),),
+            path,
+            input_names=["states"],
+            output_names=["policy", "value"],
+            dynamic_axes={
+                "states": {0: "batch"},
+                "policy": {0: "batch"},
+                "value": {0: "batch"},
+            },
+            dynamo=False,
+        )
+
+
+class ExportedModel:
+    """
+    Exported model called like ResNet: a (B, 16, 4, 8) tensor in, policy
+    logits and values out. ``backend`` is "torchscript" or "onnx", the latter
+    run by onnxruntime.
+    """
+
+    def __init__(self, backend: str, path: str) -> None:
+        self.backend = backend
+        self.path = path
+        self.device = torch.device("cpu")
+        self.runtime: Any
+        match (backend):
+            case "torchscript":
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", FutureWarning)
+                    self.runtime = torch.jit.load(path, map_location=self.device)
+            case "onnx":
+                # optional dependency, only needed for this backend
+                import onnxruntime  # type: ignore
+
+                self.runtime = onnxruntime.InferenceSession(
+                    path, providers=["CPUExecutionProvider"]
+                )
+            case _:
+                raise ValueError(f"Unknown exported model backend: {backend}")
+
+    def __call__(self, states: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        if self.backend == "torchscript":
+            return self.runtime(states)
+        policy, value = self.runtime.run(None, {"states": states.cpu().numpy()})
+        return torch.from_numpy(policy), torch.from_numpy(value)
+
+    def eval(self) -> "ExportedModel":
+        return self
+
+
+InferenceModel = Union[ResNet, ExportedModel, InferenceClient]
+
+
+@torch.no_grad()
+def parity_report(
+    model: ResNet, exported: InferenceModel, states: np.ndarray
+) -> Dict[str, float]:
+    """
+    Differences between the eager ``model`` and ``exported`` on a (B, 3, 4, 8)
+    batch of states: largest policy (softmaxed) and value errors, value mean
+    squared error, and how often both pick the same top policy action.
+    """
+    helper: AIGameStateTransitionHelper = model.ai_game_state_transition_helper
+    encoded_states = torch.from_numpy(helper.get_encoded_states(states))
+    model.eval()
+    policy, value = model(encoded_states.to(model.device))
+    exported_policy, exported_value = exported(encoded_states.to(exported.device))
+    policy = torch.softmax(policy, dim=1).cpu().numpy()
+    exported_policy = torch.softmax(exported_policy, dim=1).cpu().numpy()
+    value, exported_value = value.cpu().numpy(), exported_value.cpu().numpy()
+    return {
+        "positions": len(states),
+        "policy_max_abs_error": float(np.max(np.abs(policy - exported_policy))),
+        "value_max_abs_error": float(np.max(np.abs(value - exported_value))),
+        "value_mse": float(np.mean((value - exported_value) ** 2)),
+        "top1_agreement": float(
+            np.mean(np.argmax(policy, axis=1) == np.argmax(exported_policy, axis=1))
+        ),
+    }
+
+
+def sample_positions(count: int, seed: int = 0) -> np.ndarray:
+    """(count, 3, 4, 8) states met in random games, for checking exported models."""
+    random.seed(seed)
+    helper = AIGameStateTransitionHelper()
+    positions: List[np.ndarray] = []
+    while len(positions) < count:
+        state = helper.get_initial_state(GameState())
+        for _ in range(200):
+            actions = helper.calculate_valid_action(state, state[2][0][0])
+            if not actions or len(positions) == count:
+                break
+            positions.append(state.copy())
+            state = helper.change_perspective(
+                helper.get_next_state(state, random.choice(actions))
+            )
+    return np.stack(positions)
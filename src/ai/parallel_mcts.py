@@ -0,0 +1,222 @@
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.compact_state import CompactState
+from src.ai.mcts import MCTS, SearchBudget, forced_action_probs
+from src.ai.model_export import InferenceModel
+from src.ai.search_pool import create_search_pool, submit_search, worker_count
+from src.ai.search_tree import SearchTree
+
+
+class RootParallelMCTS:
+    """
+    Root parallelism: every worker process searches its own tree of the same
+    position, with its own root noise, and the root visit counts are added
+    up. num_searches is split between the workers.
+    """
+
+    def __init__(
+        self,
+        args: Dict[str, Any],
+        ai_game_state_transition_helper: AIGameStateTransitionHelper,
+        model: InferenceModel,
+    ):
+        self.workers = worker_count(args)
+        self.args = {
+            **args,
+            "num_searches": math.ceil(args["num_searches"] / self.workers),
+        }
+        self.model = model
+        self.ai_game_state_transition_helper = ai_game_state_transition_helper
+        # no tree is kept, so the agent does not reuse one
+        self.tree = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    def search(
+        self,
+        state: np.ndarray,
+        tree: Optional[SearchTree] = None,
+        num_searches: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Returns the visit distribution over the actions of ``state``. The
+        workers share ``num_searches`` simulations and each search for
+        ``time_budget`` seconds (both default to the args); ``tree`` is not
+        used.
+        """
+        forced_probs = forced_action_probs(self.ai_game_state_transition_helper, state)
+        if forced_probs is not None:
+            return forced_probs
+        if self.pool is None:
+            self.pool = create_search_pool(self.args, self.model, self.workers)
+        if num_searches is not None:
+            num_searches = math.ceil(num_searches / self.workers)
+        seeds = np.random.randint(2**31, size=self.workers).tolist()
+        futures = [
+            submit_search(self.pool, state, seed, num_searches, time_budget)
+            for seed in seeds
+        ]
+        visit_counts = np.sum([future.result() for future in futures], axis=0)
+        return visit_counts / np.sum(visit_counts)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+class InferenceWorker:
+    """
+    Thread running the network for the search threads. Requests are batched
+    until ``max_batch_size`` leaves are waiting or the first one has waited
+    ``max_wait`` seconds.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[List[np.ndarray]], Tuple[np.ndarray, np.ndarray]],
+        max_batch_size: int,
+        max_wait: float,
+    ) -> None:
+        self.evaluate_batch = evaluate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.requests: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = (
+            queue.Queue()
+        )
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.batches = 0
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.requests.put(None)
+        self.thread.join()
+
+    def evaluate(self, state: np.ndarray) -> Tuple[np.ndarray, float]:
+        future: Future = Future()
+        self.requests.put((state, future))
+        return future.result()
+
+    def next_batch(self) -> Tuple[List[Tuple[np.ndarray, Future]], bool]:
+        """Waiting requests, and whether the worker was asked to stop."""
+        request = self.requests.get()
+        if request is None:
+            return [], True
+        batch = [request]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self.requests.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def run(self) -> None:
+        stopped = False
+        while not stopped:
+            batch, stopped = self.next_batch()
+            if len(batch) == 0:
+                continue
+            try:
+                # grad mode is per thread
+                with torch.no_grad():
+                    policies, values = self.evaluate_batch(
+                        [state for state, _ in batch]
+                    )
+            except Exception as error:
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            self.batches += 1
+            for (_, future), policy, value in zip(batch, policies, values):
+                future.set_result((policy, value))
+
+
+class TreeParallelMCTS(MCTS):
+    """
+    Tree parallelism: search_workers threads run simulations on one shared
+    tree. Tree updates are serialized by a lock and spread over paths by the
+    virtual loss. Leaves go to a central InferenceWorker, which batches them
+    and runs the network while the other threads select.
+    """
+
+    def __init__(
+        self,
+        args: Dict[str, Any],
+        ai_game_state_transition_helper: AIGameStateTransitionHelper,
+        model: InferenceModel,
+    ):
+        super().__init__(args, ai_game_state_transition_helper, model)
+        self.workers = worker_count(args)
+        self.lock = threading.Lock()
+        self.simulations = 0
+
+    def run_simulations(
+        self,
+        tree: SearchTree,
+        state: np.ndarray,
+        inference: InferenceWorker,
+        budget: SearchBudget,
+    ) -> None:
+        search_state = CompactState.from_array(state)
+        while True:
+            with self.lock:
+                if budget.is_exhausted(tree, self.simulations):
+                    return
+                self.simulations += 1
+                node, leaf_state, key = self.select_leaf(tree, search_state)
+                if self.resolve_leaf(tree, node, leaf_state, key):
+                    continue
+            policy, value = inference.evaluate(leaf_state)
+            with self.lock:
+                self.complete_leaf(tree, node, key, policy, value)
+
+    @torch.no_grad()
+    def search(
+        self,
+        state: np.ndarray,
+        tree: Optional[SearchTree] = None,
+        num_searches: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ):
+        """
+        Returns the visit distribution over the actions of ``state``, see
+        MCTS.search.
+        """
+        forced_probs = forced_action_probs(self.ai_game_state_transition_helper, state)
+        if forced_probs is not None:
+            self.tree = None
+            return forced_probs
+
+        tree, simulations = self.prepare_tree(state, tree)
+        budget = self.search_budget(simulations, num_searches, time_budget)
+        self.simulations = min(simulations, budget.num_searches)
+        inference = InferenceWorker(
+            self.evaluate, self.workers, self.args.get("inference_wait", 0.001)
+        )
+        inference.start()
+        try:
+            with ThreadPoolExecutor(self.workers) as executor:
+                futures = [
+                    executor.submit(
+                        self.run_simulations, tree, state, inference, budget
+                    )
+                    for _ in range(self.workers)
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            inference.stop()
+        return self.visit_distribution(tree)
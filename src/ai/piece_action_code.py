@@ -1,921 +1,78 @@
-from typing import Dict, Tuple
+from typing import List, Tuple
+import numpy as np
 
-PIECE_ACTION_ENCODE = {
-    "(0,0)-REVEAL-(0,0)": 0,
-    "(0,1)-REVEAL-(0,1)": 1,
-    "(0,2)-REVEAL-(0,2)": 2,
-    "(0,3)-REVEAL-(0,3)": 3,
-    "(0,4)-REVEAL-(0,4)": 4,
-    "(0,5)-REVEAL-(0,5)": 5,
-    "(0,6)-REVEAL-(0,6)": 6,
-    "(0,7)-REVEAL-(0,7)": 7,
-    "(1,0)-REVEAL-(1,0)": 8,
-    "(1,1)-REVEAL-(1,1)": 9,
-    "(1,2)-REVEAL-(1,2)": 10,
-    "(1,3)-REVEAL-(1,3)": 11,
-    "(1,4)-REVEAL-(1,4)": 12,
-    "(1,5)-REVEAL-(1,5)": 13,
-    "(1,6)-REVEAL-(1,6)": 14,
-    "(1,7)-REVEAL-(1,7)": 15,
-    "(2,0)-REVEAL-(2,0)": 16,
-    "(2,1)-REVEAL-(2,1)": 17,
-    "(2,2)-REVEAL-(2,2)": 18,
-    "(2,3)-REVEAL-(2,3)": 19,
-    "(2,4)-REVEAL-(2,4)": 20,
-    "(2,5)-REVEAL-(2,5)": 21,
-    "(2,6)-REVEAL-(2,6)": 22,
-    "(2,7)-REVEAL-(2,7)": 23,
-    "(3,0)-REVEAL-(3,0)": 24,
-    "(3,1)-REVEAL-(3,1)": 25,
-    "(3,2)-REVEAL-(3,2)": 26,
-    "(3,3)-REVEAL-(3,3)": 27,
-    "(3,4)-REVEAL-(3,4)": 28,
-    "(3,5)-REVEAL-(3,5)": 29,
-    "(3,6)-REVEAL-(3,6)": 30,
-    "(3,7)-REVEAL-(3,7)": 31,
-    "(0,0)-MOVE-(0,1)": 32,
-    "(0,0)-MOVE-(1,0)": 33,
-    "(0,1)-MOVE-(0,2)": 34,
-    "(0,1)-MOVE-(0,0)": 35,
-    "(0,1)-MOVE-(1,1)": 36,
-    "(0,2)-MOVE-(0,3)": 37,
-    "(0,2)-MOVE-(0,1)": 38,
-    "(0,2)-MOVE-(1,2)": 39,
-    "(0,3)-MOVE-(0,4)": 40,
-    "(0,3)-MOVE-(0,2)": 41,
-    "(0,3)-MOVE-(1,3)": 42,
-    "(0,4)-MOVE-(0,5)": 43,
-    "(0,4)-MOVE-(0,3)": 44,
-    "(0,4)-MOVE-(1,4)": 45,
-    "(0,5)-MOVE-(0,6)": 46,
-    "(0,5)-MOVE-(0,4)": 47,
-    "(0,5)-MOVE-(1,5)": 48,
-    "(0,6)-MOVE-(0,7)": 49,
-    "(0,6)-MOVE-(0,5)": 50,
-    "(0,6)-MOVE-(1,6)": 51,
-    "(0,7)-MOVE-(0,6)": 52,
-    "(0,7)-MOVE-(1,7)": 53,
-    "(1,0)-MOVE-(1,1)": 54,
-    "(1,0)-MOVE-(2,0)": 55,
-    "(1,0)-MOVE-(0,0)": 56,
-    "(1,1)-MOVE-(1,2)": 57,
-    "(1,1)-MOVE-(1,0)": 58,
-    "(1,1)-MOVE-(2,1)": 59,
-    "(1,1)-MOVE-(0,1)": 60,
-    "(1,2)-MOVE-(1,3)": 61,
-    "(1,2)-MOVE-(1,1)": 62,
-    "(1,2)-MOVE-(2,2)": 63,
-    "(1,2)-MOVE-(0,2)": 64,
-    "(1,3)-MOVE-(1,4)": 65,
-    "(1,3)-MOVE-(1,2)": 66,
-    "(1,3)-MOVE-(2,3)": 67,
-    "(1,3)-MOVE-(0,3)": 68,
-    "(1,4)-MOVE-(1,5)": 69,
-    "(1,4)-MOVE-(1,3)": 70,
-    "(1,4)-MOVE-(2,4)": 71,
-    "(1,4)-MOVE-(0,4)": 72,
-    "(1,5)-MOVE-(1,6)": 73,
-    "(1,5)-MOVE-(1,4)": 74,
-    "(1,5)-MOVE-(2,5)": 75,
-    "(1,5)-MOVE-(0,5)": 76,
-    "(1,6)-MOVE-(1,7)": 77,
-    "(1,6)-MOVE-(1,5)": 78,
-    "(1,6)-MOVE-(2,6)": 79,
-    "(1,6)-MOVE-(0,6)": 80,
-    "(1,7)-MOVE-(1,6)": 81,
-    "(1,7)-MOVE-(2,7)": 82,
-    "(1,7)-MOVE-(0,7)": 83,
-    "(2,0)-MOVE-(2,1)": 84,
-    "(2,0)-MOVE-(3,0)": 85,
-    "(2,0)-MOVE-(1,0)": 86,
-    "(2,1)-MOVE-(2,2)": 87,
-    "(2,1)-MOVE-(2,0)": 88,
-    "(2,1)-MOVE-(3,1)": 89,
-    "(2,1)-MOVE-(1,1)": 90,
-    "(2,2)-MOVE-(2,3)": 91,
-    "(2,2)-MOVE-(2,1)": 92,
-    "(2,2)-MOVE-(3,2)": 93,
-    "(2,2)-MOVE-(1,2)": 94,
-    "(2,3)-MOVE-(2,4)": 95,
-    "(2,3)-MOVE-(2,2)": 96,
-    "(2,3)-MOVE-(3,3)": 97,
-    "(2,3)-MOVE-(1,3)": 98,
-    "(2,4)-MOVE-(2,5)": 99,
-    "(2,4)-MOVE-(2,3)": 100,
-    "(2,4)-MOVE-(3,4)": 101,
-    "(2,4)-MOVE-(1,4)": 102,
-    "(2,5)-MOVE-(2,6)": 103,
-    "(2,5)-MOVE-(2,4)": 104,
-    "(2,5)-MOVE-(3,5)": 105,
-    "(2,5)-MOVE-(1,5)": 106,
-    "(2,6)-MOVE-(2,7)": 107,
-    "(2,6)-MOVE-(2,5)": 108,
-    "(2,6)-MOVE-(3,6)": 109,
-    "(2,6)-MOVE-(1,6)": 110,
-    "(2,7)-MOVE-(2,6)": 111,
-    "(2,7)-MOVE-(3,7)": 112,
-    "(2,7)-MOVE-(1,7)": 113,
-    "(3,0)-MOVE-(3,1)": 114,
-    "(3,0)-MOVE-(2,0)": 115,
-    "(3,1)-MOVE-(3,2)": 116,
-    "(3,1)-MOVE-(3,0)": 117,
-    "(3,1)-MOVE-(2,1)": 118,
-    "(3,2)-MOVE-(3,3)": 119,
-    "(3,2)-MOVE-(3,1)": 120,
-    "(3,2)-MOVE-(2,2)": 121,
-    "(3,3)-MOVE-(3,4)": 122,
-    "(3,3)-MOVE-(3,2)": 123,
-    "(3,3)-MOVE-(2,3)": 124,
-    "(3,4)-MOVE-(3,5)": 125,
-    "(3,4)-MOVE-(3,3)": 126,
-    "(3,4)-MOVE-(2,4)": 127,
-    "(3,5)-MOVE-(3,6)": 128,
-    "(3,5)-MOVE-(3,4)": 129,
-    "(3,5)-MOVE-(2,5)": 130,
-    "(3,6)-MOVE-(3,7)": 131,
-    "(3,6)-MOVE-(3,5)": 132,
-    "(3,6)-MOVE-(2,6)": 133,
-    "(3,7)-MOVE-(3,6)": 134,
-    "(3,7)-MOVE-(2,7)": 135,
-    "(0,0)-EAT-(0,1)": 136,
-    "(0,0)-EAT-(1,0)": 137,
-    "(0,1)-EAT-(0,2)": 138,
-    "(0,1)-EAT-(0,0)": 139,
-    "(0,1)-EAT-(1,1)": 140,
-    "(0,2)-EAT-(0,3)": 141,
-    "(0,2)-EAT-(0,1)": 142,
-    "(0,2)-EAT-(1,2)": 143,
-    "(0,3)-EAT-(0,4)": 144,
-    "(0,3)-EAT-(0,2)": 145,
-    "(0,3)-EAT-(1,3)": 146,
-    "(0,4)-EAT-(0,5)": 147,
-    "(0,4)-EAT-(0,3)": 148,
-    "(0,4)-EAT-(1,4)": 149,
-    "(0,5)-EAT-(0,6)": 150,
-    "(0,5)-EAT-(0,4)": 151,
-    "(0,5)-EAT-(1,5)": 152,
-    "(0,6)-EAT-(0,7)": 153,
-    "(0,6)-EAT-(0,5)": 154,
-    "(0,6)-EAT-(1,6)": 155,
-    "(0,7)-EAT-(0,6)": 156,
-    "(0,7)-EAT-(1,7)": 157,
-    "(1,0)-EAT-(1,1)": 158,
-    "(1,0)-EAT-(2,0)": 159,
-    "(1,0)-EAT-(0,0)": 160,
-    "(1,1)-EAT-(1,2)": 161,
-    "(1,1)-EAT-(1,0)": 162,
-    "(1,1)-EAT-(2,1)": 163,
-    "(1,1)-EAT-(0,1)": 164,
-    "(1,2)-EAT-(1,3)": 165,
-    "(1,2)-EAT-(1,1)": 166,
-    "(1,2)-EAT-(2,2)": 167,
-    "(1,2)-EAT-(0,2)": 168,
-    "(1,3)-EAT-(1,4)": 169,
-    "(1,3)-EAT-(1,2)": 170,
-    "(1,3)-EAT-(2,3)": 171,
-    "(1,3)-EAT-(0,3)": 172,
-    "(1,4)-EAT-(1,5)": 173,
-    "(1,4)-EAT-(1,3)": 174,
-    "(1,4)-EAT-(2,4)": 175,
-    "(1,4)-EAT-(0,4)": 176,
-    "(1,5)-EAT-(1,6)": 177,
-    "(1,5)-EAT-(1,4)": 178,
-    "(1,5)-EAT-(2,5)": 179,
-    "(1,5)-EAT-(0,5)": 180,
-    "(1,6)-EAT-(1,7)": 181,
-    "(1,6)-EAT-(1,5)": 182,
-    "(1,6)-EAT-(2,6)": 183,
-    "(1,6)-EAT-(0,6)": 184,
-    "(1,7)-EAT-(1,6)": 185,
-    "(1,7)-EAT-(2,7)": 186,
-    "(1,7)-EAT-(0,7)": 187,
-    "(2,0)-EAT-(2,1)": 188,
-    "(2,0)-EAT-(3,0)": 189,
-    "(2,0)-EAT-(1,0)": 190,
-    "(2,1)-EAT-(2,2)": 191,
-    "(2,1)-EAT-(2,0)": 192,
-    "(2,1)-EAT-(3,1)": 193,
-    "(2,1)-EAT-(1,1)": 194,
-    "(2,2)-EAT-(2,3)": 195,
-    "(2,2)-EAT-(2,1)": 196,
-    "(2,2)-EAT-(3,2)": 197,
-    "(2,2)-EAT-(1,2)": 198,
-    "(2,3)-EAT-(2,4)": 199,
-    "(2,3)-EAT-(2,2)": 200,
-    "(2,3)-EAT-(3,3)": 201,
-    "(2,3)-EAT-(1,3)": 202,
-    "(2,4)-EAT-(2,5)": 203,
-    "(2,4)-EAT-(2,3)": 204,
-    "(2,4)-EAT-(3,4)": 205,
-    "(2,4)-EAT-(1,4)": 206,
-    "(2,5)-EAT-(2,6)": 207,
-    "(2,5)-EAT-(2,4)": 208,
-    "(2,5)-EAT-(3,5)": 209,
-    "(2,5)-EAT-(1,5)": 210,
-    "(2,6)-EAT-(2,7)": 211,
-    "(2,6)-EAT-(2,5)": 212,
-    "(2,6)-EAT-(3,6)": 213,
-    "(2,6)-EAT-(1,6)": 214,
-    "(2,7)-EAT-(2,6)": 215,
-    "(2,7)-EAT-(3,7)": 216,
-    "(2,7)-EAT-(1,7)": 217,
-    "(3,0)-EAT-(3,1)": 218,
-    "(3,0)-EAT-(2,0)": 219,
-    "(3,1)-EAT-(3,2)": 220,
-    "(3,1)-EAT-(3,0)": 221,
-    "(3,1)-EAT-(2,1)": 222,
-    "(3,2)-EAT-(3,3)": 223,
-    "(3,2)-EAT-(3,1)": 224,
-    "(3,2)-EAT-(2,2)": 225,
-    "(3,3)-EAT-(3,4)": 226,
-    "(3,3)-EAT-(3,2)": 227,
-    "(3,3)-EAT-(2,3)": 228,
-    "(3,4)-EAT-(3,5)": 229,
-    "(3,4)-EAT-(3,3)": 230,
-    "(3,4)-EAT-(2,4)": 231,
-    "(3,5)-EAT-(3,6)": 232,
-    "(3,5)-EAT-(3,4)": 233,
-    "(3,5)-EAT-(2,5)": 234,
-    "(3,6)-EAT-(3,7)": 235,
-    "(3,6)-EAT-(3,5)": 236,
-    "(3,6)-EAT-(2,6)": 237,
-    "(3,7)-EAT-(3,6)": 238,
-    "(3,7)-EAT-(2,7)": 239,
-    "(0,0)-EAT-(0,2)": 240,
-    "(0,0)-EAT-(0,3)": 241,
-    "(0,0)-EAT-(0,4)": 242,
-    "(0,0)-EAT-(0,5)": 243,
-    "(0,0)-EAT-(0,6)": 244,
-    "(0,0)-EAT-(0,7)": 245,
-    "(0,0)-EAT-(2,0)": 246,
-    "(0,0)-EAT-(3,0)": 247,
-    "(0,1)-EAT-(0,3)": 248,
-    "(0,1)-EAT-(0,4)": 249,
-    "(0,1)-EAT-(0,5)": 250,
-    "(0,1)-EAT-(0,6)": 251,
-    "(0,1)-EAT-(0,7)": 252,
-    "(0,1)-EAT-(2,1)": 253,
-    "(0,1)-EAT-(3,1)": 254,
-    "(0,2)-EAT-(0,4)": 255,
-    "(0,2)-EAT-(0,5)": 256,
-    "(0,2)-EAT-(0,6)": 257,
-    "(0,2)-EAT-(0,7)": 258,
-    "(0,2)-EAT-(0,0)": 259,
-    "(0,2)-EAT-(2,2)": 260,
-    "(0,2)-EAT-(3,2)": 261,
-    "(0,3)-EAT-(0,5)": 262,
-    "(0,3)-EAT-(0,6)": 263,
-    "(0,3)-EAT-(0,7)": 264,
-    "(0,3)-EAT-(0,1)": 265,
-    "(0,3)-EAT-(0,0)": 266,
-    "(0,3)-EAT-(2,3)": 267,
-    "(0,3)-EAT-(3,3)": 268,
-    "(0,4)-EAT-(0,6)": 269,
-    "(0,4)-EAT-(0,7)": 270,
-    "(0,4)-EAT-(0,2)": 271,
-    "(0,4)-EAT-(0,1)": 272,
-    "(0,4)-EAT-(0,0)": 273,
-    "(0,4)-EAT-(2,4)": 274,
-    "(0,4)-EAT-(3,4)": 275,
-    "(0,5)-EAT-(0,7)": 276,
-    "(0,5)-EAT-(0,3)": 277,
-    "(0,5)-EAT-(0,2)": 278,
-    "(0,5)-EAT-(0,1)": 279,
-    "(0,5)-EAT-(0,0)": 280,
-    "(0,5)-EAT-(2,5)": 281,
-    "(0,5)-EAT-(3,5)": 282,
-    "(0,6)-EAT-(0,4)": 283,
-    "(0,6)-EAT-(0,3)": 284,
-    "(0,6)-EAT-(0,2)": 285,
-    "(0,6)-EAT-(0,1)": 286,
-    "(0,6)-EAT-(0,0)": 287,
-    "(0,6)-EAT-(2,6)": 288,
-    "(0,6)-EAT-(3,6)": 289,
-    "(0,7)-EAT-(0,5)": 290,
-    "(0,7)-EAT-(0,4)": 291,
-    "(0,7)-EAT-(0,3)": 292,
-    "(0,7)-EAT-(0,2)": 293,
-    "(0,7)-EAT-(0,1)": 294,
-    "(0,7)-EAT-(0,0)": 295,
-    "(0,7)-EAT-(2,7)": 296,
-    "(0,7)-EAT-(3,7)": 297,
-    "(1,0)-EAT-(1,2)": 298,
-    "(1,0)-EAT-(1,3)": 299,
-    "(1,0)-EAT-(1,4)": 300,
-    "(1,0)-EAT-(1,5)": 301,
-    "(1,0)-EAT-(1,6)": 302,
-    "(1,0)-EAT-(1,7)": 303,
-    "(1,0)-EAT-(3,0)": 304,
-    "(1,1)-EAT-(1,3)": 305,
-    "(1,1)-EAT-(1,4)": 306,
-    "(1,1)-EAT-(1,5)": 307,
-    "(1,1)-EAT-(1,6)": 308,
-    "(1,1)-EAT-(1,7)": 309,
-    "(1,1)-EAT-(3,1)": 310,
-    "(1,2)-EAT-(1,4)": 311,
-    "(1,2)-EAT-(1,5)": 312,
-    "(1,2)-EAT-(1,6)": 313,
-    "(1,2)-EAT-(1,7)": 314,
-    "(1,2)-EAT-(1,0)": 315,
-    "(1,2)-EAT-(3,2)": 316,
-    "(1,3)-EAT-(1,5)": 317,
-    "(1,3)-EAT-(1,6)": 318,
-    "(1,3)-EAT-(1,7)": 319,
-    "(1,3)-EAT-(1,1)": 320,
-    "(1,3)-EAT-(1,0)": 321,
-    "(1,3)-EAT-(3,3)": 322,
-    "(1,4)-EAT-(1,6)": 323,
-    "(1,4)-EAT-(1,7)": 324,
-    "(1,4)-EAT-(1,2)": 325,
-    "(1,4)-EAT-(1,1)": 326,
-    "(1,4)-EAT-(1,0)": 327,
-    "(1,4)-EAT-(3,4)": 328,
-    "(1,5)-EAT-(1,7)": 329,
-    "(1,5)-EAT-(1,3)": 330,
-    "(1,5)-EAT-(1,2)": 331,
-    "(1,5)-EAT-(1,1)": 332,
-    "(1,5)-EAT-(1,0)": 333,
-    "(1,5)-EAT-(3,5)": 334,
-    "(1,6)-EAT-(1,4)": 335,
-    "(1,6)-EAT-(1,3)": 336,
-    "(1,6)-EAT-(1,2)": 337,
-    "(1,6)-EAT-(1,1)": 338,
-    "(1,6)-EAT-(1,0)": 339,
-    "(1,6)-EAT-(3,6)": 340,
-    "(1,7)-EAT-(1,5)": 341,
-    "(1,7)-EAT-(1,4)": 342,
-    "(1,7)-EAT-(1,3)": 343,
-    "(1,7)-EAT-(1,2)": 344,
-    "(1,7)-EAT-(1,1)": 345,
-    "(1,7)-EAT-(1,0)": 346,
-    "(1,7)-EAT-(3,7)": 347,
-    "(2,0)-EAT-(2,2)": 348,
-    "(2,0)-EAT-(2,3)": 349,
-    "(2,0)-EAT-(2,4)": 350,
-    "(2,0)-EAT-(2,5)": 351,
-    "(2,0)-EAT-(2,6)": 352,
-    "(2,0)-EAT-(2,7)": 353,
-    "(2,0)-EAT-(0,0)": 354,
-    "(2,1)-EAT-(2,3)": 355,
-    "(2,1)-EAT-(2,4)": 356,
-    "(2,1)-EAT-(2,5)": 357,
-    "(2,1)-EAT-(2,6)": 358,
-    "(2,1)-EAT-(2,7)": 359,
-    "(2,1)-EAT-(0,1)": 360,
-    "(2,2)-EAT-(2,4)": 361,
-    "(2,2)-EAT-(2,5)": 362,
-    "(2,2)-EAT-(2,6)": 363,
-    "(2,2)-EAT-(2,7)": 364,
-    "(2,2)-EAT-(2,0)": 365,
-    "(2,2)-EAT-(0,2)": 366,
-    "(2,3)-EAT-(2,5)": 367,
-    "(2,3)-EAT-(2,6)": 368,
-    "(2,3)-EAT-(2,7)": 369,
-    "(2,3)-EAT-(2,1)": 370,
-    "(2,3)-EAT-(2,0)": 371,
-    "(2,3)-EAT-(0,3)": 372,
-    "(2,4)-EAT-(2,6)": 373,
-    "(2,4)-EAT-(2,7)": 374,
-    "(2,4)-EAT-(2,2)": 375,
-    "(2,4)-EAT-(2,1)": 376,
-    "(2,4)-EAT-(2,0)": 377,
-    "(2,4)-EAT-(0,4)": 378,
-    "(2,5)-EAT-(2,7)": 379,
-    "(2,5)-EAT-(2,3)": 380,
-    "(2,5)-EAT-(2,2)": 381,
-    "(2,5)-EAT-(2,1)": 382,
-    "(2,5)-EAT-(2,0)": 383,
-    "(2,5)-EAT-(0,5)": 384,
-    "(2,6)-EAT-(2,4)": 385,
-    "(2,6)-EAT-(2,3)": 386,
-    "(2,6)-EAT-(2,2)": 387,
-    "(2,6)-EAT-(2,1)": 388,
-    "(2,6)-EAT-(2,0)": 389,
-    "(2,6)-EAT-(0,6)": 390,
-    "(2,7)-EAT-(2,5)": 391,
-    "(2,7)-EAT-(2,4)": 392,
-    "(2,7)-EAT-(2,3)": 393,
-    "(2,7)-EAT-(2,2)": 394,
-    "(2,7)-EAT-(2,1)": 395,
-    "(2,7)-EAT-(2,0)": 396,
-    "(2,7)-EAT-(0,7)": 397,
-    "(3,0)-EAT-(3,2)": 398,
-    "(3,0)-EAT-(3,3)": 399,
-    "(3,0)-EAT-(3,4)": 400,
-    "(3,0)-EAT-(3,5)": 401,
-    "(3,0)-EAT-(3,6)": 402,
-    "(3,0)-EAT-(3,7)": 403,
-    "(3,0)-EAT-(1,0)": 404,
-    "(3,0)-EAT-(0,0)": 405,
-    "(3,1)-EAT-(3,3)": 406,
-    "(3,1)-EAT-(3,4)": 407,
-    "(3,1)-EAT-(3,5)": 408,
-    "(3,1)-EAT-(3,6)": 409,
-    "(3,1)-EAT-(3,7)": 410,
-    "(3,1)-EAT-(1,1)": 411,
-    "(3,1)-EAT-(0,1)": 412,
-    "(3,2)-EAT-(3,4)": 413,
-    "(3,2)-EAT-(3,5)": 414,
-    "(3,2)-EAT-(3,6)": 415,
-    "(3,2)-EAT-(3,7)": 416,
-    "(3,2)-EAT-(3,0)": 417,
-    "(3,2)-EAT-(1,2)": 418,
-    "(3,2)-EAT-(0,2)": 419,
-    "(3,3)-EAT-(3,5)": 420,
-    "(3,3)-EAT-(3,6)": 421,
-    "(3,3)-EAT-(3,7)": 422,
-    "(3,3)-EAT-(3,1)": 423,
-    "(3,3)-EAT-(3,0)": 424,
-    "(3,3)-EAT-(1,3)": 425,
-    "(3,3)-EAT-(0,3)": 426,
-    "(3,4)-EAT-(3,6)": 427,
-    "(3,4)-EAT-(3,7)": 428,
-    "(3,4)-EAT-(3,2)": 429,
-    "(3,4)-EAT-(3,1)": 430,
-    "(3,4)-EAT-(3,0)": 431,
-    "(3,4)-EAT-(1,4)": 432,
-    "(3,4)-EAT-(0,4)": 433,
-    "(3,5)-EAT-(3,7)": 434,
-    "(3,5)-EAT-(3,3)": 435,
-    "(3,5)-EAT-(3,2)": 436,
-    "(3,5)-EAT-(3,1)": 437,
-    "(3,5)-EAT-(3,0)": 438,
-    "(3,5)-EAT-(1,5)": 439,
-    "(3,5)-EAT-(0,5)": 440,
-    "(3,6)-EAT-(3,4)": 441,
-    "(3,6)-EAT-(3,3)": 442,
-    "(3,6)-EAT-(3,2)": 443,
-    "(3,6)-EAT-(3,1)": 444,
-    "(3,6)-EAT-(3,0)": 445,
-    "(3,6)-EAT-(1,6)": 446,
-    "(3,6)-EAT-(0,6)": 447,
-    "(3,7)-EAT-(3,5)": 448,
-    "(3,7)-EAT-(3,4)": 449,
-    "(3,7)-EAT-(3,3)": 450,
-    "(3,7)-EAT-(3,2)": 451,
-    "(3,7)-EAT-(3,1)": 452,
-    "(3,7)-EAT-(3,0)": 453,
-    "(3,7)-EAT-(1,7)": 454,
-    "(3,7)-EAT-(0,7)": 455,
-}
+ROW_COUNT = 4
+COLUMN_COUNT = 8
+SQUARE_COUNT = ROW_COUNT * COLUMN_COUNT
 
+# action kinds
+REVEAL = 0
+MOVE = 1
+EAT = 2
+ACTION_KIND_NAMES = ("REVEAL", "MOVE", "EAT")
+
+# right, left, down, up: the order the network's policy head was trained on
+_ACTION_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+def _generate_actions() -> List[Tuple[int, int, int]]:
+    """
+    Lists every action as (current square, kind, next square), square being
+    ``row * 8 + col``. The position in the list is the action index:
+    reveals (0 - 31), moves to an adjacent grid (32 - 135), eats of an adjacent
+    grid (136 - 239) and cannon jumps of two or more grids (240 - 455).
+    """
+    actions = [(square, REVEAL, square) for square in range(SQUARE_COUNT)]
+    for kind, first_step, last_step in ((MOVE, 1, 1), (EAT, 1, 1), (EAT, 2, 7)):
+        for square in range(SQUARE_COUNT):
+            row, col = divmod(square, COLUMN_COUNT)
+            for d_row, d_col in _ACTION_DIRECTIONS:
+                for step in range(first_step, last_step + 1):
+                    next_row, next_col = row + d_row * step, col + d_col * step
+                    if 0 <= next_row < ROW_COUNT and 0 <= next_col < COLUMN_COUNT:
+                        actions.append(
+                            (square, kind, next_row * COLUMN_COUNT + next_col)
+                        )
+    return actions
+
+
+_ACTIONS = np.array(_generate_actions(), dtype=np.int16)
+ACTION_SIZE = len(_ACTIONS)
+
+# action index -> current square / kind / next square
+ACTION_FROM = _ACTIONS[:, 0].copy()
+ACTION_KIND = _ACTIONS[:, 1].copy()
+ACTION_TO = _ACTIONS[:, 2].copy()
+
+# (current square, kind, next square) -> action index, -1 when not an action
+ACTION_ID = np.full((SQUARE_COUNT, len(ACTION_KIND_NAMES), SQUARE_COUNT), -1, np.int16)
+ACTION_ID[ACTION_FROM, ACTION_KIND, ACTION_TO] = np.arange(ACTION_SIZE)
 
 # current_position , action ( 0 : reveal , 1 : move , 2 : eat )  , next_position
-PIECE_ACTION_DECODE_ACTION: Dict[int, Tuple[Tuple[int, int], int, Tuple[int, int]]] = {
-    0: ((0, 0), 0, (0, 0)),
-    1: ((0, 1), 0, (0, 1)),
-    2: ((0, 2), 0, (0, 2)),
-    3: ((0, 3), 0, (0, 3)),
-    4: ((0, 4), 0, (0, 4)),
-    5: ((0, 5), 0, (0, 5)),
-    6: ((0, 6), 0, (0, 6)),
-    7: ((0, 7), 0, (0, 7)),
-    8: ((1, 0), 0, (1, 0)),
-    9: ((1, 1), 0, (1, 1)),
-    10: ((1, 2), 0, (1, 2)),
-    11: ((1, 3), 0, (1, 3)),
-    12: ((1, 4), 0, (1, 4)),
-    13: ((1, 5), 0, (1, 5)),
-    14: ((1, 6), 0, (1, 6)),
-    15: ((1, 7), 0, (1, 7)),
-    16: ((2, 0), 0, (2, 0)),
-    17: ((2, 1), 0, (2, 1)),
-    18: ((2, 2), 0, (2, 2)),
-    19: ((2, 3), 0, (2, 3)),
-    20: ((2, 4), 0, (2, 4)),
-    21: ((2, 5), 0, (2, 5)),
-    22: ((2, 6), 0, (2, 6)),
-    23: ((2, 7), 0, (2, 7)),
-    24: ((3, 0), 0, (3, 0)),
-    25: ((3, 1), 0, (3, 1)),
-    26: ((3, 2), 0, (3, 2)),
-    27: ((3, 3), 0, (3, 3)),
-    28: ((3, 4), 0, (3, 4)),
-    29: ((3, 5), 0, (3, 5)),
-    30: ((3, 6), 0, (3, 6)),
-    31: ((3, 7), 0, (3, 7)),
-    32: ((0, 0), 1, (0, 1)),
-    33: ((0, 0), 1, (1, 0)),
-    34: ((0, 1), 1, (0, 2)),
-    35: ((0, 1), 1, (0, 0)),
-    36: ((0, 1), 1, (1, 1)),
-    37: ((0, 2), 1, (0, 3)),
-    38: ((0, 2), 1, (0, 1)),
-    39: ((0, 2), 1, (1, 2)),
-    40: ((0, 3), 1, (0, 4)),
-    41: ((0, 3), 1, (0, 2)),
-    42: ((0, 3), 1, (1, 3)),
-    43: ((0, 4), 1, (0, 5)),
-    44: ((0, 4), 1, (0, 3)),
-    45: ((0, 4), 1, (1, 4)),
-    46: ((0, 5), 1, (0, 6)),
-    47: ((0, 5), 1, (0, 4)),
-    48: ((0, 5), 1, (1, 5)),
-    49: ((0, 6), 1, (0, 7)),
-    50: ((0, 6), 1, (0, 5)),
-    51: ((0, 6), 1, (1, 6)),
-    52: ((0, 7), 1, (0, 6)),
-    53: ((0, 7), 1, (1, 7)),
-    54: ((1, 0), 1, (1, 1)),
-    55: ((1, 0), 1, (2, 0)),
-    56: ((1, 0), 1, (0, 0)),
-    57: ((1, 1), 1, (1, 2)),
-    58: ((1, 1), 1, (1, 0)),
-    59: ((1, 1), 1, (2, 1)),
-    60: ((1, 1), 1, (0, 1)),
-    61: ((1, 2), 1, (1, 3)),
-    62: ((1, 2), 1, (1, 1)),
-    63: ((1, 2), 1, (2, 2)),
-    64: ((1, 2), 1, (0, 2)),
-    65: ((1, 3), 1, (1, 4)),
-    66: ((1, 3), 1, (1, 2)),
-    67: ((1, 3), 1, (2, 3)),
-    68: ((1, 3), 1, (0, 3)),
-    69: ((1, 4), 1, (1, 5)),
-    70: ((1, 4), 1, (1, 3)),
-    71: ((1, 4), 1, (2, 4)),
-    72: ((1, 4), 1, (0, 4)),
-    73: ((1, 5), 1, (1, 6)),
-    74: ((1, 5), 1, (1, 4)),
-    75: ((1, 5), 1, (2, 5)),
-    76: ((1, 5), 1, (0, 5)),
-    77: ((1, 6), 1, (1, 7)),
-    78: ((1, 6), 1, (1, 5)),
-    79: ((1, 6), 1, (2, 6)),
-    80: ((1, 6), 1, (0, 6)),
-    81: ((1, 7), 1, (1, 6)),
-    82: ((1, 7), 1, (2, 7)),
-    83: ((1, 7), 1, (0, 7)),
-    84: ((2, 0), 1, (2, 1)),
-    85: ((2, 0), 1, (3, 0)),
-    86: ((2, 0), 1, (1, 0)),
-    87: ((2, 1), 1, (2, 2)),
-    88: ((2, 1), 1, (2, 0)),
-    89: ((2, 1), 1, (3, 1)),
-    90: ((2, 1), 1, (1, 1)),
-    91: ((2, 2), 1, (2, 3)),
-    92: ((2, 2), 1, (2, 1)),
-    93: ((2, 2), 1, (3, 2)),
-    94: ((2, 2), 1, (1, 2)),
-    95: ((2, 3), 1, (2, 4)),
-    96: ((2, 3), 1, (2, 2)),
-    97: ((2, 3), 1, (3, 3)),
-    98: ((2, 3), 1, (1, 3)),
-    99: ((2, 4), 1, (2, 5)),
-    100: ((2, 4), 1, (2, 3)),
-    101: ((2, 4), 1, (3, 4)),
-    102: ((2, 4), 1, (1, 4)),
-    103: ((2, 5), 1, (2, 6)),
-    104: ((2, 5), 1, (2, 4)),
-    105: ((2, 5), 1, (3, 5)),
-    106: ((2, 5), 1, (1, 5)),
-    107: ((2, 6), 1, (2, 7)),
-    108: ((2, 6), 1, (2, 5)),
-    109: ((2, 6), 1, (3, 6)),
-    110: ((2, 6), 1, (1, 6)),
-    111: ((2, 7), 1, (2, 6)),
-    112: ((2, 7), 1, (3, 7)),
-    113: ((2, 7), 1, (1, 7)),
-    114: ((3, 0), 1, (3, 1)),
-    115: ((3, 0), 1, (2, 0)),
-    116: ((3, 1), 1, (3, 2)),
-    117: ((3, 1), 1, (3, 0)),
-    118: ((3, 1), 1, (2, 1)),
-    119: ((3, 2), 1, (3, 3)),
-    120: ((3, 2), 1, (3, 1)),
-    121: ((3, 2), 1, (2, 2)),
-    122: ((3, 3), 1, (3, 4)),
-    123: ((3, 3), 1, (3, 2)),
-    124: ((3, 3), 1, (2, 3)),
-    125: ((3, 4), 1, (3, 5)),
-    126: ((3, 4), 1, (3, 3)),
-    127: ((3, 4), 1, (2, 4)),
-    128: ((3, 5), 1, (3, 6)),
-    129: ((3, 5), 1, (3, 4)),
-    130: ((3, 5), 1, (2, 5)),
-    131: ((3, 6), 1, (3, 7)),
-    132: ((3, 6), 1, (3, 5)),
-    133: ((3, 6), 1, (2, 6)),
-    134: ((3, 7), 1, (3, 6)),
-    135: ((3, 7), 1, (2, 7)),
-    136: ((0, 0), 2, (0, 1)),
-    137: ((0, 0), 2, (1, 0)),
-    138: ((0, 1), 2, (0, 2)),
-    139: ((0, 1), 2, (0, 0)),
-    140: ((0, 1), 2, (1, 1)),
-    141: ((0, 2), 2, (0, 3)),
-    142: ((0, 2), 2, (0, 1)),
-    143: ((0, 2), 2, (1, 2)),
-    144: ((0, 3), 2, (0, 4)),
-    145: ((0, 3), 2, (0, 2)),
-    146: ((0, 3), 2, (1, 3)),
-    147: ((0, 4), 2, (0, 5)),
-    148: ((0, 4), 2, (0, 3)),
-    149: ((0, 4), 2, (1, 4)),
-    150: ((0, 5), 2, (0, 6)),
-    151: ((0, 5), 2, (0, 4)),
-    152: ((0, 5), 2, (1, 5)),
-    153: ((0, 6), 2, (0, 7)),
-    154: ((0, 6), 2, (0, 5)),
-    155: ((0, 6), 2, (1, 6)),
-    156: ((0, 7), 2, (0, 6)),
-    157: ((0, 7), 2, (1, 7)),
-    158: ((1, 0), 2, (1, 1)),
-    159: ((1, 0), 2, (2, 0)),
-    160: ((1, 0), 2, (0, 0)),
-    161: ((1, 1), 2, (1, 2)),
-    162: ((1, 1), 2, (1, 0)),
-    163: ((1, 1), 2, (2, 1)),
-    164: ((1, 1), 2, (0, 1)),
-    165: ((1, 2), 2, (1, 3)),
-    166: ((1, 2), 2, (1, 1)),
-    167: ((1, 2), 2, (2, 2)),
-    168: ((1, 2), 2, (0, 2)),
-    169: ((1, 3), 2, (1, 4)),
-    170: ((1, 3), 2, (1, 2)),
-    171: ((1, 3), 2, (2, 3)),
-    172: ((1, 3), 2, (0, 3)),
-    173: ((1, 4), 2, (1, 5)),
-    174: ((1, 4), 2, (1, 3)),
-    175: ((1, 4), 2, (2, 4)),
-    176: ((1, 4), 2, (0, 4)),
-    177: ((1, 5), 2, (1, 6)),
-    178: ((1, 5), 2, (1, 4)),
-    179: ((1, 5), 2, (2, 5)),
-    180: ((1, 5), 2, (0, 5)),
-    181: ((1, 6), 2, (1, 7)),
-    182: ((1, 6), 2, (1, 5)),
-    183: ((1, 6), 2, (2, 6)),
-    184: ((1, 6), 2, (0, 6)),
-    185: ((1, 7), 2, (1, 6)),
-    186: ((1, 7), 2, (2, 7)),
-    187: ((1, 7), 2, (0, 7)),
-    188: ((2, 0), 2, (2, 1)),
-    189: ((2, 0), 2, (3, 0)),
-    190: ((2, 0), 2, (1, 0)),
-    191: ((2, 1), 2, (2, 2)),
-    192: ((2, 1), 2, (2, 0)),
-    193: ((2, 1), 2, (3, 1)),
-    194: ((2, 1), 2, (1, 1)),
-    195: ((2, 2), 2, (2, 3)),
-    196: ((2, 2), 2, (2, 1)),
-    197: ((2, 2), 2, (3, 2)),
-    198: ((2, 2), 2, (1, 2)),
-    199: ((2, 3), 2, (2, 4)),
-    200: ((2, 3), 2, (2, 2)),
-    201: ((2, 3), 2, (3, 3)),
-    202: ((2, 3), 2, (1, 3)),
-    203: ((2, 4), 2, (2, 5)),
-    204: ((2, 4), 2, (2, 3)),
-    205: ((2, 4), 2, (3, 4)),
-    206: ((2, 4), 2, (1, 4)),
-    207: ((2, 5), 2, (2, 6)),
-    208: ((2, 5), 2, (2, 4)),
-    209: ((2, 5), 2, (3, 5)),
-    210: ((2, 5), 2, (1, 5)),
-    211: ((2, 6), 2, (2, 7)),
-    212: ((2, 6), 2, (2, 5)),
-    213: ((2, 6), 2, (3, 6)),
-    214: ((2, 6), 2, (1, 6)),
-    215: ((2, 7), 2, (2, 6)),
-    216: ((2, 7), 2, (3, 7)),
-    217: ((2, 7), 2, (1, 7)),
-    218: ((3, 0), 2, (3, 1)),
-    219: ((3, 0), 2, (2, 0)),
-    220: ((3, 1), 2, (3, 2)),
-    221: ((3, 1), 2, (3, 0)),
-    222: ((3, 1), 2, (2, 1)),
-    223: ((3, 2), 2, (3, 3)),
-    224: ((3, 2), 2, (3, 1)),
-    225: ((3, 2), 2, (2, 2)),
-    226: ((3, 3), 2, (3, 4)),
-    227: ((3, 3), 2, (3, 2)),
-    228: ((3, 3), 2, (2, 3)),
-    229: ((3, 4), 2, (3, 5)),
-    230: ((3, 4), 2, (3, 3)),
-    231: ((3, 4), 2, (2, 4)),
-    232: ((3, 5), 2, (3, 6)),
-    233: ((3, 5), 2, (3, 4)),
-    234: ((3, 5), 2, (2, 5)),
-    235: ((3, 6), 2, (3, 7)),
-    236: ((3, 6), 2, (3, 5)),
-    237: ((3, 6), 2, (2, 6)),
-    238: ((3, 7), 2, (3, 6)),
-    239: ((3, 7), 2, (2, 7)),
-    240: ((0, 0), 2, (0, 2)),
-    241: ((0, 0), 2, (0, 3)),
-    242: ((0, 0), 2, (0, 4)),
-    243: ((0, 0), 2, (0, 5)),
-    244: ((0, 0), 2, (0, 6)),
-    245: ((0, 0), 2, (0, 7)),
-    246: ((0, 0), 2, (2, 0)),
-    247: ((0, 0), 2, (3, 0)),
-    248: ((0, 1), 2, (0, 3)),
-    249: ((0, 1), 2, (0, 4)),
-    250: ((0, 1), 2, (0, 5)),
-    251: ((0, 1), 2, (0, 6)),
-    252: ((0, 1), 2, (0, 7)),
-    253: ((0, 1), 2, (2, 1)),
-    254: ((0, 1), 2, (3, 1)),
-    255: ((0, 2), 2, (0, 4)),
-    256: ((0, 2), 2, (0, 5)),
-    257: ((0, 2), 2, (0, 6)),
-    258: ((0, 2), 2, (0, 7)),
-    259: ((0, 2), 2, (0, 0)),
-    260: ((0, 2), 2, (2, 2)),
-    261: ((0, 2), 2, (3, 2)),
-    262: ((0, 3), 2, (0, 5)),
-    263: ((0, 3), 2, (0, 6)),
-    264: ((0, 3), 2, (0, 7)),
-    265: ((0, 3), 2, (0, 1)),
-    266: ((0, 3), 2, (0, 0)),
-    267: ((0, 3), 2, (2, 3)),
-    268: ((0, 3), 2, (3, 3)),
-    269: ((0, 4), 2, (0, 6)),
-    270: ((0, 4), 2, (0, 7)),
-    271: ((0, 4), 2, (0, 2)),
-    272: ((0, 4), 2, (0, 1)),
-    273: ((0, 4), 2, (0, 0)),
-    274: ((0, 4), 2, (2, 4)),
-    275: ((0, 4), 2, (3, 4)),
-    276: ((0, 5), 2, (0, 7)),
-    277: ((0, 5), 2, (0, 3)),
-    278: ((0, 5), 2, (0, 2)),
-    279: ((0, 5), 2, (0, 1)),
-    280: ((0, 5), 2, (0, 0)),
-    281: ((0, 5), 2, (2, 5)),
-    282: ((0, 5), 2, (3, 5)),
-    283: ((0, 6), 2, (0, 4)),
-    284: ((0, 6), 2, (0, 3)),
-    285: ((0, 6), 2, (0, 2)),
-    286: ((0, 6), 2, (0, 1)),
-    287: ((0, 6), 2, (0, 0)),
-    288: ((0, 6), 2, (2, 6)),
-    289: ((0, 6), 2, (3, 6)),
-    290: ((0, 7), 2, (0, 5)),
-    291: ((0, 7), 2, (0, 4)),
-    292: ((0, 7), 2, (0, 3)),
-    293: ((0, 7), 2, (0, 2)),
-    294: ((0, 7), 2, (0, 1)),
-    295: ((0, 7), 2, (0, 0)),
-    296: ((0, 7), 2, (2, 7)),
-    297: ((0, 7), 2, (3, 7)),
-    298: ((1, 0), 2, (1, 2)),
-    299: ((1, 0), 2, (1, 3)),
-    300: ((1, 0), 2, (1, 4)),
-    301: ((1, 0), 2, (1, 5)),
-    302: ((1, 0), 2, (1, 6)),
-    303: ((1, 0), 2, (1, 7)),
-    304: ((1, 0), 2, (3, 0)),
-    305: ((1, 1), 2, (1, 3)),
-    306: ((1, 1), 2, (1, 4)),
-    307: ((1, 1), 2, (1, 5)),
-    308: ((1, 1), 2, (1, 6)),
-    309: ((1, 1), 2, (1, 7)),
-    310: ((1, 1), 2, (3, 1)),
-    311: ((1, 2), 2, (1, 4)),
-    312: ((1, 2), 2, (1, 5)),
-    313: ((1, 2), 2, (1, 6)),
-    314: ((1, 2), 2, (1, 7)),
-    315: ((1, 2), 2, (1, 0)),
-    316: ((1, 2), 2, (3, 2)),
-    317: ((1, 3), 2, (1, 5)),
-    318: ((1, 3), 2, (1, 6)),
-    319: ((1, 3), 2, (1, 7)),
-    320: ((1, 3), 2, (1, 1)),
-    321: ((1, 3), 2, (1, 0)),
-    322: ((1, 3), 2, (3, 3)),
-    323: ((1, 4), 2, (1, 6)),
-    324: ((1, 4), 2, (1, 7)),
-    325: ((1, 4), 2, (1, 2)),
-    326: ((1, 4), 2, (1, 1)),
-    327: ((1, 4), 2, (1, 0)),
-    328: ((1, 4), 2, (3, 4)),
-    329: ((1, 5), 2, (1, 7)),
-    330: ((1, 5), 2, (1, 3)),
-    331: ((1, 5), 2, (1, 2)),
-    332: ((1, 5), 2, (1, 1)),
-    333: ((1, 5), 2, (1, 0)),
-    334: ((1, 5), 2, (3, 5)),
-    335: ((1, 6), 2, (1, 4)),
-    336: ((1, 6), 2, (1, 3)),
-    337: ((1, 6), 2, (1, 2)),
-    338: ((1, 6), 2, (1, 1)),
-    339: ((1, 6), 2, (1, 0)),
-    340: ((1, 6), 2, (3, 6)),
-    341: ((1, 7), 2, (1, 5)),
-    342: ((1, 7), 2, (1, 4)),
-    343: ((1, 7), 2, (1, 3)),
-    344: ((1, 7), 2, (1, 2)),
-    345: ((1, 7), 2, (1, 1)),
-    346: ((1, 7), 2, (1, 0)),
-    347: ((1, 7), 2, (3, 7)),
-    348: ((2, 0), 2, (2, 2)),
-    349: ((2, 0), 2, (2, 3)),
-    350: ((2, 0), 2, (2, 4)),
-    351: ((2, 0), 2, (2, 5)),
-    352: ((2, 0), 2, (2, 6)),
-    353: ((2, 0), 2, (2, 7)),
-    354: ((2, 0), 2, (0, 0)),
-    355: ((2, 1), 2, (2, 3)),
-    356: ((2, 1), 2, (2, 4)),
-    357: ((2, 1), 2, (2, 5)),
-    358: ((2, 1), 2, (2, 6)),
-    359: ((2, 1), 2, (2, 7)),
-    360: ((2, 1), 2, (0, 1)),
-    361: ((2, 2), 2, (2, 4)),
-    362: ((2, 2), 2, (2, 5)),
-    363: ((2, 2), 2, (2, 6)),
-    364: ((2, 2), 2, (2, 7)),
-    365: ((2, 2), 2, (2, 0)),
-    366: ((2, 2), 2, (0, 2)),
-    367: ((2, 3), 2, (2, 5)),
-    368: ((2, 3), 2, (2, 6)),
-    369: ((2, 3), 2, (2, 7)),
-    370: ((2, 3), 2, (2, 1)),
-    371: ((2, 3), 2, (2, 0)),
-    372: ((2, 3), 2, (0, 3)),
-    373: ((2, 4), 2, (2, 6)),
-    374: ((2, 4), 2, (2, 7)),
-    375: ((2, 4), 2, (2, 2)),
-    376: ((2, 4), 2, (2, 1)),
-    377: ((2, 4), 2, (2, 0)),
-    378: ((2, 4), 2, (0, 4)),
-    379: ((2, 5), 2, (2, 7)),
-    380: ((2, 5), 2, (2, 3)),
-    381: ((2, 5), 2, (2, 2)),
-    382: ((2, 5), 2, (2, 1)),
-    383: ((2, 5), 2, (2, 0)),
-    384: ((2, 5), 2, (0, 5)),
-    385: ((2, 6), 2, (2, 4)),
-    386: ((2, 6), 2, (2, 3)),
-    387: ((2, 6), 2, (2, 2)),
-    388: ((2, 6), 2, (2, 1)),
-    389: ((2, 6), 2, (2, 0)),
-    390: ((2, 6), 2, (0, 6)),
-    391: ((2, 7), 2, (2, 5)),
-    392: ((2, 7), 2, (2, 4)),
-    393: ((2, 7), 2, (2, 3)),
-    394: ((2, 7), 2, (2, 2)),
-    395: ((2, 7), 2, (2, 1)),
-    396: ((2, 7), 2, (2, 0)),
-    397: ((2, 7), 2, (0, 7)),
-    398: ((3, 0), 2, (3, 2)),
-    399: ((3, 0), 2, (3, 3)),
-    400: ((3, 0), 2, (3, 4)),
-    401: ((3, 0), 2, (3, 5)),
-    402: ((3, 0), 2, (3, 6)),
-    403: ((3, 0), 2, (3, 7)),
-    404: ((3, 0), 2, (1, 0)),
-    405: ((3, 0), 2, (0, 0)),
-    406: ((3, 1), 2, (3, 3)),
-    407: ((3, 1), 2, (3, 4)),
-    408: ((3, 1), 2, (3, 5)),
-    409: ((3, 1), 2, (3, 6)),
-    410: ((3, 1), 2, (3, 7)),
-    411: ((3, 1), 2, (1, 1)),
-    412: ((3, 1), 2, (0, 1)),
-    413: ((3, 2), 2, (3, 4)),
-    414: ((3, 2), 2, (3, 5)),
-    415: ((3, 2), 2, (3, 6)),
-    416: ((3, 2), 2, (3, 7)),
-    417: ((3, 2), 2, (3, 0)),
-    418: ((3, 2), 2, (1, 2)),
-    419: ((3, 2), 2, (0, 2)),
-    420: ((3, 3), 2, (3, 5)),
-    421: ((3, 3), 2, (3, 6)),
-    422: ((3, 3), 2, (3, 7)),
-    423: ((3, 3), 2, (3, 1)),
-    424: ((3, 3), 2, (3, 0)),
-    425: ((3, 3), 2, (1, 3)),
-    426: ((3, 3), 2, (0, 3)),
-    427: ((3, 4), 2, (3, 6)),
-    428: ((3, 4), 2, (3, 7)),
-    429: ((3, 4), 2, (3, 2)),
-    430: ((3, 4), 2, (3, 1)),
-    431: ((3, 4), 2, (3, 0)),
-    432: ((3, 4), 2, (1, 4)),
-    433: ((3, 4), 2, (0, 4)),
-    434: ((3, 5), 2, (3, 7)),
-    435: ((3, 5), 2, (3, 3)),
-    436: ((3, 5), 2, (3, 2)),
-    437: ((3, 5), 2, (3, 1)),
-    438: ((3, 5), 2, (3, 0)),
-    439: ((3, 5), 2, (1, 5)),
-    440: ((3, 5), 2, (0, 5)),
-    441: ((3, 6), 2, (3, 4)),
-    442: ((3, 6), 2, (3, 3)),
-    443: ((3, 6), 2, (3, 2)),
-    444: ((3, 6), 2, (3, 1)),
-    445: ((3, 6), 2, (3, 0)),
-    446: ((3, 6), 2, (1, 6)),
-    447: ((3, 6), 2, (0, 6)),
-    448: ((3, 7), 2, (3, 5)),
-    449: ((3, 7), 2, (3, 4)),
-    450: ((3, 7), 2, (3, 3)),
-    451: ((3, 7), 2, (3, 2)),
-    452: ((3, 7), 2, (3, 1)),
-    453: ((3, 7), 2, (3, 0)),
-    454: ((3, 7), 2, (1, 7)),
-    455: ((3, 7), 2, (0, 7)),
-}
+PIECE_ACTION_DECODE_ACTION: List[Tuple[Tuple[int, int], int, Tuple[int, int]]] = [
+    (divmod(current, COLUMN_COUNT), kind, divmod(following, COLUMN_COUNT))
+    for current, kind, following in _ACTIONS.tolist()
+]
+
+
+def action_to_string(action: int) -> str:
+    """Debugging form of an action index, e.g. ``(0,0)-REVEAL-(0,0)``."""
+    (row1, col1), kind, (row2, col2) = PIECE_ACTION_DECODE_ACTION[action]
+    return f"({row1},{col1})-{ACTION_KIND_NAMES[kind]}-({row2},{col2})"
+
+
+def action_from_string(key: str) -> int:
+    """Inverse of action_to_string, raises KeyError for unknown actions."""
+    current, kind, following = key.split("-")
+    row1, col1 = map(int, current.strip("()").split(","))
+    row2, col2 = map(int, following.strip("()").split(","))
+    action = int(
+        ACTION_ID[
+            row1 * COLUMN_COUNT + col1,
+            ACTION_KIND_NAMES.index(kind),
+            row2 * COLUMN_COUNT + col2,
+        ]
+    )
+    if action < 0:
+        raise KeyError(key)
+    return action
@@ -0,0 +1,76 @@
+import copy
+import warnings
+from typing import Optional
+import numpy as np
+import torch  # type: ignore
+from torch.ao.quantization import (  # type: ignore
+    get_default_qconfig_mapping,
+    quantize_dynamic,
+)
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.model_export import example_input, save_torchscript
+from src.ai.res_net import ResNet
+
+QUANTIZATION_MODES = ("dynamic", "static")
+
+
+def load_calibration_planes(
+    path: str, ai_game_state_transition_helper: AIGameStateTransitionHelper
+) -> np.ndarray:
+    """
+    Network input planes (N, 16, 4, 8) of the positions stored at ``path``:
+    a .npy array, or the "states" array of a .npz file such as a self-play
+    shard. (N, 3, 4, 8) AI states are encoded first.
+    """
+    data = np.load(path)
+    positions = data["states"] if isinstance(data, np.lib.npyio.NpzFile) else data
+    if positions.shape[1:] == (3, 4, 8):
+        return ai_game_state_transition_helper.get_encoded_states(positions)
+    return positions.astype(np.float32)
+
+
+def quantize_model(
+    model: ResNet,
+    mode: str,
+    calibration_planes: Optional[np.ndarray] = None,
+    batch_size: int = 64,
+) -> torch.nn.Module:
+    """
+    Int8 copy of ``model`` for CPU inference.
+
+    "dynamic" quantizes the weights of the Linear layers and their activations
+    on the fly. "static" quantizes every layer with FX graph mode, which first
+    fuses Conv + BN + ReLU, and calibrates the activation ranges on
+    ``calibration_planes``.
+    """
+    float_model = copy.deepcopy(model).cpu().eval()
+    # torch.ao.quantization warns that it moves to torchao in every call
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        match (mode):
+            case "dynamic":
+                return quantize_dynamic(
+                    float_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            case "static":
+                if calibration_planes is None or len(calibration_planes) == 0:
+                    raise ValueError("Static quantization needs calibration positions")
+                prepared = prepare_fx(
+                    float_model,
+                    get_default_qconfig_mapping(torch.backends.quantized.engine),
+                    (example_input(float_model),),
+                )
+                for start in range(0, len(calibration_planes), batch_size):
+                    prepared(
+                        torch.from_numpy(calibration_planes[start : start + batch_size])
+                    )
+                return convert_fx(prepared)
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def save_quantized(model: torch.nn.Module, example: torch.Tensor, path: str) -> None:
+    """Saves a quantized model as TorchScript, run by Agent's torchscript backend."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        save_torchscript(model, example, path)
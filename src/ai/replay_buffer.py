@@ -0,0 +1,180 @@
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from src.ai.piece_action_code import ACTION_SIZE, COLUMN_COUNT, ROW_COUNT
+from src.ai.self_play import MANIFEST_NAME, GameRecord
+
+METADATA_NAME = "buffer.json"
+# array of a shard: (shape of one position, dtype), states as one-hot uint8
+FIELDS: Dict[str, Tuple[Tuple[int, ...], Any]] = {
+    "states": ((16, ROW_COUNT, COLUMN_COUNT), np.uint8),
+    "policies": ((ACTION_SIZE,), np.float32),
+    "values": ((), np.float32),
+}
+
+# encoded states (B, 16, 4, 8) as float32, policies (B, 456) and values (B,)
+Minibatch = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class ReplayBuffer:
+    """
+    Self-play positions on disk, in shards of ``shard_size`` positions kept as
+    one memory-mapped .npy file per array. Position ``n`` of the history is
+    row ``n % shard_size`` of shard ``n // shard_size``.
+
+    Only the newest ``window`` positions are sampled; a shard is deleted once
+    all its positions have left the window. Sampling reads just the rows it
+    picks, so the buffer may be far larger than memory.
+
+    buffer.json records how many positions were written, and is replaced
+    after each append. Opening an existing buffer takes its window and shard
+    size from there. Another process may open the same directory to sample,
+    calling ``reload`` to see new positions.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        window: int = 1_000_000,
+        shard_size: int = 65536,
+    ) -> None:
+        self.directory = directory
+        self.window = window
+        self.shard_size = shard_size
+        self.positions = 0
+        # shards below were deleted
+        self.first_shard = 0
+        # open memmaps by (shard, array name)
+        self.arrays: Dict[Tuple[int, str], np.ndarray] = {}
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.metadata_path()):
+            self.reload()
+
+    def metadata_path(self) -> str:
+        return os.path.join(self.directory, METADATA_NAME)
+
+    def shard_path(self, shard: int, name: str) -> str:
+        return os.path.join(self.directory, f"shard-{shard:06d}-{name}.npy")
+
+    def reload(self) -> None:
+        """Reads what other processes appended, shard_size and window included."""
+        with open(self.metadata_path(), encoding="utf-8") as file:
+            metadata = json.load(file)
+        self.positions = metadata["positions"]
+        self.window = metadata["window"]
+        self.shard_size = metadata["shard_size"]
+        self.first_shard = metadata["first_shard"]
+        for shard, name in list(self.arrays):
+            if shard < self.first_shard:
+                del self.arrays[(shard, name)]
+
+    def __len__(self) -> int:
+        return min(self.positions, self.window)
+
+    def first_position(self) -> int:
+        return self.positions - len(self)
+
+    def array(self, shard: int, name: str, writable: bool = False) -> np.ndarray:
+        key = (shard, name)
+        cached = self.arrays.get(key)
+        if cached is not None and (not writable or cached.flags.writeable):
+            return cached
+        path = self.shard_path(shard, name)
+        array: np.ndarray
+        if writable and not os.path.exists(path):
+            shape, dtype = FIELDS[name]
+            array = np.lib.format.open_memmap(
+                path, mode="w+", dtype=dtype, shape=(self.shard_size, *shape)
+            )
+        else:
+            array = np.load(path, mmap_mode="r+" if writable else "r")
+        self.arrays[key] = array
+        return array
+
+    def append(
+        self, states: np.ndarray, policies: np.ndarray, values: np.ndarray
+    ) -> None:
+        """Appends positions, then drops the shards that left the window."""
+        arrays = {"states": states, "policies": policies, "values": values}
+        written = 0
+        while written < len(states):
+            shard, row = divmod(self.positions, self.shard_size)
+            count = min(self.shard_size - row, len(states) - written)
+            for name, source in arrays.items():
+                self.array(shard, name, writable=True)[row : row + count] = source[
+                    written : written + count
+                ]
+            written += count
+            self.positions += count
+            if row + count == self.shard_size:
+                self.flush(shard)
+        self.flush(self.positions // self.shard_size)
+        self.drop_old_shards()
+        self.write_metadata()
+
+    def add_game(self, record: GameRecord) -> None:
+        self.append(*record)
+
+    def add_self_play(self, directory: str) -> int:
+        """Appends every shard listed by a self-play manifest, and their positions."""
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as file:
+            manifest = json.load(file)
+        positions = 0
+        for shard in manifest["shards"]:
+            with np.load(os.path.join(directory, shard["file"])) as data:
+                self.append(data["states"], data["policies"], data["values"])
+            positions += shard["positions"]
+        return positions
+
+    def flush(self, shard: int) -> None:
+        for name in FIELDS:
+            array = self.arrays.get((shard, name))
+            if isinstance(array, np.memmap) and array.flags.writeable:
+                array.flush()
+
+    def write_metadata(self) -> None:
+        metadata = {
+            "positions": self.positions,
+            "window": self.window,
+            "shard_size": self.shard_size,
+            "first_shard": self.first_shard,
+        }
+        temporary_path = f"{self.metadata_path()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(metadata, file)
+        os.replace(temporary_path, self.metadata_path())
+
+    def drop_old_shards(self) -> None:
+        first_shard = self.first_position() // self.shard_size
+        for shard in range(self.first_shard, first_shard):
+            for name in FIELDS:
+                self.arrays.pop((shard, name), None)
+                os.remove(self.shard_path(shard, name))
+        self.first_shard = max(self.first_shard, first_shard)
+
+    def gather(self, indices: np.ndarray) -> Minibatch:
+        """Positions at ``indices`` of the history, read from the memmaps."""
+        order = np.argsort(indices)
+        shards, rows = np.divmod(indices[order], self.shard_size)
+        batch: Dict[str, np.ndarray] = {
+            name: np.empty((len(indices), *shape), dtype=np.float32)
+            for name, (shape, _) in FIELDS.items()
+        }
+        # sorted, so the rows of a shard are read in file order
+        for shard in np.unique(shards):
+            run = np.flatnonzero(shards == shard)
+            for name in FIELDS:
+                batch[name][order[run]] = self.array(int(shard), name)[rows[run]]
+        return batch["states"], batch["policies"], batch["values"]
+
+    def sample(
+        self, batch_size: int, rng: Optional[np.random.Generator] = None
+    ) -> Minibatch:
+        """Uniformly random positions of the window, drawn with replacement."""
+        if len(self) == 0:
+            raise ValueError("The replay buffer is empty")
+        rng = rng or np.random.default_rng()
+        return self.gather(
+            rng.integers(self.first_position(), self.positions, size=batch_size)
+        )
@@ -1,3 +1,5 @@
+from typing import Dict, Tuple
+import torch  # type: ignore
 import torch.nn as nn  # type: ignore
 from src.ai.res_block import ResBlock
 from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
@@ -61,3 +63,11 @@ class ResNet(nn.Module):  # type-ignored
         policy = self.policy_head(x)
         value = self.value_head(x)
         return policy, value
+
+
+def model_sizes(state_dict: Dict[str, torch.Tensor]) -> Tuple[int, int]:
+    """(num_res_blocks, num_hidden) of the ResNet ``state_dict`` was saved from."""
+    num_res_blocks = len(
+        {key.split(".")[1] for key in state_dict if key.startswith("back_bone.")}
+    )
+    return num_res_blocks, state_dict["start_block.0.weight"].shape[0]
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.inference_client import InferenceClient
+from src.ai.mcts import MCTS
+from src.ai.model_export import ExportedModel, InferenceModel
+from src.ai.res_net import ResNet
+
+# MCTS of the worker process, built once by _initialize_worker
+_worker_mcts: Optional[MCTS] = None
+
+
+def worker_count(args: Dict[str, Any]) -> int:
+    """Worker processes to search with, 0 in the args meaning every core."""
+    return args.get("search_workers", 0) or os.cpu_count() or 1
+
+
+def spawn_context() -> multiprocessing.context.SpawnContext:
+    """
+    Context of the processes that run the network, next to a parent that
+    may already have: fork would copy the parent's torch threads.
+    """
+    return multiprocessing.get_context("spawn")
+
+
+def search_visit_counts(
+    mcts: MCTS,
+    state: np.ndarray,
+    seed: int,
+    num_searches: Optional[int] = None,
+    time_budget: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Root visit counts of one search of ``state``, seeded for the root noise,
+    with the budget of MCTS.search. A search stopped
+    before its first simulation counts with its root priors, and a forced
+    move with its distribution, so the counts of any search add up to more
+    than 0.
+    """
+    np.random.seed(seed)
+    probs = mcts.search(state, None, num_searches, time_budget)
+    if mcts.tree is None:
+        return probs
+    visit_counts = mcts.tree.root_visit_counts(
+        mcts.ai_game_state_transition_helper.action_size
+    )
+    if np.sum(visit_counts) == 0:
+        return mcts.visit_distribution(mcts.tree)
+    return visit_counts
+
+
+def model_source(model: InferenceModel) -> Tuple[Any, ...]:
+    """Picklable description of ``model`` that a worker can load it from."""
+    if isinstance(model, ExportedModel):
+        return ("exported", model.backend, model.path)
+    if isinstance(model, InferenceClient):
+        return ("server", model.address)
+    return (
+        "eager",
+        len(model.back_bone),
+        model.start_block[0].out_channels,
+        {key: value.cpu() for key, value in model.state_dict().items()},
+    )
+
+
+def load_model(
+    source: Tuple[Any, ...], helper: AIGameStateTransitionHelper
+) -> InferenceModel:
+    if source[0] == "exported":
+        return ExportedModel(source[1], source[2])
+    if source[0] == "server":
+        return InferenceClient(source[1])
+    _, num_res_blocks, num_hidden, state_dict = source
+    model = ResNet(helper, num_res_blocks, num_hidden, torch.device("cpu"))
+    model.load_state_dict(state_dict)
+    model.eval()
+    return model
+
+
+def _initialize_worker(args: Dict[str, Any], source: Tuple[Any, ...]) -> None:
+    global _worker_mcts
+    # one search per core, so a worker must not spread over the others
+    torch.set_num_threads(1)
+    helper = AIGameStateTransitionHelper()
+    _worker_mcts = MCTS(args, helper, load_model(source, helper))
+
+
+def worker_mcts() -> MCTS:
+    """MCTS of the pool worker process this is called in."""
+    if _worker_mcts is None:
+        raise RuntimeError("Not in a search pool worker")
+    return _worker_mcts
+
+
+def _search_in_worker(
+    state: np.ndarray,
+    seed: int,
+    num_searches: Optional[int],
+    time_budget: Optional[float],
+) -> np.ndarray:
+    return search_visit_counts(worker_mcts(), state, seed, num_searches, time_budget)
+
+
+def create_search_pool(
+    args: Dict[str, Any], model: InferenceModel, workers: int
+) -> ProcessPoolExecutor:
+    """
+    Pool of ``workers`` processes, each holding a CPU copy of ``model``, the
+    same exported artifact or a client of the same inference server, and an
+    MCTS built from ``args``. Searches are
+    submitted with ``submit_search``.
+    """
+    return ProcessPoolExecutor(
+        workers,
+        mp_context=spawn_context(),
+        initializer=_initialize_worker,
+        initargs=(args, model_source(model)),
+    )
+
+
+def submit_search(
+    pool: ProcessPoolExecutor,
+    state: np.ndarray,
+    seed: int,
+    num_searches: Optional[int] = None,
+    time_budget: Optional[float] = None,
+) -> "Future[np.ndarray]":
+    """
+    Future of the root visit counts of a search of ``state`` in ``pool``, see
+    search_visit_counts.
+    """
+    return pool.submit(_search_in_worker, state, seed, num_searches, time_budget)
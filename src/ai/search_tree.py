@@ -0,0 +1,260 @@
+import math
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+from src.ai.piece_action_code import ACTION_KIND, REVEAL
+from src.ai.transposition_table import TranspositionEntry
+
+
+class SearchTree:
+    """
+    MCTS tree stored as a structure of arrays in preallocated NumPy buffers.
+
+    Node 0 is the root. The children of a node are stored contiguously, from
+    ``child_offset[node]`` to ``child_offset[node] + child_count[node]``, so the
+    UCB scores of all the children are computed with one vectorized argmax.
+    A node with ``child_count`` 0 is not expanded yet.
+
+    Nodes reaching a position held in the transposition table point to a
+    shared slot (``entry_slot``) whose statistics mirror the table entry and
+    are updated by every node of that position.
+
+    Reveal actions are chance nodes (``is_chance``): their children are the
+    identities the reveal may turn up (``outcome``), weighted by the pool of
+    face-down pieces, and are sampled rather than selected by UCB.
+
+    The value of a node is from the perspective of the player to move in its
+    position, so it flips sign from child to parent. A chance node and its
+    outcomes share the perspective of the player to move after the reveal,
+    the revealer's opponent: ``backpropagate`` does not flip the sign into a
+    chance node.
+    """
+
+    def __init__(self, capacity: int = 1 << 14, chance_nodes: bool = True) -> None:
+        self.size = 0
+        # False when hidden identities are known, as in a determinized search
+        self.chance_nodes = chance_nodes
+        self.prior = np.zeros(capacity, dtype=np.float64)
+        self.visit_count = np.zeros(capacity, dtype=np.int32)
+        self.value_sum = np.zeros(capacity, dtype=np.float64)
+        # simulations currently in flight through the node (batched search)
+        self.virtual_loss = np.zeros(capacity, dtype=np.int32)
+        self.action = np.full(capacity, -1, dtype=np.int16)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.child_offset = np.zeros(capacity, dtype=np.int32)
+        self.child_count = np.zeros(capacity, dtype=np.int16)
+        self.entry_slot = np.full(capacity, -1, dtype=np.int32)
+        self.is_chance = np.zeros(capacity, dtype=np.bool_)
+        self.outcome = np.zeros(capacity, dtype=np.int8)
+        # shared statistics, one slot per transposition entry used by the tree
+        self.entries: List[TranspositionEntry] = []
+        self.entry_slots: Dict[int, int] = {}
+        self.shared_visit_count = np.zeros(64, dtype=np.int64)
+        self.shared_value_sum = np.zeros(64, dtype=np.float64)
+        self.add_nodes(1)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.prior)
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2)
+        for name in (
+            "prior",
+            "visit_count",
+            "value_sum",
+            "virtual_loss",
+            "action",
+            "parent",
+            "child_offset",
+            "child_count",
+            "entry_slot",
+            "is_chance",
+            "outcome",
+        ):
+            buffer = getattr(self, name)
+            grown = np.full(
+                capacity,
+                -1 if name in ("action", "parent", "entry_slot") else 0,
+                dtype=buffer.dtype,
+            )
+            grown[: self.size] = buffer[: self.size]
+            setattr(self, name, grown)
+
+    def add_nodes(self, count: int) -> int:
+        """Allocates ``count`` contiguous nodes and returns the first one."""
+        first = self.size
+        self.reserve(first + count)
+        self.size += count
+        return first
+
+    def is_expanded(self, node: int) -> bool:
+        return self.child_count[node] > 0
+
+    def children(self, node: int) -> np.ndarray:
+        offset = self.child_offset[node]
+        return np.arange(offset, offset + self.child_count[node])
+
+    def expand(self, node: int, policy: np.ndarray) -> None:
+        actions = np.flatnonzero(policy > 0)
+        first = self.add_nodes(len(actions))
+        end = first + len(actions)
+        self.prior[first:end] = policy[actions]
+        self.action[first:end] = actions
+        self.parent[first:end] = node
+        if self.chance_nodes:
+            self.is_chance[first:end] = ACTION_KIND[actions] == REVEAL
+        self.child_offset[node] = first
+        self.child_count[node] = len(actions)
+
+    def expand_chance(self, node: int, pool: np.ndarray) -> None:
+        """Adds one child per identity of ``pool``, the face-down piece counts."""
+        outcomes = np.flatnonzero(pool)
+        first = self.add_nodes(len(outcomes))
+        end = first + len(outcomes)
+        self.prior[first:end] = pool[outcomes] / np.sum(pool)
+        self.action[first:end] = self.action[node]
+        self.outcome[first:end] = outcomes
+        self.parent[first:end] = node
+        self.child_offset[node] = first
+        self.child_count[node] = len(outcomes)
+
+    def set_entry(self, node: int, entry: TranspositionEntry) -> None:
+        slot = self.entry_slots.get(id(entry))
+        if slot is None:
+            slot = len(self.entries)
+            if slot == len(self.shared_visit_count):
+                self.shared_visit_count = np.resize(self.shared_visit_count, slot * 2)
+                self.shared_value_sum = np.resize(self.shared_value_sum, slot * 2)
+            self.entries.append(entry)
+            self.entry_slots[id(entry)] = slot
+            self.shared_visit_count[slot] = entry.visit_count
+            self.shared_value_sum[slot] = entry.value_sum
+        self.entry_slot[node] = slot
+
+    def get_entry(self, node: int) -> Optional[TranspositionEntry]:
+        slot = self.entry_slot[node]
+        return None if slot < 0 else self.entries[slot]
+
+    def find_outcome(self, node: int, identity: int) -> int:
+        """Outcome child of a chance node turning up ``identity``, or -1."""
+        children = self.children(node)
+        matches = children[self.outcome[children] == identity]
+        return int(matches[0]) if len(matches) > 0 else -1
+
+    def select(self, node: int, c: float, virtual_loss: float) -> int:
+        offset = int(self.child_offset[node])
+        children = slice(offset, offset + int(self.child_count[node]))
+        child_visit_count = self.visit_count[children]
+        child_virtual_loss = self.virtual_loss[children]
+        visit_count = child_visit_count
+        value_sum = self.value_sum[children]
+        if self.entries:
+            # slot -1 reads the last slot, masked out right away
+            slots = self.entry_slot[children]
+            shared_visit_count = np.where(slots >= 0, self.shared_visit_count[slots], 0)
+            use_shared = shared_visit_count > visit_count
+            visit_count = np.where(use_shared, shared_visit_count, visit_count)
+            value_sum = np.where(use_shared, self.shared_value_sum[slots], value_sum)
+        visit_count = visit_count + child_virtual_loss
+        value_sum = value_sum + child_virtual_loss * virtual_loss
+        q_value = np.where(
+            visit_count > 0,
+            1 - ((value_sum / np.maximum(visit_count, 1)) + 1) / 2,
+            0.0,
+        )
+        ucb = (
+            q_value
+            + c
+            * (
+                math.sqrt(self.visit_count[node])
+                / (child_visit_count + child_virtual_loss + 1)
+            )
+            * self.prior[children]
+        )
+        best_child = offset + int(np.argmax(ucb))
+        # counted as a loss until revert_virtual_loss, so that other
+        # simulations of the same batch prefer different paths
+        self.virtual_loss[best_child] += 1
+        return best_child
+
+    def select_outcome(self, node: int, outcome_cap: int) -> int:
+        """
+        Samples an outcome of a chance node by its probability. New outcomes
+        are opened progressively, up to sqrt(visits) + 1 and at most
+        ``outcome_cap``; past that only those already sampled are drawn.
+        """
+        offset = int(self.child_offset[node])
+        children = slice(offset, offset + int(self.child_count[node]))
+        weights = self.prior[children]
+        sampled = (self.visit_count[children] + self.virtual_loss[children]) > 0
+        limit = min(outcome_cap, 1 + int(math.sqrt(self.visit_count[node])))
+        if np.count_nonzero(sampled) >= limit:
+            weights = np.where(sampled, weights, 0.0)
+        cumulative = np.cumsum(weights)
+        index = np.searchsorted(
+            cumulative, np.random.random() * cumulative[-1], side="right"
+        )
+        outcome = offset + min(int(index), len(cumulative) - 1)
+        self.virtual_loss[outcome] += 1
+        return outcome
+
+    def revert_virtual_loss(self, node: int) -> None:
+        while node > 0:
+            self.virtual_loss[node] -= 1
+            node = self.parent[node]
+
+    def backpropagate(self, node: int, value: float) -> None:
+        while node >= 0:
+            self.value_sum[node] += value
+            self.visit_count[node] += 1
+            slot = self.entry_slot[node]
+            if slot >= 0:
+                self.shared_value_sum[slot] += value
+                self.shared_visit_count[slot] += 1
+                entry = self.entries[slot]
+                entry.value_sum += value
+                entry.visit_count += 1
+            node = self.parent[node]
+            if node < 0 or not self.is_chance[node]:
+                value = -value
+
+    def root_visit_counts(self, action_size: int) -> np.ndarray:
+        visit_counts = np.zeros(action_size)
+        children = self.children(0)
+        visit_counts[self.action[children]] = self.visit_count[children]
+        return visit_counts
+
+    def extract_subtree(self, node: int) -> "SearchTree":
+        """Copies the subtree of ``node`` into a new tree rooted at node 0."""
+        tree = SearchTree(max(self.capacity // 2, 64), self.chance_nodes)
+        tree.entries = list(self.entries)
+        tree.entry_slots = dict(self.entry_slots)
+        tree.shared_visit_count = self.shared_visit_count.copy()
+        tree.shared_value_sum = self.shared_value_sum.copy()
+        # breadth first, so every block of children stays contiguous
+        queue = deque([(node, 0)])
+        while queue:
+            source, target = queue.popleft()
+            tree.prior[target] = self.prior[source]
+            tree.visit_count[target] = self.visit_count[source]
+            tree.value_sum[target] = self.value_sum[source]
+            tree.action[target] = self.action[source]
+            tree.entry_slot[target] = self.entry_slot[source]
+            tree.is_chance[target] = self.is_chance[source]
+            tree.outcome[target] = self.outcome[source]
+            count = int(self.child_count[source])
+            if count == 0:
+                continue
+            first = tree.add_nodes(count)
+            tree.child_offset[target] = first
+            tree.child_count[target] = count
+            tree.parent[first : first + count] = target
+            offset = int(self.child_offset[source])
+            queue.extend(
+                zip(range(offset, offset + count), range(first, first + count))
+            )
+        tree.parent[0] = -1
+        return tree
@@ -0,0 +1,161 @@
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.mcts import MCTS
+from src.ai.search_pool import worker_mcts
+from src.game_state import GameState
+
+# encoded states (N, 16, 4, 8) as uint8, MCTS policies (N, 456) and the final
+# outcome (N,) of each position for its side to move: 1 won, -1 lost, 0 drawn
+GameRecord = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+MANIFEST_NAME = "manifest.json"
+
+
+def choose_action(probs: np.ndarray, move: int, temperature_moves: int) -> int:
+    """
+    Action played from the visit distribution ``probs`` at ``move`` (from 1):
+    sampled for the first ``temperature_moves`` moves, the most visited after.
+    """
+    if move <= temperature_moves:
+        return int(np.random.choice(len(probs), p=probs))
+    return int(np.argmax(probs))
+
+
+def game_record(
+    ai_game_state_transition_helper: AIGameStateTransitionHelper,
+    states: List[np.ndarray],
+    policies: List[np.ndarray],
+    final_state: np.ndarray,
+    last_action: Optional[int],
+) -> GameRecord:
+    """Record of a game from its positions, their policies and where it ended."""
+    helper = ai_game_state_transition_helper
+    players = np.array([state[2][0][0] for state in states])
+    values = np.zeros(len(players), dtype=np.float32)
+    # otherwise the idle step limit drew the game
+    if helper.check_win(final_state, last_action, current=True):
+        loser = final_state[2][0][0]
+        values[:] = np.where(players == loser, -1, 1)
+    encoded_states = helper.get_encoded_states(np.stack(states)).astype(np.uint8)
+    return encoded_states, np.stack(policies).astype(np.float32), values
+
+
+def play_game(mcts: MCTS, temperature_moves: int) -> GameRecord:
+    """Plays one game of ``mcts`` against itself, see choose_action."""
+    helper = mcts.ai_game_state_transition_helper
+    mcts.new_game()
+    state = helper.get_initial_state(GameState())
+    states: List[np.ndarray] = []
+    policies: List[np.ndarray] = []
+    action: Optional[int] = None
+    while True:
+        _, is_terminal = helper.get_value_and_terminated(state, action, current=True)
+        if is_terminal:
+            break
+        probs = mcts.search(state.copy())
+        states.append(state.copy())
+        policies.append(probs)
+        action = choose_action(probs, len(states), temperature_moves)
+        state = helper.change_perspective(helper.get_next_state(state, action))
+    return game_record(helper, states, policies, state, action)
+
+
+def _play_in_worker(seed: int, temperature_moves: int) -> GameRecord:
+    # the deal of the pieces and the first player come from random
+    random.seed(seed)
+    np.random.seed(seed)
+    mcts = worker_mcts()
+    # the worker's MCTS outlives its games: a game replayed from its seed
+    # must not depend on the games the worker played before it
+    if mcts.evaluation_cache is not None:
+        mcts.evaluation_cache.clear()
+    return play_game(mcts, temperature_moves)
+
+
+def play_games(
+    pool: ProcessPoolExecutor, games: int, temperature_moves: int, seed: int = 0
+) -> Iterator[GameRecord]:
+    """
+    Records of ``games`` self-play games of the search pool workers, in the
+    order of their seeds ``seed``, ``seed + 1``, ...
+    """
+    return pool.map(
+        _play_in_worker, range(seed, seed + games), repeat(temperature_moves)
+    )
+
+
+class ShardWriter:
+    """
+    Writes self-play positions to ``output_dir`` as compressed .npz shards of
+    ``shard_size`` positions, with arrays "states", "policies" and "values".
+
+    manifest.json lists the shards and is rewritten after each one, so an
+    interrupted run leaves every finished shard usable. A writer opened on a
+    directory that already has a manifest appends to it.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        shard_size: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest: Dict[str, Any] = {
+            "positions": 0,
+            "games": 0,
+            "shards": [],
+        }
+        if os.path.exists(self.manifest_path()):
+            with open(self.manifest_path(), encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        self.manifest.update(metadata or {})
+        self.pending: List[GameRecord] = []
+        self.pending_positions = 0
+
+    def manifest_path(self) -> str:
+        return os.path.join(self.output_dir, MANIFEST_NAME)
+
+    def add(self, record: GameRecord) -> None:
+        self.pending.append(record)
+        self.pending_positions += len(record[0])
+        if self.pending_positions >= self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the pending games as one shard, however many positions."""
+        if not self.pending:
+            return
+        states, policies, values = (
+            np.concatenate(arrays) for arrays in zip(*self.pending)
+        )
+        name = f"shard-{len(self.manifest['shards']):05d}.npz"
+        np.savez_compressed(
+            os.path.join(self.output_dir, name),
+            states=states,
+            policies=policies,
+            values=values,
+        )
+        self.manifest["shards"].append(
+            {"file": name, "positions": len(states), "games": len(self.pending)}
+        )
+        self.manifest["positions"] += len(states)
+        self.manifest["games"] += len(self.pending)
+        self.pending = []
+        self.pending_positions = 0
+        temporary_path = f"{self.manifest_path()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(temporary_path, self.manifest_path())
+
+    def close(self) -> Dict[str, Any]:
+        self.flush()
+        return self.manifest
@@ -0,0 +1,165 @@
+import random
+import signal
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.checkpoints import CheckpointWatcher
+from src.ai.mcts import MCTS
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.res_net import ResNet, model_sizes
+from src.ai.search_pool import spawn_context
+from src.ai.self_play import GameRecord, play_game
+from src.ai.vectorized_self_play import VectorizedSelfPlay
+
+# actor, checkpoint version the game was played with, and the game
+ActorGame = Tuple[int, int, GameRecord]
+
+
+def _run_actor(
+    actor: int,
+    args: Dict[str, Any],
+    checkpoint_dir: str,
+    temperature_moves: int,
+    lockstep: int,
+    seed: int,
+    games: Any,
+    stop: Any,
+) -> None:
+    # the parent stops the actors through ``stop``
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    torch.set_num_threads(1)
+    random.seed(seed)
+    np.random.seed(seed)
+    helper = AIGameStateTransitionHelper()
+    watcher = CheckpointWatcher(checkpoint_dir)
+    mcts: Optional[MCTS] = None
+    version = -1
+    while not stop.is_set():
+        # new weights are taken between games, with a new search so that no
+        # cached evaluation of the old ones is reused; within a version the
+        # search clears its transposition table as each game starts. The
+        # sizes are read from the weights, which may change between versions
+        latest = watcher.poll()
+        if latest is not None:
+            version, state_dict = latest
+            model = ResNet(helper, *model_sizes(state_dict), torch.device("cpu"))
+            model.load_state_dict(state_dict)
+            model.eval()
+            mcts = MCTS(args, helper, model)
+        if mcts is None:
+            # nothing published yet
+            stop.wait(0.1)
+            continue
+        # a lockstep round plays four times ``lockstep`` games, as
+        # play_lockstep_games does, so the batch stays full but for its last
+        # games; new weights are taken between rounds
+        records: Iterable[GameRecord] = (
+            VectorizedSelfPlay(mcts, lockstep, temperature_moves).play(4 * lockstep)
+            if lockstep > 0
+            else [play_game(mcts, temperature_moves)]
+        )
+        for record in records:
+            games.put((actor, version, record))
+            if stop.is_set():
+                return
+
+
+class SelfPlayActors:
+    """
+    Self-play processes playing with the newest checkpoint published to
+    ``checkpoint_dir``, switching to a newer one between games. Their games
+    are appended to ``buffer`` by a thread of this process, the buffer's
+    only writer, while a learner samples it.
+    ``lockstep`` > 0 has every actor play that many games in lockstep, in
+    rounds of four times as many games, switching checkpoints between rounds.
+    """
+
+    def __init__(
+        self,
+        args: Dict[str, Any],
+        checkpoint_dir: str,
+        buffer: ReplayBuffer,
+        actors: int,
+        temperature_moves: int,
+        lockstep: int = 0,
+        seed: int = 0,
+    ) -> None:
+        self.buffer = buffer
+        self.games = 0
+        # games played with each checkpoint version
+        self.versions: Dict[int, int] = {}
+        context = spawn_context()
+        self.queue = context.Queue()
+        self.stop_event = context.Event()
+        self.processes = [
+            context.Process(
+                target=_run_actor,
+                args=(
+                    actor,
+                    args,
+                    checkpoint_dir,
+                    temperature_moves,
+                    lockstep,
+                    seed + actor,
+                    self.queue,
+                    self.stop_event,
+                ),
+                daemon=True,
+            )
+            for actor in range(actors)
+        ]
+        self.writer = threading.Thread(target=self._write_games, daemon=True)
+
+    def _write_games(self) -> None:
+        while True:
+            game: Optional[ActorGame] = self.queue.get()
+            if game is None:
+                return
+            _, version, record = game
+            self.buffer.add_game(record)
+            self.versions[version] = self.versions.get(version, 0) + 1
+            self.games += 1
+
+    def start(self) -> None:
+        self.writer.start()
+        for process in self.processes:
+            process.start()
+
+    def wait_for_positions(
+        self, positions: int, timeout: Optional[float] = None
+    ) -> None:
+        """Blocks until the buffer holds ``positions``, or raises RuntimeError."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.buffer.positions < positions:
+            if not any(process.is_alive() for process in self.processes):
+                raise RuntimeError("Every self-play actor has exited")
+            if deadline is not None and time.monotonic() > deadline:
+                raise RuntimeError(f"Fewer than {positions} positions were played")
+            time.sleep(0.1)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Asks the actors to stop after their current game, terminating those
+        still playing after ``timeout`` seconds, then writes what was sent.
+        """
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            # the writer keeps draining the queue, which a process must have
+            # flushed before it can exit
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.queue.put(None)
+        self.writer.join()
+
+    def __enter__(self) -> "SelfPlayActors":
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
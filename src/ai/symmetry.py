@@ -0,0 +1,111 @@
+from typing import Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+from src.ai.model_export import InferenceModel
+from src.ai.piece_action_code import (
+    ACTION_FROM,
+    ACTION_ID,
+    ACTION_KIND,
+    ACTION_TO,
+    COLUMN_COUNT,
+    ROW_COUNT,
+    SQUARE_COUNT,
+)
+
+# symmetries of the board as (rows flipped, columns flipped); the moves and
+# cannon jumps along rows and columns map onto moves and jumps of the image
+SYMMETRIES = (
+    (False, False),  # identity
+    (False, True),  # horizontal flip, left and right swapped
+    (True, False),  # vertical flip, top and bottom swapped
+    (True, True),  # 180 degree rotation
+)
+
+
+def _build_square_permutations() -> np.ndarray:
+    """(4, 32) image of every square under every symmetry."""
+    rows, cols = np.divmod(np.arange(SQUARE_COUNT), COLUMN_COUNT)
+    return np.stack(
+        [
+            np.where(flip_rows, ROW_COUNT - 1 - rows, rows) * COLUMN_COUNT
+            + np.where(flip_cols, COLUMN_COUNT - 1 - cols, cols)
+            for flip_rows, flip_cols in SYMMETRIES
+        ]
+    ).astype(np.int64)
+
+
+SQUARE_PERMUTATIONS = _build_square_permutations()
+# (4, 456) image of every action under every symmetry. Each symmetry is its
+# own inverse, so the same arrays gather a transformed board or policy:
+# ``policy[..., ACTION_PERMUTATIONS[s]]`` is the policy of the board under s
+ACTION_PERMUTATIONS = ACTION_ID[
+    SQUARE_PERMUTATIONS[:, ACTION_FROM], ACTION_KIND, SQUARE_PERMUTATIONS[:, ACTION_TO]
+].astype(np.int64)
+
+
+def transform_batch(
+    states: np.ndarray, policies: np.ndarray, symmetries: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    A (B, 16, 4, 8) batch of encoded states and its (B, 456) policies, each
+    position under its own symmetry of ``symmetries`` (B indices of
+    SYMMETRIES).
+    """
+    squares = SQUARE_PERMUTATIONS[symmetries][:, np.newaxis]
+    transformed_states = np.take_along_axis(
+        states.reshape(len(states), -1, SQUARE_COUNT), squares, axis=2
+    ).reshape(states.shape)
+    transformed_policies = np.take_along_axis(
+        policies, ACTION_PERMUTATIONS[symmetries], axis=1
+    )
+    return transformed_states, transformed_policies
+
+
+def augment_batch(
+    states: np.ndarray,
+    policies: np.ndarray,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The batch with every position under a uniformly random symmetry."""
+    rng = rng or np.random.default_rng()
+    return transform_batch(
+        states, policies, rng.integers(len(SYMMETRIES), size=len(states))
+    )
+
+
+class SymmetricModel:
+    """
+    ``model`` called on every symmetry of the states in one batch, called like
+    ResNet. The policies are mapped back to the original board and averaged,
+    then returned as log-probabilities, so a softmax of them gives the mean;
+    the values are averaged.
+    """
+
+    def __init__(self, model: InferenceModel) -> None:
+        self.model = model
+        self.device = model.device
+        self.squares = torch.from_numpy(SQUARE_PERMUTATIONS).to(self.device)
+        self.actions = torch.from_numpy(ACTION_PERMUTATIONS).to(self.device)
+
+    def __call__(self, states: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        batch_size = len(states)
+        flat = states.reshape(batch_size, -1, SQUARE_COUNT)
+        transformed = torch.cat(
+            [flat[:, :, squares] for squares in self.squares]
+        ).reshape(-1, *states.shape[1:])
+        policies, values = self.model(transformed)
+        probabilities = torch.softmax(policies.float(), dim=1).reshape(
+            len(SYMMETRIES), batch_size, -1
+        )
+        probabilities = torch.stack(
+            [
+                probabilities[symmetry][:, actions]
+                for symmetry, actions in enumerate(self.actions)
+            ]
+        ).mean(0)
+        values = values.float().reshape(len(SYMMETRIES), batch_size, -1).mean(0)
+        return torch.log(probabilities.clamp_min(1e-12)), values
+
+    def eval(self) -> "SymmetricModel":
+        self.model.eval()
+        return self
@@ -0,0 +1,206 @@
+import os
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+import torch.nn.functional as F  # type: ignore
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info  # type: ignore
+from src.ai.checkpoints import publish_checkpoint, save_checkpoint
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.res_net import ResNet
+from src.ai.symmetry import augment_batch
+
+# encoded states (B, 16, 4, 8), target policies (B, 456) and values (B,)
+TrainingBatch = Tuple[torch.Tensor, torch.Tensor, torch.Tensor]
+
+TRAINING_STATE_NAME = "training_state.pt"
+
+
+class ReplayBufferDataset(IterableDataset):
+    """
+    Endless minibatches of ``batch_size`` positions drawn from the replay
+    buffer in ``directory``. Every DataLoader worker opens the buffer itself,
+    draws with its own seed, and reloads it every ``reload_interval`` batches
+    to take in positions appended meanwhile. With ``augment`` each position
+    is put under a random symmetry of the board.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        batch_size: int,
+        seed: int = 0,
+        reload_interval: int = 100,
+        augment: bool = False,
+    ) -> None:
+        self.directory = directory
+        self.batch_size = batch_size
+        self.seed = seed
+        self.reload_interval = reload_interval
+        self.augment = augment
+
+    def __iter__(self) -> Iterator[TrainingBatch]:
+        worker = get_worker_info()
+        rng = np.random.default_rng((self.seed, 0 if worker is None else worker.id))
+        buffer = ReplayBuffer(self.directory)
+        batches = 0
+        while True:
+            if batches % self.reload_interval == 0:
+                buffer.reload()
+            try:
+                states, policies, values = buffer.sample(self.batch_size, rng)
+            except FileNotFoundError:
+                # a shard the writer dropped since the last reload
+                buffer.reload()
+                continue
+            if self.augment:
+                states, policies = augment_batch(states, policies, rng)
+            batches += 1
+            yield (
+                torch.from_numpy(states),
+                torch.from_numpy(policies),
+                torch.from_numpy(values),
+            )
+
+
+def create_data_loader(
+    dataset: ReplayBufferDataset,
+    workers: int,
+    prefetch_factor: int,
+    device: torch.device,
+) -> DataLoader:
+    """Loader of the dataset's minibatches, pinned when they go to a GPU."""
+    return DataLoader(
+        dataset,
+        # the dataset yields whole minibatches
+        batch_size=None,
+        num_workers=workers,
+        pin_memory=device.type == "cuda",
+        prefetch_factor=prefetch_factor if workers > 0 else None,
+        persistent_workers=workers > 0,
+    )
+
+
+def loss_terms(
+    policy_logits: torch.Tensor,
+    values: torch.Tensor,
+    target_policies: torch.Tensor,
+    target_values: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Cross-entropy of the policy against the MCTS visits, and value MSE."""
+    policy_loss = -(target_policies * F.log_softmax(policy_logits, dim=1)).sum(1)
+    value_loss = F.mse_loss(values.squeeze(1), target_values)
+    return policy_loss.mean(), value_loss
+
+
+def train_step(
+    model: ResNet,
+    optimizer: torch.optim.Optimizer,
+    batch: TrainingBatch,
+    bfloat16: bool = False,
+) -> Dict[str, float]:
+    """
+    One optimizer step on ``batch``. With ``bfloat16`` the forward pass runs
+    under CPU autocast, the losses and the weights stay float32.
+    """
+    states, target_policies, target_values = (
+        tensor.to(model.device, non_blocking=True) for tensor in batch
+    )
+    model.train()
+    with torch.autocast("cpu", dtype=torch.bfloat16, enabled=bfloat16):
+        policy_logits, values = model(states)
+    policy_loss, value_loss = loss_terms(
+        policy_logits.float(), values.float(), target_policies, target_values
+    )
+    loss = policy_loss + value_loss
+    optimizer.zero_grad(set_to_none=True)
+    loss.backward()
+    optimizer.step()
+    return {
+        "loss": loss.item(),
+        "policy_loss": policy_loss.item(),
+        "value_loss": value_loss.item(),
+    }
+
+
+def save_training_state(
+    model: ResNet, optimizer: torch.optim.Optimizer, step: int, output_dir: str
+) -> None:
+    temporary_path = os.path.join(output_dir, f"{TRAINING_STATE_NAME}.tmp")
+    torch.save(
+        {
+            "step": step,
+            "model": model.state_dict(),
+            "optimizer": optimizer.state_dict(),
+        },
+        temporary_path,
+    )
+    os.replace(temporary_path, os.path.join(output_dir, TRAINING_STATE_NAME))
+
+
+def load_training_state(
+    model: ResNet, optimizer: torch.optim.Optimizer, output_dir: str
+) -> int:
+    """Restores an interrupted run from ``output_dir``, and returns its step."""
+    path = os.path.join(output_dir, TRAINING_STATE_NAME)
+    if not os.path.exists(path):
+        return 0
+    training_state = torch.load(path, map_location=model.device)
+    model.load_state_dict(training_state["model"])
+    optimizer.load_state_dict(training_state["optimizer"])
+    return training_state["step"]
+
+
+# called with a step and the metrics averaged over the log_interval steps
+# up to it
+MetricsCallback = Callable[[int, Dict[str, float]], None]
+
+
+def format_metrics(step: int, metrics: Dict[str, float]) -> str:
+    return f"step {step}: " + ", ".join(
+        f"{key} {value:.4f}" for key, value in metrics.items()
+    )
+
+
+def train(
+    model: ResNet,
+    optimizer: torch.optim.Optimizer,
+    loader: DataLoader,
+    steps: int,
+    output_dir: str,
+    checkpoint_interval: int,
+    bfloat16: bool = False,
+    start_step: int = 0,
+    log_interval: Optional[int] = None,
+    keep_checkpoints: Optional[int] = None,
+    on_metrics: Optional[MetricsCallback] = None,
+) -> int:
+    """
+    Trains from ``start_step`` up to ``steps``. Every ``checkpoint_interval``
+    steps, and at the end, publishes model-<step>.pt as version ``step`` (see
+    publish_checkpoint, keeping ``keep_checkpoints`` of them), writes model.pt
+    (the latest) and the optimizer state to resume from. Every
+    ``log_interval`` steps the mean metrics are passed to ``on_metrics``.
+    Returns the step reached.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    step = start_step
+    totals: Dict[str, float] = {}
+    batches = iter(loader)
+    while step < steps:
+        metrics = train_step(model, optimizer, next(batches), bfloat16)
+        step += 1
+        for key, value in metrics.items():
+            totals[key] = totals.get(key, 0.0) + value
+        if log_interval and step % log_interval == 0:
+            if on_metrics is not None:
+                on_metrics(
+                    step,
+                    {key: total / log_interval for key, total in totals.items()},
+                )
+            totals = {}
+        if step % checkpoint_interval == 0 or step == steps:
+            publish_checkpoint(model, output_dir, step, keep_checkpoints)
+            save_checkpoint(model, os.path.join(output_dir, "model.pt"))
+            save_training_state(model, optimizer, step, output_dir)
+    model.eval()
+    return step
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+
+
+class TranspositionEntry:
+    """
+    Network evaluation of a position plus the search statistics aggregated over
+    every node that reached it, whatever the path.
+    """
+
+    __slots__ = ("policy", "value", "visit_count", "value_sum")
+
+    def __init__(self, policy: np.ndarray, value: float) -> None:
+        self.policy = policy
+        self.value = value
+        self.visit_count = 0
+        self.value_sum = 0.0
+
+
+class TranspositionTable:
+    """
+    Bounded map from position hash to TranspositionEntry.
+    When full, the least recently used entry is replaced.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.entries: "OrderedDict[int, TranspositionEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, key: int) -> Optional[TranspositionEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key: int, policy: np.ndarray, value: float) -> TranspositionEntry:
+        entry = TranspositionEntry(policy, value)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
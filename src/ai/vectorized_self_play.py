@@ -0,0 +1,233 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+import torch  # type: ignore
+from src.ai.compact_state import CompactState
+from src.ai.mcts import MCTS, SearchBudget, forced_action_probs
+from src.ai.search_pool import worker_mcts
+from src.ai.search_tree import SearchTree
+from src.ai.self_play import GameRecord, choose_action, game_record
+from src.game_state import GameState
+
+
+class LockstepGame:
+    """A game of VectorizedSelfPlay and the search of its next move."""
+
+    __slots__ = (
+        "state",
+        "action",
+        "states",
+        "policies",
+        "tree",
+        "search_state",
+        "budget",
+        "simulations",
+    )
+
+    def __init__(self, state: np.ndarray) -> None:
+        self.state = state
+        self.action: Optional[int] = None
+        self.states: List[np.ndarray] = []
+        self.policies: List[np.ndarray] = []
+        # set while a move is searched
+        self.tree: Optional[SearchTree] = None
+        self.search_state: Optional[CompactState] = None
+        self.budget: Optional[SearchBudget] = None
+        self.simulations = 0
+
+    def search(self) -> Tuple[SearchTree, CompactState, SearchBudget]:
+        """Tree, search state and budget of the move being searched."""
+        assert self.tree is not None
+        assert self.search_state is not None
+        assert self.budget is not None
+        return self.tree, self.search_state, self.budget
+
+
+class VectorizedSelfPlay:
+    """
+    Self-play of up to ``num_games`` games in lockstep, each searching its own
+    tree with the selection, transposition table and evaluation cache of
+    ``mcts``. Every step runs batch_size simulations in each tree and sends
+    all their leaves, and the roots of new searches, to the network in one
+    batch, so the forward pass grows with the number of games. A finished
+    game is swapped for a new one while games are left to start.
+
+    Moves are chosen as in play_game, and each search stops as MCTS.search
+    does, but without a time budget.
+    """
+
+    def __init__(self, mcts: MCTS, num_games: int, temperature_moves: int) -> None:
+        self.mcts = mcts
+        self.ai_game_state_transition_helper = mcts.ai_game_state_transition_helper
+        self.num_games = num_games
+        self.temperature_moves = temperature_moves
+        self.forward_passes = 0
+
+    def new_game(self) -> LockstepGame:
+        return LockstepGame(
+            self.ai_game_state_transition_helper.get_initial_state(GameState())
+        )
+
+    def play_move(self, game: LockstepGame, probs: np.ndarray) -> None:
+        helper = self.ai_game_state_transition_helper
+        game.states.append(game.state.copy())
+        game.policies.append(probs)
+        game.action = choose_action(probs, len(game.states), self.temperature_moves)
+        game.state = helper.change_perspective(
+            helper.get_next_state(game.state, game.action)
+        )
+        game.tree = None
+
+    def needs_search(self, game: LockstepGame) -> bool:
+        """
+        Plays the forced moves of a game that is not searching, and whether a
+        search must now start. False means the game is over.
+        """
+        helper = self.ai_game_state_transition_helper
+        while True:
+            _, is_terminal = helper.get_value_and_terminated(
+                game.state, game.action, current=True
+            )
+            if is_terminal:
+                return False
+            forced_probs = forced_action_probs(helper, game.state)
+            if forced_probs is None:
+                return True
+            self.play_move(game, forced_probs)
+
+    def start_searches(self, games: List[LockstepGame]) -> None:
+        """New trees for ``games``, their roots evaluated in one batch."""
+        args = self.mcts.args
+        policies, _ = self.mcts.evaluate([game.state for game in games])
+        self.forward_passes += 1
+        for game, policy in zip(games, policies):
+            tree = SearchTree(
+                args.get("tree_capacity", 1 << 14), args.get("chance_nodes", True)
+            )
+            tree.visit_count[0] = 1
+            tree.expand(0, policy)
+            self.mcts.add_root_noise(tree)
+            game.tree = tree
+            game.search_state = CompactState.from_array(game.state)
+            game.budget = SearchBudget(
+                args["num_searches"], None, args.get("early_stop", True)
+            )
+            game.simulations = 0
+
+    def simulate(self, games: List[LockstepGame]) -> None:
+        """
+        Runs batch_size simulations in the tree of every game of ``games``.
+        Whether the leaves end their game is found for all of them at once.
+        """
+        batch_size = self.mcts.args.get("batch_size", 1)
+        # tree, node, leaf state and position hash of every selected leaf
+        leaves: List[Tuple[SearchTree, int, np.ndarray, int]] = []
+        for game in games:
+            tree, search_state, budget = game.search()
+            for _ in range(min(batch_size, budget.num_searches - game.simulations)):
+                game.simulations += 1
+                node, leaf_state, key = self.mcts.select_leaf(tree, search_state)
+                leaves.append((tree, node, leaf_state, key))
+        if len(leaves) == 0:
+            return
+        # a search always starts expanded, so every leaf follows an action
+        values, terminated = (
+            self.ai_game_state_transition_helper.get_values_and_terminated_batch(
+                np.stack([leaf_state for _, _, leaf_state, _ in leaves])
+            )
+        )
+        pending = []
+        for (tree, node, leaf_state, key), value, is_terminal in zip(
+            leaves, values.tolist(), terminated.tolist()
+        ):
+            if not self.mcts.resolve_leaf(
+                tree, node, leaf_state, key, (value, is_terminal)
+            ):
+                pending.append((tree, node, leaf_state, key))
+        if len(pending) == 0:
+            return
+        policies, values = self.mcts.evaluate([leaf for _, _, leaf, _ in pending])
+        self.forward_passes += 1
+        for (tree, node, _, key), policy, value in zip(pending, policies, values):
+            self.mcts.complete_leaf(tree, node, key, policy, value)
+
+    @torch.no_grad()
+    def play(self, games: int) -> Iterator[GameRecord]:
+        """Records of ``games`` games, in the order they finish."""
+        # the games share the transposition table: their deals differ, so
+        # they do not meet one another's positions
+        self.mcts.new_game()
+        active: List[LockstepGame] = []
+        started = 0
+        while True:
+            searching = []
+            for game in active:
+                if game.tree is not None:
+                    searching.append(game)
+                elif self.needs_search(game):
+                    searching.append(game)
+                else:
+                    yield game_record(
+                        self.ai_game_state_transition_helper,
+                        game.states,
+                        game.policies,
+                        game.state,
+                        game.action,
+                    )
+            while len(searching) < self.num_games and started < games:
+                game = self.new_game()
+                started += 1
+                if self.needs_search(game):
+                    searching.append(game)
+            active = searching
+            if len(active) == 0:
+                return
+
+            new_searches = [game for game in active if game.tree is None]
+            if new_searches:
+                self.start_searches(new_searches)
+            undecided = []
+            for game in active:
+                tree, _, budget = game.search()
+                if budget.is_exhausted(tree, game.simulations):
+                    self.play_move(game, self.mcts.visit_distribution(tree))
+                else:
+                    undecided.append(game)
+            self.simulate(undecided)
+
+
+def _play_lockstep_in_worker(
+    seed: int, games: int, num_games: int, temperature_moves: int
+) -> List[GameRecord]:
+    random.seed(seed)
+    np.random.seed(seed)
+    self_play = VectorizedSelfPlay(worker_mcts(), num_games, temperature_moves)
+    return list(self_play.play(games))
+
+
+def play_lockstep_games(
+    pool: ProcessPoolExecutor,
+    games: int,
+    num_games: int,
+    temperature_moves: int,
+    seed: int = 0,
+) -> Iterator[GameRecord]:
+    """
+    Records of ``games`` self-play games of the search pool workers, each
+    worker task playing ``num_games`` at a time in lockstep. A task plays four
+    times that many games, so few of its steps run with a shrinking batch.
+    """
+    task_games = 4 * num_games
+    tasks = math.ceil(games / task_games)
+    task_sizes = [min(task_games, games - task * task_games) for task in range(tasks)]
+    for records in pool.map(
+        _play_lockstep_in_worker,
+        range(seed, seed + tasks),
+        task_sizes,
+        repeat(num_games),
+        repeat(temperature_moves),
+    ):
+        yield from records
@@ -25,10 +25,50 @@ BLACK_HORSE_PIECE_IMAGE_PATH = "assets/images/chess_black_horse.png"
 BLACK_CANNON_PIECE_IMAGE_PATH = "assets/images/chess_black_cannon.png"
 BLACK_SOILDER_PIECE_IMAGE_PATH = "assets/images/chess_black_soilder.png"
 
+# Check every incremental update of the legal actions against a full rebuild
+ACTION_SET_DEBUG = False
 
 AI_ARGS = {
+    # "eager" runs ResNet from model.pt, "torchscript" or "onnx" an artifact of
+    # scripts/export_model.py given as the model path
+    "inference_backend": "eager",
+    # Unix socket of a running scripts/serve_model.py; when set, agents send
+    # their positions there instead of loading a model of their own
+    "inference_server": None,
+    # directory a learner publishes versioned checkpoints to (latest.json);
+    # an eager agent switches to each new version between moves
+    "checkpoint_dir": None,
     "C": 2,
+    # most simulations per move, and seconds per move (None for no limit)
     "num_searches": 600,
+    "time_budget": None,
+    # stop once the most visited move can no longer be overtaken
+    "early_stop": True,
     "dirichlet_epsilon": 0.1,
     "dirichlet_alpha": 0.3,
+    # positions kept in the MCTS transposition table, 0 disables it; its
+    # statistics are cleared at the start of every game (see MCTS.new_game)
+    "transposition_table_size": 0,
+    # network evaluations kept in the evaluation cache, 0 disables it; an
+    # entry holds a float32 policy of 456 actions, about 1.8 KB, so 10_000
+    # entries take about 18 MB in every search and every pool worker
+    "evaluation_cache_size": 0,
+    # evaluate every position on its 4 board symmetries in one batch and
+    # average the network outputs (see SymmetricModel)
+    "symmetry_averaging": False,
+    # leaves evaluated per network call, and the loss counted for each leaf in flight
+    "batch_size": 8,
+    "virtual_loss": 1.0,
+    # keep the searched subtree between moves of the agent
+    "reuse_tree": True,
+    # most identities sampled below one reveal (chance node)
+    "chance_outcome_cap": 4,
+    # layouts of the face-down pieces searched per move, 0 searches one tree
+    # with chance nodes instead (see DeterminizedMCTS)
+    "determinizations": 0,
+    # None searches in one thread, "root" runs a tree per worker process and
+    # merges the root visits, "tree" runs search threads on a shared tree
+    "parallel_mode": None,
+    # workers for parallel searches, 0 uses every core
+    "search_workers": 0,
 }
@@ -1,2 +1,6 @@
 class InvalidMoveError(Exception):
     pass
+
+
+class ActionSetMismatchError(Exception):
+    pass
@@ -68,6 +68,8 @@ class Game:
                     mouse_pos = pygame.mouse.get_pos()
                     if self.game_renderer.is_reset_button_pressed(mouse_pos):
                         self.game_state.reset_game()
+                        if self.agent is not None:
+                            self.agent.new_game()
                         self.sent_signal_to_ai()
                     else:
                         if (
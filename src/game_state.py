@@ -1,11 +1,18 @@
 from enum import Enum, auto
 import random
-from typing import Tuple
+from typing import List, Optional, Set, Tuple
 from src.models.board import Board
 from src.models.piece import Piece, PieceColor
 from src.models.piece_action import PieceAction
 from src.handlers.piece_action_manager import PieceActionManager
 from src.models.player import Player, PlayerColor
+from src.models.zobrist import (
+    COLOR_KEYS,
+    SIDE_TO_MOVE_KEY,
+    compute_hash,
+    idle_step_key,
+    piece_key,
+)
 
 
 class GameStatus(Enum):
@@ -27,6 +34,7 @@ class GameState:
         self.selected_piece: Tuple[int, int] = (-1, -1)
         self.rest_piece_of_red_aligment_player = 16
         self.rest_piece_of_black_aligment_player = 16
+        self.zobrist_key = self.compute_state_hash()
 
     def get_piece_by_coordinate(self, row: int, col: int) -> Piece | None:
         return self.board.get_piece_by_coordinate(row, col)
@@ -38,6 +46,7 @@ class GameState:
         next_player_index = (self.current_player_index + 1) % 2
         self.players[next_player_index].assign_color(color.get_opposite_color())
         self.is_color_assign = True
+        self.zobrist_key ^= COLOR_KEYS[0] ^ COLOR_KEYS[self.get_player_color_code(0)]
 
     def get_current_player(self) -> Player:
         return self.players[self.current_player_index]
@@ -52,6 +61,7 @@ class GameState:
         self.piece_action_manager = PieceActionManager(self.board)
         self.rest_piece_of_black_aligment_player = 16
         self.rest_piece_of_red_aligment_player = 16
+        self.zobrist_key = self.compute_state_hash()
 
     def is_piece_selected(self) -> bool:
         return (-1, -1) != self.selected_piece
@@ -64,6 +74,7 @@ class GameState:
 
     def player_toggler(self) -> None:
         self.current_player_index = (self.current_player_index + 1) % 2
+        self.zobrist_key ^= SIDE_TO_MOVE_KEY
 
     def is_ally_selected(self, piece: Piece) -> bool:
         return (
@@ -73,9 +84,13 @@ class GameState:
         )
 
     def reset_idle_steps(self) -> None:
+        self.zobrist_key ^= idle_step_key(self.idle_steps) ^ idle_step_key(0)
         self.idle_steps = 0
 
     def idle_steps_increment(self) -> None:
+        self.zobrist_key ^= idle_step_key(self.idle_steps) ^ idle_step_key(
+            self.idle_steps + 1
+        )
         self.idle_steps += 1
 
     def is_valid_action(self, piece_action: PieceAction) -> bool:
@@ -84,7 +99,44 @@ class GameState:
         )
 
     def implement_action(self, piece_action: PieceAction) -> None:
+        current_index = self.board.to_index(*piece_action.current_position)
+        next_index = self.board.to_index(*piece_action.next_position)
+        pieces = self.board.get_all_pieces_status()
+        changed_indexes = {current_index, next_index}
+        self.zobrist_key ^= self.pieces_hash(pieces, changed_indexes)
         self.piece_action_manager.implement_action(piece_action)
+        self.zobrist_key ^= self.pieces_hash(pieces, changed_indexes)
+
+    def get_player_color_code(self, player_index: int) -> int:
+        """0 when no color is assigned, 1 for red and 2 for black."""
+        match (self.players[player_index].color):
+            case PlayerColor.RED:
+                return 1
+            case PlayerColor.BLACK:
+                return 2
+        return 0
+
+    def pieces_hash(self, pieces: List[Optional[Piece]], indexes: Set[int]) -> int:
+        key = 0
+        for index in indexes:
+            piece = pieces[index]
+            if piece is not None:
+                key ^= piece_key(index, piece.get_identity(), piece.covered)
+        return key
+
+    def compute_state_hash(self) -> int:
+        pieces = self.board.get_all_pieces_status()
+        return compute_hash(
+            [0 if piece is None else piece.get_identity() for piece in pieces],
+            [piece is not None and piece.covered for piece in pieces],
+            self.current_player_index == 1,
+            self.get_player_color_code(0),
+            self.idle_steps,
+        )
+
+    def state_hash(self) -> int:
+        """64-bit Zobrist key of the position, maintained incrementally."""
+        return self.zobrist_key
 
     def update_actions_set(self) -> None:
         self.piece_action_manager.update_action_set()
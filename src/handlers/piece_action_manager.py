@@ -1,52 +1,116 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
+from src.config.settings import ACTION_SET_DEBUG
+from src.exceptions.exceptions import ActionSetMismatchError
 from src.models.board import Board
+from src.models.cannon_attack_table import cannon_jump_targets
 from src.models.piece import Piece, PieceColor, PieceType
 from src.models.piece_action import PieceAction, PieceActionType
 from src.models.player import PlayerColor
 
 
 class PieceActionManager:
-    def __init__(self, board: Board) -> None:
+    """
+    Keeps the legal actions of both alignments and the reveals up to date.
+
+    implement_action records which grids the action can affect (every grid on
+    the rows and columns of its two positions, which covers the neighbors and
+    the cannon lines), and update_action_set regenerates the actions of those
+    grids only. In debug mode every incremental update is checked against a
+    full rebuild.
+    """
+
+    def __init__(self, board: Board, debug: bool = ACTION_SET_DEBUG) -> None:
         self.board = board
+        self.debug = debug
         self.red_alignment_action: Dict[str, PieceAction] = {}
         self.black_alignment_action: Dict[str, PieceAction] = {}
         self.neutral_action: Dict[str, PieceAction] = {}
+        # actions contributed by each grid and the set they were put in
+        self.grid_actions: List[Dict[str, PieceAction]] = []
+        self.grid_action_owners: List[Dict[str, PieceAction]] = []
+        self.pending_indexes: Set[int] = set()
         self.initialization()
 
     def initialization(self) -> None:
-        self.update_action_set()
+        self.rebuild_action_set()
 
-    def update_action_set(self) -> None:
+    def rebuild_action_set(self) -> None:
         self.red_alignment_action = {}
         self.black_alignment_action = {}
         self.neutral_action = {}
-        for index, piece in enumerate(self.board.get_all_pieces_status()):
-            position = self.board.to_coordinates(index)
-            if piece is None:
-                continue
-            if piece.covered:
-                piece_action = PieceAction(position, PieceActionType.REVEAL, position)
-                self.neutral_action[piece_action.generate_hash_key()] = piece_action
-            else:
-                if piece.piece_color == PieceColor.RED:
-                    # movement
-                    self.red_alignment_action.update(
-                        self.generate_movement_piece_action(position)
-                    )
-                    # eating
-                    self.red_alignment_action.update(
-                        self.generate_eating_piece_action(position, piece)
-                    )
-                else:
-                    # movement
-                    self.black_alignment_action.update(
-                        self.generate_movement_piece_action(position)
-                    )
-                    # eating
-                    self.black_alignment_action.update(
-                        self.generate_eating_piece_action(position, piece)
-                    )
+        self.grid_actions = [{} for _ in self.board.get_all_pieces_status()]
+        self.grid_action_owners = [self.neutral_action for _ in self.grid_actions]
+        self.pending_indexes = set()
+        for index in range(len(self.grid_actions)):
+            self.update_grid_actions(index)
+
+    def update_action_set(self) -> None:
+        pending_indexes, self.pending_indexes = self.pending_indexes, set()
+        for index in pending_indexes:
+            self.update_grid_actions(index)
+        if self.debug:
+            self.verify_action_set()
+
+    def update_grid_actions(self, index: int) -> None:
+        owner = self.grid_action_owners[index]
+        for key in self.grid_actions[index]:
+            del owner[key]
+        owner, actions = self.generate_grid_actions(index)
+        owner.update(actions)
+        self.grid_actions[index] = actions
+        self.grid_action_owners[index] = owner
+
+    def generate_grid_actions(
+        self, index: int
+    ) -> Tuple[Dict[str, PieceAction], Dict[str, PieceAction]]:
+        piece = self.board.get_all_pieces_status()[index]
+        position = self.board.to_coordinates(index)
+        if piece is None:
+            return self.neutral_action, {}
+        if piece.covered:
+            piece_action = PieceAction(position, PieceActionType.REVEAL, position)
+            return self.neutral_action, {piece_action.generate_hash_key(): piece_action}
+        owner = (
+            self.red_alignment_action
+            if piece.piece_color == PieceColor.RED
+            else self.black_alignment_action
+        )
+        # movement
+        actions = self.generate_movement_piece_action(position)
+        # eating
+        actions.update(self.generate_eating_piece_action(position, piece))
+        return owner, actions
+
+    def affected_indexes(self, piece_action: PieceAction) -> Set[int]:
+        indexes: Set[int] = set()
+        for row, col in (piece_action.current_position, piece_action.next_position):
+            indexes.update(self.board.to_index(row, i) for i in range(8))
+            indexes.update(self.board.to_index(i, col) for i in range(4))
+        return indexes
+
+    def verify_action_set(self) -> None:
+        incremental = (
+            self.red_alignment_action,
+            self.black_alignment_action,
+            self.neutral_action,
+        )
+        self.rebuild_action_set()
+        rebuilt = (
+            self.red_alignment_action,
+            self.black_alignment_action,
+            self.neutral_action,
+        )
+        for name, incremental_actions, rebuilt_actions in zip(
+            ("red", "black", "neutral"), incremental, rebuilt
+        ):
+            missing = rebuilt_actions.keys() - incremental_actions.keys()
+            unexpected = incremental_actions.keys() - rebuilt_actions.keys()
+            if missing or unexpected:
+                raise ActionSetMismatchError(
+                    f"{name} actions differ from a full rebuild: "
+                    f"missing {sorted(missing)}, unexpected {sorted(unexpected)}"
+                )
 
     def generate_movement_piece_action(
         self, position: Tuple[int, int]
@@ -112,26 +176,13 @@ class PieceActionManager:
     def generate_cannon_potential_attack_positions(
         self, position: Tuple[int, int]
     ) -> List[Tuple[int, int]]:
-        potential_targets: List[Tuple[int, int]] = []
-        dirs = [-1, 0, 1, 0, -1]
-
-        for i in range(4):
-            jump_over = False
-            current_x, current_y = position
-            while True:
-                current_x += dirs[i]
-                current_y += dirs[i + 1]
-                if not (0 <= current_x < 4 and 0 <= current_y < 8):
-                    break
-                next_piece = self.board.get_piece_by_coordinate(current_x, current_y)
-                if next_piece is None:
-                    continue
-                if not jump_over:
-                    jump_over = True
-                else:
-                    potential_targets.append((current_x, current_y))
-                    break
-        return potential_targets
+        return [
+            self.board.to_coordinates(target)
+            for target in cannon_jump_targets(
+                self.board.to_index(position[0], position[1]),
+                self.board.get_occupancy(),
+            )
+        ]
 
     def is_valid_action(
         self, piece_action: PieceAction, player_color: Optional[PlayerColor]
@@ -151,12 +202,10 @@ class PieceActionManager:
             piece_action.next_position[0], piece_action.next_position[1]
         )
         pieces: List[Optional[Piece]] = self.board.get_all_pieces_status()
+        self.pending_indexes.update(self.affected_indexes(piece_action))
         match (piece_action.piece_action_type):
             case PieceActionType.EAT | PieceActionType.MOVE:
-                pieces[next_position], pieces[current_position] = (
-                    pieces[current_position],
-                    None,
-                )
+                self.board.move_piece(current_position, next_position)
             case PieceActionType.REVEAL:
                 piece = pieces[current_position]
                 if piece is not None:
@@ -15,6 +15,8 @@ class Board:
     def __init__(self) -> None:
         # using 1D array store 4*8 pieces of board grids
         self.pieces: List[Optional[Piece]] = []
+        # bit ``row * 8 + col`` set for every occupied grid, kept by move_piece
+        self.occupancy = 0
         self.initailization()
 
     def initailization(self) -> None:
@@ -27,6 +29,7 @@ class Board:
                     key_index += 1
 
         random.shuffle(self.pieces)
+        self.occupancy = (1 << len(self.pieces)) - 1
 
     def to_index(self, row: int, col: int) -> int:
         return row * 8 + col
@@ -45,3 +48,12 @@ class Board:
         This includes both occupied and unoccupied positions on the chessboard.
         """
         return self.pieces
+
+    def get_occupancy(self) -> int:
+        """Returns a 32-bit mask with bit ``row * 8 + col`` set for every occupied grid."""
+        return self.occupancy
+
+    def move_piece(self, current: int, following: int) -> None:
+        """Moves the piece of grid ``current`` onto ``following``, eating what is there."""
+        self.pieces[following], self.pieces[current] = self.pieces[current], None
+        self.occupancy = (self.occupancy & ~(1 << current)) | (1 << following)
@@ -0,0 +1,76 @@
+from typing import List, Tuple
+
+ROW_COUNT = 4
+COLUMN_COUNT = 8
+
+# up, right, down, left
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def rank_occupancy(occupied: int, row: int) -> int:
+    """8-bit occupancy of a row, bit ``col`` set when (row, col) holds a piece."""
+    return (occupied >> (row * COLUMN_COUNT)) & 0xFF
+
+
+def file_occupancy(occupied: int, col: int) -> int:
+    """4-bit occupancy of a column, bit ``row`` set when (row, col) holds a piece."""
+    # gathers bits col, col + 8, col + 16, col + 24 into bits 21..24
+    return (((occupied >> col) & 0x01010101) * 0x00204081 >> 21) & 0xF
+
+
+def _build_cannon_jump_targets() -> List[List[List[int]]]:
+    """
+    CANNON_JUMP_TARGETS[square][direction][line_occupancy] is the square a cannon
+    on ``square`` captures in ``direction`` (jumping exactly one piece), or -1.
+    ``line_occupancy`` is the rank occupancy for left / right and the file
+    occupancy for up / down.
+    """
+    table: List[List[List[int]]] = []
+    for square in range(ROW_COUNT * COLUMN_COUNT):
+        row, col = divmod(square, COLUMN_COUNT)
+        square_table = []
+        for d_row, d_col in DIRECTIONS:
+            line_length = COLUMN_COUNT if d_row == 0 else ROW_COUNT
+            start = col if d_row == 0 else row
+            step = d_col if d_row == 0 else d_row
+            direction_table = []
+            for line_occupancy in range(1 << line_length):
+                target = -1
+                jump_over = False
+                position = start + step
+                while 0 <= position < line_length:
+                    if line_occupancy >> position & 1:
+                        if jump_over:
+                            target = (
+                                row * COLUMN_COUNT + position
+                                if d_row == 0
+                                else position * COLUMN_COUNT + col
+                            )
+                            break
+                        jump_over = True
+                    position += step
+                direction_table.append(target)
+            square_table.append(direction_table)
+        table.append(square_table)
+    return table
+
+
+CANNON_JUMP_TARGETS = _build_cannon_jump_targets()
+
+
+def cannon_jump_targets(square: int, occupied: int) -> List[int]:
+    """Squares a cannon on ``square`` can jump to, given the 32-bit occupancy."""
+    row, col = divmod(square, COLUMN_COUNT)
+    rank = rank_occupancy(occupied, row)
+    file = file_occupancy(occupied, col)
+    square_table = CANNON_JUMP_TARGETS[square]
+    return [
+        target
+        for target in (
+            square_table[0][file],
+            square_table[1][rank],
+            square_table[2][file],
+            square_table[3][rank],
+        )
+        if target >= 0
+    ]
@@ -76,5 +76,11 @@ class Piece:
     def reveal(self) -> None:
         self.covered = False
 
+    def get_identity(self) -> int:
+        """AI state piece code: 10 + type for red, 20 + type for black."""
+        return self.piece_type.value + (
+            10 if self.piece_color == PieceColor.RED else 20
+        )
+
     def __repr__(self) -> str:
         return f"{self.piece_color} {self.piece_type.name}"
@@ -0,0 +1,70 @@
+import random
+from typing import List, Sequence
+
+ZOBRIST_SEED = 0x5EED_BA9C
+SQUARE_COUNT = 32
+# piece identities are 10 + type for red and 20 + type for black
+IDENTITY_COUNT = 28
+# the game is drawn after this many idle steps (moves without reveal or eat)
+IDLE_STEP_LIMIT = 30
+# idle steps below this share one key, so a position whose pieces shuffled
+# back to it is a transposition; from here to the limit the distance to the
+# draw changes the outcome, and every count has its own key
+IDLE_STEP_EXACT = 20
+IDLE_STEP_BUCKETS = IDLE_STEP_LIMIT - IDLE_STEP_EXACT + 2
+
+_random = random.Random(ZOBRIST_SEED)
+
+# PIECE_KEYS[square][identity][covered]
+PIECE_KEYS: List[List[List[int]]] = [
+    [[_random.getrandbits(64) for _ in range(2)] for _ in range(IDENTITY_COUNT)]
+    for _ in range(SQUARE_COUNT)
+]
+# xor-ed in while the second player (AI player 2, game player index 1) is to move
+SIDE_TO_MOVE_KEY = _random.getrandbits(64)
+# indexed by the color of the first player: 0 not assigned, 1 red, 2 black
+COLOR_KEYS: List[int] = [_random.getrandbits(64) for _ in range(3)]
+IDLE_STEP_KEYS: List[int] = [_random.getrandbits(64) for _ in range(IDLE_STEP_BUCKETS)]
+# COVERED_KEYS[square]: a covered piece whatever it hides, for the public key
+# of a position, which leaves out what neither player can see
+COVERED_KEYS: List[int] = [_random.getrandbits(64) for _ in range(SQUARE_COUNT)]
+
+
+def piece_key(square: int, identity: int, covered: bool) -> int:
+    return PIECE_KEYS[square][identity][int(covered)]
+
+
+def idle_step_key(idle_steps: int) -> int:
+    bucket = max(0, min(int(idle_steps), IDLE_STEP_LIMIT) - IDLE_STEP_EXACT + 1)
+    return IDLE_STEP_KEYS[bucket]
+
+
+def compute_hash(
+    identities: Sequence[int],
+    covered: Sequence[bool],
+    second_player_to_move: bool,
+    first_player_color: int,
+    idle_steps: int,
+) -> int:
+    """
+    Full 64-bit Zobrist key of a position. ``identities[square]`` is 0 for an
+    empty square. Incremental updates xor the same keys in and out.
+    """
+    key = 0
+    for square, identity in enumerate(identities):
+        if identity:
+            key ^= PIECE_KEYS[square][identity][int(covered[square])]
+    if second_player_to_move:
+        key ^= SIDE_TO_MOVE_KEY
+    key ^= COLOR_KEYS[first_player_color]
+    key ^= idle_step_key(idle_steps)
+    return key
+
+
+def split_key(key: int) -> List[int]:
+    """Splits a key into four 16-bit limbs, low limb first."""
+    return [(key >> shift) & 0xFFFF for shift in (0, 16, 32, 48)]
+
+
+def join_key(limbs: Sequence[int]) -> int:
+    return sum(int(limb) << shift for limb, shift in zip(limbs, (0, 16, 32, 48)))
@@ -0,0 +1,60 @@
+import random
+from typing import Set
+from src.game_state import GameState
+from src.models.piece import PieceColor
+from src.models.piece_action import PieceActionType
+from src.models.player import PlayerColor
+
+
+def mcts_args(**overrides):
+    return {
+        "C": 2,
+        "num_searches": 60,
+        "dirichlet_epsilon": 0.1,
+        "dirichlet_alpha": 0.3,
+        "early_stop": False,
+        **overrides,
+    }
+
+
+def rules_engine_actions(game_state: GameState) -> Set[str]:
+    manager = game_state.piece_action_manager
+    keys = set(manager.neutral_action)
+    match (game_state.get_current_player().color):
+        case PlayerColor.RED:
+            keys.update(manager.red_alignment_action)
+        case PlayerColor.BLACK:
+            keys.update(manager.black_alignment_action)
+    return keys
+
+
+def play_random_action(game_state: GameState) -> None:
+    play_action(game_state, random.choice(sorted(rules_engine_actions(game_state))))
+
+
+def play_action(game_state: GameState, key: str) -> None:
+    manager = game_state.piece_action_manager
+    actions = {
+        **manager.neutral_action,
+        **manager.red_alignment_action,
+        **manager.black_alignment_action,
+    }
+    piece_action = actions[key]
+    piece = game_state.get_piece_by_coordinate(*piece_action.current_position)
+    game_state.implement_action(piece_action)
+    match (piece_action.piece_action_type):
+        case PieceActionType.REVEAL:
+            if piece is not None:
+                game_state.color_assign(
+                    PlayerColor.RED
+                    if piece.piece_color == PieceColor.RED
+                    else PlayerColor.BLACK
+                )
+            game_state.reset_idle_steps()
+        case PieceActionType.EAT:
+            game_state.rest_piece_of_aligment_decrease()
+            game_state.reset_idle_steps()
+        case PieceActionType.MOVE:
+            game_state.idle_steps_increment()
+    game_state.update_actions_set()
+    game_state.player_toggler()
@@ -0,0 +1,114 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.agent import Agent
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.mcts import MCTS
+from src.ai.piece_action_code import PIECE_ACTION_DECODE_ACTION, action_to_string
+from src.ai.res_net import ResNet
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+from tests.helpers import (
+    play_action,
+    play_random_action,
+    rules_engine_actions,
+)
+
+
+def to_rules_engine_key(action: int) -> str:
+    current, kind, following = action_to_string(action).split("-")
+    row1, col1 = current.strip("()").split(",")
+    row2, col2 = following.strip("()").split(",")
+    return f"({row1}, {col1})-{kind}-({row2}, {col2})"
+
+
+class TestAgent(unittest.TestCase):
+    temporary_directory: tempfile.TemporaryDirectory
+    model_path: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        torch.manual_seed(19)
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        cls.model_path = os.path.join(cls.temporary_directory.name, "model.pt")
+        model = ResNet(AIGameStateTransitionHelper(), 9, 128, torch.device("cpu"))
+        torch.save(model.state_dict(), cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.temporary_directory.cleanup()
+
+    def setUp(self) -> None:
+        random.seed(19)
+        np.random.seed(19)
+        patcher = patch.dict(AI_ARGS, {"num_searches": 60, "reuse_tree": True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.agent = Agent(self.model_path)
+        self.game_state = GameState()
+        if self.game_state.current_player_index != 0:
+            self.game_state.player_toggler()
+
+    def test_reuses_subtree_after_expected_reply(self) -> None:
+        helper = self.agent.ai_game_state_transition_helper
+        # past the opening, where reveals spread the search over many outcomes
+        for _ in range(40):
+            play_random_action(self.game_state)
+        reused = 0
+        for _ in range(8):
+            piece_action = self.agent.predict(self.game_state)
+            self.assertTrue(self.game_state.is_valid_action(piece_action))
+            play_action(self.game_state, piece_action.generate_hash_key())
+            if self.agent.search_root is None:
+                # the agent's reveal turned up an identity the search never drew
+                play_random_action(self.game_state)
+                continue
+            # the opponent answers with the reply the agent explored the most
+            tree, node = self.agent.search_root
+            children = tree.children(node)
+            reply = int(children[np.argmax(tree.visit_count[children])])
+            play_action(self.game_state, to_rules_engine_key(int(tree.action[reply])))
+            if not rules_engine_actions(self.game_state):
+                break
+            if tree.is_chance[reply]:
+                row, col = PIECE_ACTION_DECODE_ACTION[int(tree.action[reply])][0]
+                revealed = self.game_state.get_piece_by_coordinate(row, col)
+                assert revealed is not None
+                reply = tree.find_outcome(reply, revealed.get_identity())
+            state = helper.get_initial_state(self.game_state)
+            subtree = self.agent.find_reusable_root(state)
+            if reply < 0 or not tree.is_expanded(reply):
+                self.assertIsNone(subtree)
+                continue
+            assert subtree is not None
+            self.assertEqual(subtree.visit_count[0], tree.visit_count[reply])
+            self.assertEqual(subtree.child_count[0], tree.child_count[reply])
+            reused += 1
+        self.assertGreater(reused, 0)
+
+    def test_falls_back_to_fresh_tree_for_unknown_position(self) -> None:
+        self.agent.predict(self.game_state)
+        state = self.agent.ai_game_state_transition_helper.get_initial_state(
+            GameState()
+        )
+        self.assertIsNone(self.agent.find_reusable_root(state))
+
+    def test_new_game_forgets_the_last_game(self) -> None:
+        with patch.dict(AI_ARGS, {"transposition_table_size": 1000}):
+            agent = Agent(self.model_path)
+        agent.predict(self.game_state)
+        assert isinstance(agent.mcts, MCTS)
+        table = agent.mcts.transposition_table
+        assert table is not None
+        self.assertGreater(len(table), 0)
+        agent.new_game()
+        self.assertIsNone(agent.search_root)
+        self.assertEqual(len(table), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
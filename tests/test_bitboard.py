@@ -0,0 +1,53 @@
+import random
+import unittest
+from typing import Set
+import numpy as np
+from src.ai.bitboard import legal_action_masks
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.piece_action_code import PIECE_ACTION_DECODE_ACTION
+from src.game_state import GameState
+from tests.helpers import play_random_action, rules_engine_actions
+
+
+class TestBitboard(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(7)
+        self.helper = AIGameStateTransitionHelper()
+
+    def helper_actions(self, game_state: GameState) -> Set[str]:
+        state = self.helper.get_initial_state(game_state)
+        keys = set()
+        for action in self.helper.calculate_valid_action(state, state[2][0][0]):
+            current, kind, following = PIECE_ACTION_DECODE_ACTION[action]
+            keys.add(f"{current}-{('REVEAL', 'MOVE', 'EAT')[kind]}-{following}")
+        return keys
+
+    def test_matches_rules_engine_over_random_games(self) -> None:
+        for _ in range(20):
+            game_state = GameState()
+            for _ in range(150):
+                expected = rules_engine_actions(game_state)
+                self.assertEqual(self.helper_actions(game_state), expected)
+                if not expected:
+                    break
+                play_random_action(game_state)
+
+    def test_batched_masks_match_legal_actions(self) -> None:
+        states = []
+        for _ in range(10):
+            game_state = GameState()
+            for _ in range(150):
+                states.append(self.helper.get_initial_state(game_state))
+                if not rules_engine_actions(game_state):
+                    break
+                play_random_action(game_state)
+        masks = legal_action_masks(np.stack(states))
+        for state, mask in zip(states, masks):
+            self.assertEqual(
+                np.flatnonzero(mask).tolist(),
+                sorted(self.helper.calculate_valid_action(state, state[2][0][0])),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from typing import List
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.game_state import GameState
+from src.models.cannon_attack_table import cannon_jump_targets
+from tests.helpers import play_random_action, rules_engine_actions
+
+
+def scan_cannon_targets(square: int, occupied: int) -> List[int]:
+    targets = []
+    row, col = divmod(square, 8)
+    for d_row, d_col in ((-1, 0), (0, 1), (1, 0), (0, -1)):
+        jump_over = False
+        next_row, next_col = row + d_row, col + d_col
+        while 0 <= next_row < 4 and 0 <= next_col < 8:
+            if occupied >> (next_row * 8 + next_col) & 1:
+                if jump_over:
+                    targets.append(next_row * 8 + next_col)
+                    break
+                jump_over = True
+            next_row, next_col = next_row + d_row, next_col + d_col
+    return targets
+
+
+class TestCannonAttackTable(unittest.TestCase):
+    def test_matches_square_by_square_scan(self) -> None:
+        random.seed(3)
+        for _ in range(2000):
+            occupied = random.getrandbits(32) & random.getrandbits(32)
+            for square in range(32):
+                self.assertEqual(
+                    cannon_jump_targets(square, occupied),
+                    scan_cannon_targets(square, occupied),
+                )
+
+    def test_needs_exactly_one_screen(self) -> None:
+        # cannon on (0,0), screen on (0,3), target on (0,6)
+        self.assertEqual(cannon_jump_targets(0, 1 << 3 | 1 << 6), [6])
+        self.assertEqual(cannon_jump_targets(0, 1 << 6), [])
+        # cannon on (3,7), screen on (2,7), target on (0,7)
+        self.assertEqual(cannon_jump_targets(31, 1 << 23 | 1 << 7), [7])
+
+    def test_board_occupancy_follows_the_game(self) -> None:
+        random.seed(5)
+        helper = AIGameStateTransitionHelper()
+        for _ in range(5):
+            game_state = GameState()
+            for _ in range(200):
+                pieces = game_state.board.get_all_pieces_status()
+                occupied = sum(
+                    1 << index for index, piece in enumerate(pieces) if piece
+                )
+                self.assertEqual(game_state.board.get_occupancy(), occupied)
+                state = helper.get_initial_state(game_state)
+                self.assertEqual(
+                    helper.generate_cannon_potential_attack_positions(state, 1, 2),
+                    [divmod(target, 8) for target in scan_cannon_targets(10, occupied)],
+                )
+                if not rules_engine_actions(game_state):
+                    break
+                play_random_action(game_state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import torch  # type: ignore
+from src.ai.agent import Agent
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.checkpoints import CheckpointWatcher, latest_checkpoint, publish_checkpoint
+from src.ai.res_net import ResNet
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(73)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.directory = self.temporary_directory.name
+        self.helper = AIGameStateTransitionHelper()
+
+    def test_watcher_hands_out_each_new_version_once(self) -> None:
+        watcher = CheckpointWatcher(self.directory)
+        self.assertIsNone(watcher.poll())
+        model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        publish_checkpoint(model, self.directory, 3)
+        version, state_dict = watcher.poll()  # type: ignore
+        self.assertEqual(version, 3)
+        for name, tensor in model.state_dict().items():
+            torch.testing.assert_close(state_dict[name], tensor)
+        self.assertIsNone(watcher.poll())
+        # an older version published later is not taken
+        publish_checkpoint(model, self.directory, 2)
+        self.assertIsNone(watcher.poll())
+        publish_checkpoint(model, self.directory, 5)
+        self.assertEqual(watcher.poll()[0], 5)  # type: ignore
+
+    def test_publication_keeps_the_newest_versions(self) -> None:
+        model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        for version in range(5):
+            publish_checkpoint(model, self.directory, version, keep=2)
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            ["latest.json", "model-0000003.pt", "model-0000004.pt"],
+        )
+        self.assertEqual(
+            latest_checkpoint(self.directory),
+            (4, os.path.join(self.directory, "model-0000004.pt")),
+        )
+
+    def test_agent_swaps_in_published_weights_between_moves(self) -> None:
+        model_path = os.path.join(self.directory, "model.pt")
+        model = ResNet(self.helper, 2, 16, torch.device("cpu"))
+        torch.save(model.state_dict(), model_path)
+        checkpoint_dir = os.path.join(self.directory, "checkpoints")
+        os.makedirs(checkpoint_dir)
+        with patch.dict(
+            AI_ARGS, {"num_searches": 10, "checkpoint_dir": checkpoint_dir}
+        ):
+            agent = Agent(model_path, backend="eager")
+            self.assertIsNone(agent.reload_model())
+            first_search = agent.mcts
+
+            assert isinstance(agent.model, ResNet)
+            self.assertEqual(len(agent.model.back_bone), 2)
+            # the learner may publish a network of other sizes
+            trained = ResNet(self.helper, 3, 24, torch.device("cpu"))
+            publish_checkpoint(trained, checkpoint_dir, 1)
+            game_state = GameState()
+            self.assertTrue(game_state.is_valid_action(agent.predict(game_state)))
+        self.assertIsNot(agent.mcts, first_search)
+        self.assertIs(agent.mcts.model, agent.model)
+        assert isinstance(agent.model, ResNet)
+        for name, tensor in trained.state_dict().items():
+            torch.testing.assert_close(agent.model.state_dict()[name], tensor)
+        self.assertIsNone(agent.reload_model())
+
+
+if __name__ == "__main__":
+    unittest.main()
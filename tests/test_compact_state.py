@@ -0,0 +1,60 @@
+import random
+import unittest
+import numpy as np
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.compact_state import CompactState
+from src.game_state import GameState
+
+
+class TestCompactState(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(11)
+        self.helper = AIGameStateTransitionHelper()
+
+    def test_round_trip(self) -> None:
+        state = self.helper.get_initial_state(GameState())
+        np.testing.assert_array_equal(CompactState.from_array(state).to_array(), state)
+
+    def test_make_matches_helper_and_unmake_restores(self) -> None:
+        for _ in range(10):
+            state = self.helper.get_initial_state(GameState())
+            compact_state = CompactState.from_array(state)
+            history = [state.copy()]
+            for _ in range(120):
+                actions = self.helper.calculate_valid_action(state, state[2][0][0])
+                self.assertEqual(sorted(compact_state.legal_actions()), sorted(actions))
+                if not actions:
+                    break
+                action = random.choice(actions)
+                state = self.helper.change_perspective(
+                    self.helper.get_next_state(state, action)
+                )
+                compact_state.make(action)
+                np.testing.assert_array_equal(compact_state.to_array(), state)
+                history.append(state.copy())
+            while compact_state.undo_stack:
+                compact_state.unmake()
+                history.pop()
+                np.testing.assert_array_equal(compact_state.to_array(), history[-1])
+
+    def test_reveal_with_identity_keeps_hidden_pool(self) -> None:
+        state = self.helper.get_initial_state(GameState())
+        compact_state = CompactState.from_array(state)
+        pool = compact_state.hidden_pool()
+        # reveal square 0 as an identity it does not hold
+        identity = next(i for i in np.flatnonzero(pool) if i != state[1][0][0])
+        compact_state.make(0, int(identity))
+        revealed = compact_state.to_array()
+        self.assertEqual(revealed[1][0][0], identity)
+        self.assertEqual(revealed[0][0][0], identity % 10)
+        pool[identity] -= 1
+        np.testing.assert_array_equal(compact_state.hidden_pool(), pool)
+        self.assertEqual(
+            compact_state.state_hash(), self.helper.compute_state_hash(revealed)
+        )
+        compact_state.unmake()
+        np.testing.assert_array_equal(compact_state.to_array(), state)
+
+
+if __name__ == "__main__":
+    unittest.main()
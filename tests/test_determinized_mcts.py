@@ -0,0 +1,101 @@
+import random
+import time
+import unittest
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.determinized_mcts import DeterminizedMCTS
+from src.ai.res_net import ResNet
+from src.game_state import GameState
+from tests.helpers import mcts_args
+
+
+class TestDeterminizedMCTS(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(29)
+        np.random.seed(29)
+        torch.manual_seed(29)
+        self.helper = AIGameStateTransitionHelper()
+        self.model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        self.model.eval()
+        self.state = self.helper.get_initial_state(GameState())
+        for _ in range(6):
+            actions = self.helper.calculate_valid_action(
+                self.state, self.state[2][0][0]
+            )
+            self.state = self.helper.change_perspective(
+                self.helper.get_next_state(self.state, random.choice(actions))
+            )
+
+    def test_determinization_keeps_public_information(self) -> None:
+        mcts = DeterminizedMCTS(mcts_args(), self.helper, self.model)
+        determinization = mcts.sample_determinization(self.state)
+        covered = self.state[0] == 100
+        np.testing.assert_array_equal(determinization[0], self.state[0])
+        np.testing.assert_array_equal(
+            determinization[1][~covered], self.state[1][~covered]
+        )
+        self.assertEqual(
+            sorted(determinization[1][covered]), sorted(self.state[1][covered])
+        )
+        self.assertEqual(
+            self.helper.state_hash(determinization),
+            self.helper.compute_state_hash(determinization),
+        )
+
+    def assert_search_aggregates(self, workers: int) -> None:
+        mcts = DeterminizedMCTS(
+            mcts_args(num_searches=20, determinizations=3, search_workers=workers),
+            self.helper,
+            self.model,
+        )
+        self.addCleanup(mcts.close)
+        probs = mcts.search(self.state.copy())
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertTrue(
+            np.all(probs[self.helper.get_valid_moves(self.state) == 0] == 0)
+        )
+        # three searches of 20 simulations each
+        np.testing.assert_allclose(probs * 60, np.round(probs * 60), atol=1e-9)
+        # the budget of a single search, as for MCTS.search
+        probs = mcts.search(self.state.copy(), num_searches=7, time_budget=60.0)
+        np.testing.assert_allclose(probs * 21, np.round(probs * 21), atol=1e-9)
+
+    def test_search_without_simulations_falls_back_to_priors(self) -> None:
+        mcts = DeterminizedMCTS(
+            mcts_args(determinizations=3, search_workers=1, time_budget=0.0),
+            self.helper,
+            self.model,
+        )
+        probs = mcts.search(self.state.copy())
+        self.assertFalse(np.any(np.isnan(probs)))
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertTrue(
+            np.all(probs[self.helper.get_valid_moves(self.state) == 0] == 0)
+        )
+
+    def test_time_budget_is_for_the_whole_move(self) -> None:
+        mcts = DeterminizedMCTS(
+            mcts_args(
+                num_searches=10**6,
+                determinizations=6,
+                search_workers=1,
+                time_budget=0.25,
+            ),
+            self.helper,
+            self.model,
+        )
+        start = time.monotonic()
+        probs = mcts.search(self.state.copy())
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertAlmostEqual(probs.sum(), 1.0)
+
+    def test_search_in_process(self) -> None:
+        self.assert_search_aggregates(1)
+
+    def test_search_in_worker_processes(self) -> None:
+        self.assert_search_aggregates(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from src.ai.evaluation_cache import EvaluationCache
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def test_lookup_counts_hits_and_misses(self) -> None:
+        cache = EvaluationCache(4)
+        policy = np.ones(456) / 456
+        self.assertIsNone(cache.lookup((1, 1)))
+        cache.store((1, 1), policy, 0.5)
+        entry = cache.lookup((1, 1))
+        assert entry is not None
+        self.assertIs(entry[0], policy)
+        self.assertIsNone(cache.lookup((1, 2)))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertAlmostEqual(cache.hit_rate(), 1 / 3)
+
+    def test_least_recently_used_is_replaced(self) -> None:
+        cache = EvaluationCache(2)
+        policy = np.zeros(456)
+        cache.store((1, 1), policy, 0.0)
+        cache.store((2, 1), policy, 0.0)
+        cache.lookup((1, 1))
+        cache.store((3, 1), policy, 0.0)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.lookup((1, 1)))
+        self.assertIsNone(cache.lookup((2, 1)))
+
+    def test_clear(self) -> None:
+        cache = EvaluationCache(2)
+        cache.store((1, 1), np.zeros(456), 0.0)
+        cache.lookup((1, 1))
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+        self.assertEqual(cache.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.agent import Agent
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.inference_client import InferenceClient
+from src.ai.inference_server import InferenceServer
+from src.ai.mcts import MCTS
+from src.ai.model_export import sample_positions
+from src.ai.res_net import ResNet
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+from tests.helpers import mcts_args
+
+
+class TestInferenceServer(unittest.TestCase):
+    helper: AIGameStateTransitionHelper
+    model: ResNet
+    server: InferenceServer
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        torch.manual_seed(47)
+        cls.helper = AIGameStateTransitionHelper()
+        cls.model = ResNet(cls.helper, 1, 8, torch.device("cpu"))
+        cls.model.eval()
+        # a long wait, so requests of concurrent clients share a batch
+        cls.server = InferenceServer(cls.model, max_batch_size=32, max_wait=0.05)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop()
+
+    def encoded_positions(self, count: int, seed: int) -> torch.Tensor:
+        states = sample_positions(count, seed=seed)
+        return torch.from_numpy(self.helper.get_encoded_states(states))
+
+    def test_client_matches_model(self) -> None:
+        client = self.server.client()
+        self.addCleanup(client.close)
+        planes = self.encoded_positions(16, seed=47)
+        with torch.no_grad():
+            policy, value = self.model(planes)
+        served_policy, served_value = client(planes)
+        np.testing.assert_allclose(served_policy.numpy(), policy.numpy(), atol=1e-5)
+        np.testing.assert_allclose(served_value.numpy(), value.numpy(), atol=1e-5)
+
+    def test_requests_of_clients_are_batched(self) -> None:
+        clients = [self.server.client() for _ in range(8)]
+        for client in clients:
+            self.addCleanup(client.close)
+        planes = self.encoded_positions(8, seed=48)
+        batches = self.server.batches.value
+        with ThreadPoolExecutor(len(clients)) as executor:
+            results = list(
+                executor.map(
+                    lambda index: clients[index](planes[index : index + 1]),
+                    range(len(clients)),
+                )
+            )
+        self.assertEqual([len(policy) for policy, _ in results], [1] * len(clients))
+        self.assertLess(self.server.batches.value - batches, len(clients))
+
+    def test_search_through_pickled_client(self) -> None:
+        client = pickle.loads(pickle.dumps(self.server.client()))
+        self.addCleanup(client.close)
+        mcts = MCTS(mcts_args(num_searches=20), self.helper, client)
+        state = self.helper.get_initial_state(GameState())
+        probs = mcts.search(state)
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertTrue(np.all(probs[self.helper.get_valid_moves(state) == 0] == 0))
+
+    def test_agent_uses_server(self) -> None:
+        with patch.dict(
+            AI_ARGS, {"num_searches": 20, "inference_server": self.server.address}
+        ):
+            agent = Agent("unused.pt")
+            game_state = GameState()
+            self.assertTrue(game_state.is_valid_action(agent.predict(game_state)))
+            assert isinstance(agent.model, InferenceClient)
+            agent.model.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
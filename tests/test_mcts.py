@@ -0,0 +1,245 @@
+import random
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.evaluation_cache import EvaluationCache
+from src.ai.mcts import MCTS, SearchBudget
+from src.ai.piece_action_code import action_from_string
+from src.ai.search_tree import SearchTree
+from src.ai.res_net import ResNet
+from src.game_state import GameState
+from tests.helpers import mcts_args
+
+
+class TestMCTS(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(17)
+        np.random.seed(17)
+        torch.manual_seed(17)
+        self.helper = AIGameStateTransitionHelper()
+        self.model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        self.model.eval()
+
+    def play_into_midgame(self) -> np.ndarray:
+        state = self.helper.get_initial_state(GameState())
+        for _ in range(40):
+            actions = self.helper.calculate_valid_action(state, state[2][0][0])
+            next_state = self.helper.change_perspective(
+                self.helper.get_next_state(state.copy(), random.choice(actions))
+            )
+            if not self.helper.calculate_valid_action(next_state, next_state[2][0][0]):
+                break
+            state = next_state
+        return state
+
+    def assert_legal_distribution(self, state: np.ndarray, probs: np.ndarray) -> None:
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertTrue(np.all(probs[self.helper.get_valid_moves(state) == 0] == 0))
+
+    def test_search(self) -> None:
+        state = self.play_into_midgame()
+        mcts = MCTS(mcts_args(), self.helper, self.model)
+        self.assert_legal_distribution(state, mcts.search(state.copy()))
+
+    def kings_endgame(self) -> np.ndarray:
+        """Only the two generals left, revealed, far apart: red to move."""
+        state = self.helper.get_initial_state(GameState())
+        state[:2] = 0
+        state[0][0][0], state[1][0][0] = 1, 11
+        state[0][3][7], state[1][3][7] = 1, 21
+        state[2][0][:6] = [1, 1, 2, 1, 1, 0]
+        self.helper.set_state_hash(state, self.helper.compute_state_hash(state))
+        return state
+
+    def test_shuffled_back_position_hits_transposition_table(self) -> None:
+        state = self.kings_endgame()
+        mcts = MCTS(mcts_args(transposition_table_size=1000), self.helper, self.model)
+        mcts.search(state.copy())
+        # both generals step away and back: the same board, 4 idle steps later
+        shuffled = state.copy()
+        for key in (
+            "(0,0)-MOVE-(0,1)",
+            "(3,7)-MOVE-(3,6)",
+            "(0,1)-MOVE-(0,0)",
+            "(3,6)-MOVE-(3,7)",
+        ):
+            shuffled = self.helper.change_perspective(
+                self.helper.get_next_state(shuffled, action_from_string(key))
+            )
+        self.assertEqual(shuffled[2][0][5], 4)
+        self.assertEqual(
+            self.helper.state_hash(shuffled), self.helper.state_hash(state)
+        )
+        # the replies searched from the first visit are found from the second
+        table = mcts.transposition_table
+        assert table is not None
+        for action in self.helper.calculate_valid_action(shuffled, 1):
+            child = self.helper.change_perspective(
+                self.helper.get_next_state(shuffled.copy(), action)
+            )
+            entry = table.lookup(self.helper.state_hash(child))
+            self.assertIsNotNone(entry)
+
+    def test_new_game_clears_transposition_statistics(self) -> None:
+        state = self.kings_endgame()
+        mcts = MCTS(mcts_args(transposition_table_size=1000), self.helper, self.model)
+        mcts.search(state.copy())
+        table = mcts.transposition_table
+        assert table is not None
+        self.assertGreater(len(table), 0)
+        mcts.new_game()
+        self.assertEqual(len(table), 0)
+
+    def test_search_with_transposition_table(self) -> None:
+        state = self.play_into_midgame()
+        mcts = MCTS(mcts_args(transposition_table_size=1000), self.helper, self.model)
+        self.assert_legal_distribution(state, mcts.search(state.copy()))
+        assert mcts.transposition_table is not None
+        self.assertGreater(len(mcts.transposition_table), 0)
+
+    def test_batched_search_reverts_virtual_loss(self) -> None:
+        state = self.play_into_midgame()
+        mcts = MCTS(
+            mcts_args(batch_size=8, transposition_table_size=1000),
+            self.helper,
+            self.model,
+        )
+        probs = mcts.search(state.copy())
+        self.assert_legal_distribution(state, probs)
+        tree = mcts.tree
+        assert tree is not None
+        self.assertTrue(np.all(tree.virtual_loss[: tree.size] == 0))
+        self.assertEqual(tree.visit_count[0], 1 + mcts_args()["num_searches"])
+
+    def test_search_continues_reused_tree(self) -> None:
+        state = self.play_into_midgame()
+        mcts = MCTS(mcts_args(), self.helper, self.model)
+        mcts.search(state.copy())
+        assert mcts.tree is not None
+        tree = mcts.tree.extract_subtree(0)
+        visit_count = tree.visit_count[0]
+        mcts.search(state.copy(), tree)
+        self.assertIs(mcts.tree, tree)
+        self.assertEqual(tree.visit_count[0], visit_count)
+
+    def test_search_ignores_hidden_identities(self) -> None:
+        state = self.play_into_midgame()
+        shuffled = state.copy()
+        covered = np.flatnonzero(state[0] == 100)
+        self.assertGreater(len(set(state[1].flat[covered])), 1)
+        shuffled[1].flat[covered] = np.roll(state[1].flat[covered], 1)
+        self.helper.set_state_hash(shuffled, self.helper.compute_state_hash(shuffled))
+        mcts = MCTS(mcts_args(batch_size=4), self.helper, self.model)
+        np.random.seed(23)
+        probs = mcts.search(state.copy())
+        np.random.seed(23)
+        np.testing.assert_array_equal(mcts.search(shuffled), probs)
+
+    def test_single_legal_move_returns_without_search(self) -> None:
+        state = np.zeros((3, 4, 8), dtype=int)
+        # a red general cornered by a black soldier it cannot eat
+        state[0][0][0], state[1][0][0] = 1, 11
+        state[0][0][1], state[1][0][1] = 7, 27
+        state[2][0][:6] = [1, 1, 2, 1, 1, 0]
+        self.helper.set_state_hash(state, self.helper.compute_state_hash(state))
+        mcts = MCTS(mcts_args(), self.helper, self.model)
+        probs = mcts.search(state)
+        self.assertEqual(np.flatnonzero(probs).tolist(), [np.argmax(probs)])
+        self.assertEqual(probs.sum(), 1.0)
+        self.assertIsNone(mcts.tree)
+
+    def test_budget_stops_when_lead_cannot_be_overtaken(self) -> None:
+        tree = SearchTree(8)
+        policy = np.zeros(456)
+        policy[[40, 41, 42]] = 1 / 3
+        tree.expand(0, policy)
+        tree.visit_count[1:4] = [50, 3, 1]
+        budget = SearchBudget(100)
+        self.assertFalse(budget.is_exhausted(tree, 10))
+        self.assertTrue(budget.is_exhausted(tree, 60))
+        self.assertFalse(SearchBudget(100, early_stop=False).is_exhausted(tree, 60))
+        self.assertTrue(SearchBudget(100, time_budget=0.0).is_exhausted(tree, 0))
+
+    def test_early_stop_saves_simulations(self) -> None:
+        state = self.play_into_midgame()
+        mcts = MCTS(
+            mcts_args(num_searches=400, early_stop=True), self.helper, self.model
+        )
+        self.assert_legal_distribution(state, mcts.search(state.copy()))
+        assert mcts.tree is not None
+        self.assertLess(mcts.tree.visit_count[0], 401)
+
+    def test_time_budget(self) -> None:
+        state = self.play_into_midgame()
+        mcts = MCTS(mcts_args(num_searches=10**6), self.helper, self.model)
+        start = time.monotonic()
+        probs = mcts.search(state.copy(), time_budget=0.2)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assert_legal_distribution(state, probs)
+        self.assert_legal_distribution(
+            state, mcts.search(state.copy(), time_budget=0.0)
+        )
+
+    def test_evaluation_cache_matches_model_and_runs_duplicates_once(self) -> None:
+        state = self.play_into_midgame()
+        other = self.helper.change_perspective(
+            self.helper.get_next_state(
+                state.copy(),
+                self.helper.calculate_valid_action(state, state[2][0][0])[0],
+            )
+        )
+        mcts = MCTS(mcts_args(evaluation_cache_size=10), self.helper, self.model)
+        batch_sizes = []
+        evaluate_with_model = mcts.evaluate_with_model
+
+        def count_batch(states):
+            batch_sizes.append(len(states))
+            return evaluate_with_model(states)
+
+        with patch.object(mcts, "evaluate_with_model", count_batch):
+            policies, values = mcts.evaluate([state, other, state])
+            cached_policies, cached_values = mcts.evaluate([other, state])
+        expected_policies, expected_values = evaluate_with_model([state, other, state])
+        np.testing.assert_allclose(policies, expected_policies, rtol=1e-6)
+        np.testing.assert_allclose(values, expected_values, rtol=1e-6)
+        np.testing.assert_array_equal(cached_policies, policies[[1, 0]])
+        np.testing.assert_array_equal(cached_values, values[[1, 0]])
+        self.assertEqual(batch_sizes, [2])
+        assert mcts.evaluation_cache is not None
+        self.assertEqual(mcts.evaluation_cache.hits, 2)
+
+    def test_evaluation_cache_ignores_hidden_identities(self) -> None:
+        state = self.play_into_midgame()
+        shuffled = state.copy()
+        covered = np.flatnonzero(state[0] == 100)
+        self.assertGreater(len(set(state[1].flat[covered])), 1)
+        shuffled[1].flat[covered] = np.roll(state[1].flat[covered], 1)
+        self.helper.set_state_hash(shuffled, self.helper.compute_state_hash(shuffled))
+        self.assertNotEqual(
+            self.helper.state_hash(shuffled), self.helper.state_hash(state)
+        )
+        mcts = MCTS(mcts_args(evaluation_cache_size=10), self.helper, self.model)
+        mcts.evaluate([state])
+        mcts.evaluate([shuffled])
+        assert mcts.evaluation_cache is not None
+        self.assertEqual(mcts.evaluation_cache.hits, 1)
+        self.assertNotEqual(
+            mcts.evaluation_keys([state]),
+            mcts.evaluation_keys([self.helper.change_perspective(state.copy())]),
+        )
+
+    def test_evaluation_cache_is_shared_between_searches(self) -> None:
+        state = self.play_into_midgame()
+        cache = EvaluationCache(10_000)
+        MCTS(mcts_args(), self.helper, self.model, cache).search(state.copy())
+        misses = cache.misses
+        MCTS(mcts_args(), self.helper, self.model, cache).search(state.copy())
+        self.assertGreater(cache.hits, 0)
+        self.assertLess(cache.misses - misses, misses)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.agent import Agent
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.model_export import (
+    ExportedModel,
+    export_onnx,
+    export_torchscript,
+    fuse_conv_bn,
+    parity_report,
+    sample_positions,
+)
+from src.ai.res_net import ResNet
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+
+ONNX_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ("onnx", "onnxruntime")
+)
+
+
+class TestModelExport(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(41)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.model = ResNet(AIGameStateTransitionHelper(), 2, 16, torch.device("cpu"))
+        # non-trivial batch norm statistics, so folding them is exercised
+        for module in self.model.modules():
+            if isinstance(module, torch.nn.BatchNorm2d):
+                assert module.running_mean is not None
+                assert module.running_var is not None
+                module.running_mean.uniform_(-1, 1)
+                module.running_var.uniform_(0.5, 2)
+        self.model.eval()
+        self.positions = sample_positions(64, seed=41)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.temporary_directory.name, name)
+
+    def assert_parity(self, exported) -> None:
+        report = parity_report(self.model, exported, self.positions)
+        self.assertEqual(report["positions"], 64)
+        self.assertLess(report["policy_max_abs_error"], 1e-5)
+        self.assertLess(report["value_max_abs_error"], 1e-5)
+        self.assertEqual(report["top1_agreement"], 1.0)
+
+    def test_fusion_removes_batch_norm(self) -> None:
+        fused = fuse_conv_bn(self.model)
+        self.assertFalse(
+            any(isinstance(m, torch.nn.BatchNorm2d) for m in fused.modules())
+        )
+        self.assert_parity(fused)
+
+    def test_torchscript_export(self) -> None:
+        export_torchscript(self.model, self.path("model.ts"))
+        self.assert_parity(ExportedModel("torchscript", self.path("model.ts")))
+
+    @unittest.skipUnless(ONNX_AVAILABLE, "onnx and onnxruntime are not installed")
+    def test_onnx_export(self) -> None:
+        export_onnx(self.model, self.path("model.onnx"))
+        self.assert_parity(ExportedModel("onnx", self.path("model.onnx")))
+
+    def test_unknown_backend(self) -> None:
+        with self.assertRaises(ValueError):
+            ExportedModel("tensorrt", self.path("model.ts"))
+
+    def test_agent_runs_torchscript_artifact(self) -> None:
+        model = ResNet(AIGameStateTransitionHelper(), 9, 128, torch.device("cpu"))
+        export_torchscript(model, self.path("model.ts"))
+        with patch.dict(AI_ARGS, {"num_searches": 20}):
+            agent = Agent(self.path("model.ts"), backend="torchscript")
+            game_state = GameState()
+            self.assertTrue(game_state.is_valid_action(agent.predict(game_state)))
+
+
+if __name__ == "__main__":
+    unittest.main()
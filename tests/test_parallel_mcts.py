@@ -0,0 +1,71 @@
+import random
+from concurrent.futures import Future
+import unittest
+from typing import List
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.parallel_mcts import InferenceWorker, RootParallelMCTS, TreeParallelMCTS
+from src.ai.res_net import ResNet
+from src.game_state import GameState
+from tests.helpers import mcts_args
+
+
+class TestParallelMCTS(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(31)
+        np.random.seed(31)
+        torch.manual_seed(31)
+        self.helper = AIGameStateTransitionHelper()
+        self.model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        self.model.eval()
+        self.state = self.helper.get_initial_state(GameState())
+
+    def assert_legal_distribution(self, probs: np.ndarray) -> None:
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertTrue(
+            np.all(probs[self.helper.get_valid_moves(self.state) == 0] == 0)
+        )
+
+    def test_tree_parallel_search(self) -> None:
+        args = mcts_args(search_workers=4, transposition_table_size=1000)
+        mcts = TreeParallelMCTS(args, self.helper, self.model)
+        self.assert_legal_distribution(mcts.search(self.state.copy()))
+        tree = mcts.tree
+        assert tree is not None
+        self.assertEqual(tree.visit_count[0], 1 + args["num_searches"])
+        self.assertTrue(np.all(tree.virtual_loss[: tree.size] == 0))
+
+    def test_inference_worker_batches_requests(self) -> None:
+        calls = []
+
+        def evaluate(states):
+            calls.append(len(states))
+            return np.zeros((len(states), 456)), np.arange(len(states), dtype=float)
+
+        inference = InferenceWorker(evaluate, 4, 1.0)
+        futures: List[Future] = [Future() for _ in range(4)]
+        for future in futures:
+            inference.requests.put((self.state, future))
+        inference.start()
+        self.assertEqual([future.result()[1] for future in futures], [0, 1, 2, 3])
+        inference.stop()
+        self.assertEqual(calls, [4])
+
+    def test_root_parallel_search(self) -> None:
+        mcts = RootParallelMCTS(
+            mcts_args(num_searches=30, search_workers=2), self.helper, self.model
+        )
+        self.addCleanup(mcts.close)
+        probs = mcts.search(self.state.copy())
+        self.assert_legal_distribution(probs)
+        # two trees of 15 simulations each
+        np.testing.assert_allclose(probs * 30, np.round(probs * 30), atol=1e-9)
+        # the budget of a single search, as for MCTS.search
+        probs = mcts.search(self.state.copy(), num_searches=10, time_budget=60.0)
+        self.assert_legal_distribution(probs)
+        np.testing.assert_allclose(probs * 10, np.round(probs * 10), atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from src.ai.piece_action_code import (
+    ACTION_FROM,
+    ACTION_ID,
+    ACTION_KIND,
+    ACTION_SIZE,
+    ACTION_TO,
+    PIECE_ACTION_DECODE_ACTION,
+    action_from_string,
+    action_to_string,
+)
+
+
+class TestPieceActionCode(unittest.TestCase):
+    def test_known_indices(self) -> None:
+        self.assertEqual(ACTION_SIZE, 456)
+        self.assertEqual(action_from_string("(0,0)-REVEAL-(0,0)"), 0)
+        self.assertEqual(action_from_string("(0,0)-MOVE-(0,1)"), 32)
+        self.assertEqual(action_from_string("(1,1)-MOVE-(0,1)"), 60)
+        self.assertEqual(action_from_string("(0,0)-EAT-(0,1)"), 136)
+        self.assertEqual(action_from_string("(1,1)-EAT-(1,3)"), 305)
+        self.assertEqual(action_from_string("(3,7)-EAT-(0,7)"), 455)
+        self.assertEqual(PIECE_ACTION_DECODE_ACTION[431], ((3, 4), 2, (3, 0)))
+
+    def test_tables_are_inverse(self) -> None:
+        for action in range(ACTION_SIZE):
+            self.assertEqual(
+                ACTION_ID[ACTION_FROM[action], ACTION_KIND[action], ACTION_TO[action]],
+                action,
+            )
+            self.assertEqual(action_from_string(action_to_string(action)), action)
+        self.assertEqual((ACTION_ID >= 0).sum(), ACTION_SIZE)
+
+    def test_unknown_action(self) -> None:
+        with self.assertRaises(KeyError):
+            action_from_string("(0,0)-MOVE-(2,2)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import random
+import unittest
+from src.exceptions.exceptions import ActionSetMismatchError
+from src.game_state import GameState
+from src.handlers.piece_action_manager import PieceActionManager
+from tests.helpers import play_random_action, rules_engine_actions
+
+
+class TestPieceActionManager(unittest.TestCase):
+    def test_incremental_update_matches_full_rebuild(self) -> None:
+        random.seed(5)
+        for _ in range(30):
+            game_state = GameState()
+            game_state.piece_action_manager = PieceActionManager(
+                game_state.board, debug=True
+            )
+            for _ in range(200):
+                if not rules_engine_actions(game_state):
+                    break
+                play_random_action(game_state)
+
+    def test_debug_mode_detects_stale_actions(self) -> None:
+        game_state = GameState()
+        manager = PieceActionManager(game_state.board, debug=True)
+        game_state.board.get_all_pieces_status()[0] = None
+        with self.assertRaises(ActionSetMismatchError):
+            manager.update_action_set()
+
+
+if __name__ == "__main__":
+    unittest.main()
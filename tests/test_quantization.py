@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.agent import Agent
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.model_export import (
+    ExportedModel,
+    example_input,
+    parity_report,
+    sample_positions,
+)
+from src.ai.quantization import load_calibration_planes, quantize_model, save_quantized
+from src.ai.res_net import ResNet
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+
+
+class TestQuantization(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(43)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.helper = AIGameStateTransitionHelper()
+        self.model = ResNet(self.helper, 2, 16, torch.device("cpu"))
+        self.model.eval()
+        self.calibration_states = sample_positions(128, seed=1)
+        self.positions = sample_positions(64, seed=43)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.temporary_directory.name, name)
+
+    def quantized_artifact(self, mode: str, model=None) -> ExportedModel:
+        model = model or self.model
+        planes = self.helper.get_encoded_states(self.calibration_states)
+        quantized = quantize_model(model, mode, planes)
+        save_quantized(quantized, example_input(model), self.path(f"{mode}.ts"))
+        return ExportedModel("torchscript", self.path(f"{mode}.ts"))
+
+    def test_static_quantization_keeps_accuracy(self) -> None:
+        report = parity_report(
+            self.model, self.quantized_artifact("static"), self.positions
+        )
+        self.assertGreaterEqual(report["top1_agreement"], 0.8)
+        self.assertLess(report["value_mse"], 1e-2)
+
+    def test_dynamic_quantization_keeps_accuracy(self) -> None:
+        report = parity_report(
+            self.model, self.quantized_artifact("dynamic"), self.positions
+        )
+        self.assertGreaterEqual(report["top1_agreement"], 0.9)
+        self.assertLess(report["value_mse"], 1e-3)
+
+    def test_static_quantization_needs_calibration(self) -> None:
+        with self.assertRaises(ValueError):
+            quantize_model(self.model, "static")
+        with self.assertRaises(ValueError):
+            quantize_model(self.model, "float16")
+
+    def test_calibration_planes_from_states_or_planes(self) -> None:
+        planes = self.helper.get_encoded_states(self.calibration_states)
+        np.save(self.path("states.npy"), self.calibration_states)
+        np.savez_compressed(self.path("shard.npz"), states=planes)
+        for name in ("states.npy", "shard.npz"):
+            loaded = load_calibration_planes(self.path(name), self.helper)
+            self.assertEqual(loaded.dtype, np.float32)
+            np.testing.assert_array_equal(loaded, planes)
+
+    def test_agent_runs_quantized_artifact(self) -> None:
+        model = ResNet(self.helper, 9, 128, torch.device("cpu"))
+        model.eval()
+        self.quantized_artifact("static", model)
+        with patch.dict(AI_ARGS, {"num_searches": 20}), patch(
+            "src.ai.agent.ResNet"
+        ) as res_net:
+            agent = Agent(self.path("static.ts"), backend="torchscript")
+            # only the eager backend needs the network in Python
+            res_net.assert_not_called()
+            game_state = GameState()
+            self.assertTrue(game_state.is_valid_action(agent.predict(game_state)))
+
+
+if __name__ == "__main__":
+    unittest.main()
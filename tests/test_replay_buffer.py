@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.self_play import ShardWriter
+
+
+def positions(start: int, count: int):
+    """Positions whose value, policy and state all encode their index."""
+    indices = np.arange(start, start + count)
+    states = np.zeros((count, 16, 4, 8), np.uint8)
+    states[:, 0, 0, 0] = indices % 256
+    policies = np.zeros((count, 456), np.float32)
+    policies[np.arange(count), indices % 456] = 1
+    return states, policies, indices.astype(np.float32)
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.directory = self.temporary_directory.name
+        self.rng = np.random.default_rng(61)
+
+    def shard_files(self):
+        return sorted(name for name in os.listdir(self.directory) if "shard" in name)
+
+    def test_gather_reads_rows_across_shards(self) -> None:
+        buffer = ReplayBuffer(self.directory, window=1000, shard_size=64)
+        for start, count in ((0, 10), (10, 100), (110, 90)):
+            buffer.append(*positions(start, count))
+        self.assertEqual(len(buffer), 200)
+        indices = np.array([199, 3, 64, 63, 128, 3])
+        states, policies, values = buffer.gather(indices)
+        np.testing.assert_array_equal(values, indices)
+        np.testing.assert_array_equal(states[:, 0, 0, 0], indices % 256)
+        np.testing.assert_array_equal(np.argmax(policies, axis=1), indices % 456)
+        self.assertEqual(states.dtype, np.float32)
+
+    def test_window_slides_and_old_shards_are_deleted(self) -> None:
+        buffer = ReplayBuffer(self.directory, window=250, shard_size=100)
+        for start in range(0, 500, 50):
+            buffer.append(*positions(start, 50))
+        self.assertEqual(len(buffer), 250)
+        _, _, values = buffer.sample(2000, self.rng)
+        self.assertEqual(values.min(), 250)
+        self.assertEqual(values.max(), 499)
+        # shards 2 to 4 still hold positions of the window
+        self.assertEqual(len(self.shard_files()), 3 * 3)
+
+    def test_reopened_buffer_continues_and_readers_reload(self) -> None:
+        writer = ReplayBuffer(self.directory, window=300, shard_size=64)
+        writer.append(*positions(0, 100))
+        reader = ReplayBuffer(self.directory)
+        self.assertEqual((len(reader), reader.shard_size), (100, 64))
+
+        writer = ReplayBuffer(self.directory)
+        writer.append(*positions(100, 400))
+        self.assertEqual(len(reader), 100)
+        reader.reload()
+        self.assertEqual(len(reader), 300)
+        _, _, values = reader.sample(500, self.rng)
+        self.assertGreaterEqual(values.min(), 200)
+
+    def test_adds_self_play_shards(self) -> None:
+        self_play_directory = os.path.join(self.directory, "self_play")
+        writer = ShardWriter(self_play_directory, 30)
+        for start in range(0, 100, 25):
+            writer.add(positions(start, 25))
+        writer.close()
+        buffer = ReplayBuffer(os.path.join(self.directory, "buffer"), shard_size=64)
+        self.assertEqual(buffer.add_self_play(self_play_directory), 100)
+        np.testing.assert_array_equal(buffer.gather(np.arange(100))[2], np.arange(100))
+
+    def test_empty_buffer_cannot_be_sampled(self) -> None:
+        with self.assertRaises(ValueError):
+            ReplayBuffer(self.directory).sample(8)
+
+
+if __name__ == "__main__":
+    unittest.main()
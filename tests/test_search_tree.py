@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+from src.ai.search_tree import SearchTree
+from src.ai.transposition_table import TranspositionEntry
+
+
+class TestSearchTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = SearchTree(4)
+        self.tree.visit_count[0] = 1
+        policy = np.zeros(456)
+        policy[[3, 40, 200]] = [0.2, 0.5, 0.3]
+        self.tree.expand(0, policy)
+
+    def test_expand_stores_children_contiguously(self) -> None:
+        children = self.tree.children(0)
+        self.assertEqual(children.tolist(), [1, 2, 3])
+        self.assertEqual(self.tree.action[children].tolist(), [3, 40, 200])
+        self.assertTrue(np.all(self.tree.parent[children] == 0))
+
+    def test_buffers_grow_past_capacity(self) -> None:
+        policy = np.zeros(456)
+        policy[:10] = 0.1
+        self.tree.expand(2, policy)
+        self.assertEqual(self.tree.size, 14)
+        self.assertGreaterEqual(self.tree.capacity, 14)
+        self.assertEqual(self.tree.action[1:4].tolist(), [3, 40, 200])
+
+    def test_select_prefers_prior_then_applies_virtual_loss(self) -> None:
+        self.assertEqual(self.tree.select(0, 2, 1.0), 2)
+        self.assertEqual(self.tree.virtual_loss[2], 1)
+        self.assertEqual(self.tree.select(0, 2, 1.0), 3)
+        self.tree.revert_virtual_loss(2)
+        self.tree.revert_virtual_loss(3)
+        self.assertTrue(np.all(self.tree.virtual_loss == 0))
+
+    def test_backpropagate_alternates_sign(self) -> None:
+        self.tree.backpropagate(2, 0.5)
+        self.assertEqual(self.tree.value_sum[2], 0.5)
+        self.assertEqual(self.tree.value_sum[0], -0.5)
+        self.assertEqual(self.tree.visit_count[0], 2)
+
+    def test_nodes_of_one_entry_share_statistics(self) -> None:
+        entry = TranspositionEntry(np.zeros(456), 0.0)
+        self.tree.set_entry(1, entry)
+        self.tree.set_entry(3, entry)
+        self.tree.backpropagate(1, 1.0)
+        self.assertEqual(entry.visit_count, 1)
+        self.assertEqual(self.tree.shared_visit_count[self.tree.entry_slot[3]], 1)
+
+    def test_extract_subtree(self) -> None:
+        policy = np.zeros(456)
+        policy[[5, 6]] = 0.5
+        self.tree.expand(2, policy)
+        self.tree.backpropagate(4, 1.0)
+        subtree = self.tree.extract_subtree(2)
+        self.assertEqual(subtree.size, 3)
+        self.assertEqual(subtree.parent[0], -1)
+        self.assertEqual(subtree.action[subtree.children(0)].tolist(), [5, 6])
+        self.assertEqual(subtree.visit_count[0], 1)
+        self.assertEqual(subtree.value_sum[1], 1.0)
+
+    def test_reveals_are_chance_nodes(self) -> None:
+        self.assertEqual(self.tree.is_chance[1:4].tolist(), [True, False, False])
+
+    def test_chance_outcomes_follow_the_pool(self) -> None:
+        pool = np.zeros(28, dtype=np.int64)
+        pool[[11, 17, 27]] = [1, 5, 2]
+        self.tree.expand_chance(1, pool)
+        outcomes = self.tree.children(1)
+        self.assertEqual(self.tree.outcome[outcomes].tolist(), [11, 17, 27])
+        self.assertEqual(self.tree.prior[outcomes].tolist(), [0.125, 0.625, 0.25])
+        self.assertTrue(np.all(self.tree.action[outcomes] == 3))
+
+    def test_select_outcome_respects_cap(self) -> None:
+        pool = np.ones(28, dtype=np.int64)
+        self.tree.expand_chance(1, pool)
+        self.tree.visit_count[1] = 10_000
+        sampled = set()
+        for _ in range(200):
+            outcome = self.tree.select_outcome(1, 3)
+            self.tree.revert_virtual_loss(outcome)
+            self.tree.backpropagate(outcome, 0.0)
+            sampled.add(outcome)
+        self.assertEqual(len(sampled), 3)
+
+    def test_backpropagate_keeps_sign_across_chance_node(self) -> None:
+        pool = np.zeros(28, dtype=np.int64)
+        pool[12] = 1
+        self.tree.expand_chance(1, pool)
+        self.tree.backpropagate(4, 0.5)
+        self.assertEqual(self.tree.value_sum[4], 0.5)
+        self.assertEqual(self.tree.value_sum[1], 0.5)
+        self.assertEqual(self.tree.value_sum[0], -0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
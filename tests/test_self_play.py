@@ -0,0 +1,106 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from typing import cast
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.mcts import MCTS
+from src.ai.res_net import ResNet
+from src.ai.search_pool import create_search_pool
+from src.ai.self_play import ShardWriter, play_game, play_games
+from tests.helpers import mcts_args
+
+
+class RandomSearch:
+    """Stands in for MCTS with a uniform policy over the legal actions."""
+
+    def __init__(self) -> None:
+        self.ai_game_state_transition_helper = AIGameStateTransitionHelper()
+
+    def new_game(self) -> None:
+        pass
+
+    def search(self, state: np.ndarray) -> np.ndarray:
+        valid_moves = self.ai_game_state_transition_helper.get_valid_moves(state)
+        return valid_moves / np.sum(valid_moves)
+
+
+def game_record(positions: int):
+    return (
+        np.zeros((positions, 16, 4, 8), np.uint8),
+        np.full((positions, 456), 1 / 456, np.float32),
+        np.ones(positions, np.float32),
+    )
+
+
+class TestSelfPlay(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(53)
+        np.random.seed(53)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.output_dir = self.temporary_directory.name
+
+    def test_game_records_outcome_for_side_to_move(self) -> None:
+        decisive = 0
+        for _ in range(20):
+            states, policies, values = play_game(
+                cast(MCTS, RandomSearch()), temperature_moves=1000
+            )
+            self.assertEqual(states.shape, (len(values), 16, 4, 8))
+            self.assertEqual(states.dtype, np.uint8)
+            # one-hot planes
+            self.assertTrue(np.all(states.sum(axis=1) == 1))
+            np.testing.assert_allclose(policies.sum(axis=1), 1, rtol=1e-5)
+            if np.any(values != 0):
+                decisive += 1
+                # the last mover won, and the side to move alternates
+                self.assertEqual(values[-1], 1)
+                np.testing.assert_array_equal(values[1:], -values[:-1])
+            else:
+                np.testing.assert_array_equal(values, 0)
+        self.assertGreater(decisive, 0)
+
+    def test_shard_writer_splits_positions_and_appends(self) -> None:
+        writer = ShardWriter(self.output_dir, 100, {"num_searches": 8})
+        for positions in (60, 50, 30):
+            writer.add(game_record(positions))
+        manifest = writer.close()
+        self.assertEqual(
+            [shard["positions"] for shard in manifest["shards"]], [110, 30]
+        )
+        self.assertEqual(manifest["games"], 3)
+        shard = np.load(os.path.join(self.output_dir, "shard-00000.npz"))
+        self.assertEqual(shard["states"].shape, (110, 16, 4, 8))
+        self.assertEqual(shard["policies"].shape, (110, 456))
+
+        ShardWriter(self.output_dir, 100).close()
+        writer = ShardWriter(self.output_dir, 100)
+        writer.add(game_record(120))
+        writer.close()
+        with open(os.path.join(self.output_dir, "manifest.json")) as file:
+            manifest = json.load(file)
+        self.assertEqual(manifest["positions"], 260)
+        self.assertEqual(manifest["num_searches"], 8)
+        self.assertEqual(manifest["shards"][-1]["file"], "shard-00002.npz")
+
+    def test_games_played_by_pool_workers(self) -> None:
+        model = ResNet(AIGameStateTransitionHelper(), 1, 8, torch.device("cpu"))
+        model.eval()
+        # with the tables a worker's MCTS carries from one game to the next
+        args = mcts_args(
+            num_searches=4, transposition_table_size=1000, evaluation_cache_size=1000
+        )
+        with create_search_pool(args, model, 2) as pool:
+            records = list(play_games(pool, 2, temperature_moves=4, seed=53))
+            replayed = next(play_games(pool, 1, temperature_moves=4, seed=53))
+        self.assertEqual(len(records), 2)
+        # games are reproducible from their seed
+        np.testing.assert_array_equal(records[0][0], replayed[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
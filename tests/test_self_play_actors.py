@@ -0,0 +1,58 @@
+import tempfile
+import time
+import unittest
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.checkpoints import publish_checkpoint
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.res_net import ResNet
+from src.ai.self_play_actors import SelfPlayActors
+from tests.helpers import mcts_args
+
+
+class TestSelfPlayActors(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(79)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.directory = self.temporary_directory.name
+        self.model = ResNet(AIGameStateTransitionHelper(), 1, 8, torch.device("cpu"))
+
+    def run_actors(self, actors: int, lockstep: int) -> None:
+        publish_checkpoint(self.model, self.directory, 0)
+        buffer = ReplayBuffer(f"{self.directory}/buffer", shard_size=256)
+        with SelfPlayActors(
+            mcts_args(num_searches=4),
+            self.directory,
+            buffer,
+            actors=actors,
+            temperature_moves=4,
+            lockstep=lockstep,
+        ) as self_play_actors:
+            self_play_actors.wait_for_positions(50, timeout=120)
+            # a version of other sizes, as when the learner's model grows
+            publish_checkpoint(
+                ResNet(AIGameStateTransitionHelper(), 2, 16, torch.device("cpu")),
+                self.directory,
+                1,
+            )
+            deadline = time.monotonic() + 120
+            while 1 not in self_play_actors.versions and time.monotonic() < deadline:
+                time.sleep(0.1)
+        self.assertIn(1, self_play_actors.versions)
+        self.assertEqual(
+            sum(self_play_actors.versions.values()), self_play_actors.games
+        )
+        # every game sent before the stop was written
+        self.assertEqual(ReplayBuffer(buffer.directory).positions, buffer.positions)
+        self.assertGreaterEqual(buffer.positions, 50)
+
+    def test_actors_fill_the_buffer_and_take_new_versions(self) -> None:
+        self.run_actors(actors=2, lockstep=0)
+
+    def test_lockstep_actor_takes_new_versions_between_rounds(self) -> None:
+        self.run_actors(actors=1, lockstep=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
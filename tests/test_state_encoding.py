@@ -0,0 +1,50 @@
+import random
+import unittest
+import numpy as np
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.game_state import GameState
+
+
+class TestStateEncoding(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(37)
+        self.helper = AIGameStateTransitionHelper()
+
+    def test_planes(self) -> None:
+        state = np.zeros((3, 4, 8), dtype=int)
+        state[0][0][0], state[1][0][0] = 100, 13
+        state[0][0][1], state[1][0][1] = 6, 26
+        state[0][0][2], state[1][0][2] = 2, 12
+        # black to move
+        state[2][0][:6] = [2, 1, 2, 1, 2, 0]
+        encoded = self.helper.get_encoded_state(state)
+        self.assertEqual(encoded.dtype, np.float32)
+        self.assertEqual(encoded.shape, (16, 4, 8))
+        np.testing.assert_array_equal(encoded.sum(axis=0), np.ones((4, 8)))
+        self.assertEqual(encoded[15][0][0], 1)
+        self.assertEqual(encoded[6][0][1], 1)
+        self.assertEqual(encoded[2 + 7][0][2], 1)
+        self.assertEqual(encoded[0].sum(), 29)
+
+    def test_batch_matches_single_states_and_reuses_buffer(self) -> None:
+        played = []
+        state = self.helper.get_initial_state(GameState())
+        for _ in range(60):
+            actions = self.helper.calculate_valid_action(state, state[2][0][0])
+            if not actions:
+                break
+            played.append(state.copy())
+            state = self.helper.change_perspective(
+                self.helper.get_next_state(state, random.choice(actions))
+            )
+        states = np.stack(played)
+        buffer = np.full((len(states), 16, 4, 8), 7, dtype=np.float32)
+        encoded = self.helper.get_encoded_states(states, buffer)
+        self.assertIs(encoded, buffer)
+        for state, planes in zip(states, encoded):
+            np.testing.assert_array_equal(self.helper.get_encoded_state(state), planes)
+        np.testing.assert_array_equal(encoded.sum(axis=1), np.ones((len(states), 4, 8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
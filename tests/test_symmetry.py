@@ -0,0 +1,120 @@
+import random
+import unittest
+from typing import List
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.mcts import MCTS
+from src.ai.piece_action_code import ACTION_KIND
+from src.ai.res_net import ResNet
+from src.ai.symmetry import (
+    ACTION_PERMUTATIONS,
+    SYMMETRIES,
+    SymmetricModel,
+    augment_batch,
+    transform_batch,
+)
+from src.game_state import GameState
+from tests.helpers import mcts_args
+
+
+def flip(array: np.ndarray, symmetry: int) -> np.ndarray:
+    """Board axes (the last two) of ``array`` under a symmetry."""
+    flip_rows, flip_cols = SYMMETRIES[symmetry]
+    axes = tuple(
+        axis for axis, flipped in ((-2, flip_rows), (-1, flip_cols)) if flipped
+    )
+    return np.flip(array, axes).copy() if axes else array.copy()
+
+
+class TestSymmetry(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(71)
+        torch.manual_seed(71)
+        self.helper = AIGameStateTransitionHelper()
+        self.states: List[np.ndarray] = []
+        state = self.helper.get_initial_state(GameState())
+        while len(self.states) < 60:
+            valid_actions = self.helper.calculate_valid_action(state, state[2][0][0])
+            if not valid_actions or state[2][0][5] >= 30:
+                state = self.helper.get_initial_state(GameState())
+                continue
+            state = self.helper.change_perspective(
+                self.helper.get_next_state(state, random.choice(valid_actions))
+            )
+            self.states.append(state.copy())
+
+    def flipped_states(self, symmetry: int) -> np.ndarray:
+        states = np.stack(self.states)
+        # the pieces, not the header row
+        states[:, :2] = flip(states[:, :2], symmetry)
+        return states
+
+    def test_permutations_are_involutions_keeping_the_kind(self) -> None:
+        for permutation in ACTION_PERMUTATIONS:
+            np.testing.assert_array_equal(permutation[permutation], np.arange(456))
+            np.testing.assert_array_equal(ACTION_KIND[permutation], ACTION_KIND)
+        np.testing.assert_array_equal(ACTION_PERMUTATIONS[0], np.arange(456))
+
+    def test_legal_actions_follow_the_board(self) -> None:
+        masks = self.helper.get_valid_moves_batch(np.stack(self.states))
+        for symmetry, permutation in enumerate(ACTION_PERMUTATIONS):
+            np.testing.assert_array_equal(
+                self.helper.get_valid_moves_batch(self.flipped_states(symmetry)),
+                masks[:, permutation],
+            )
+
+    def test_transform_batch_per_position(self) -> None:
+        encoded = self.helper.get_encoded_states(np.stack(self.states))
+        policies = self.helper.get_valid_moves_batch(np.stack(self.states))
+        symmetries = np.arange(len(encoded)) % len(SYMMETRIES)
+        states, transformed = transform_batch(
+            encoded, policies.astype(np.float32), symmetries
+        )
+        for index, symmetry in enumerate(symmetries.tolist()):
+            np.testing.assert_array_equal(states[index], flip(encoded[index], symmetry))
+            np.testing.assert_array_equal(
+                transformed[index],
+                self.helper.get_valid_moves_batch(
+                    self.flipped_states(symmetry)[index : index + 1]
+                )[0],
+            )
+        augmented, _ = augment_batch(encoded, policies, np.random.default_rng(71))
+        self.assertEqual(augmented.shape, encoded.shape)
+        np.testing.assert_array_equal(
+            augmented.sum(axis=(2, 3)), encoded.sum(axis=(2, 3))
+        )
+
+    def test_symmetric_model_is_invariant(self) -> None:
+        model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        model.eval()
+        symmetric = SymmetricModel(model)
+        encoded = self.helper.get_encoded_states(np.stack(self.states[:8]))
+        with torch.no_grad():
+            policies, values = symmetric(torch.from_numpy(encoded))
+            for symmetry in range(1, len(SYMMETRIES)):
+                flipped_policies, flipped_values = symmetric(
+                    torch.from_numpy(flip(encoded, symmetry))
+                )
+                torch.testing.assert_close(
+                    flipped_policies, policies[:, ACTION_PERMUTATIONS[symmetry]]
+                )
+                torch.testing.assert_close(flipped_values, values)
+        self.assertEqual(values.shape, (8, 1))
+        torch.testing.assert_close(torch.exp(policies).sum(1), torch.ones(8))
+
+    def test_search_with_symmetry_averaging(self) -> None:
+        model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        model.eval()
+        mcts = MCTS(
+            mcts_args(num_searches=16, symmetry_averaging=True), self.helper, model
+        )
+        self.assertIsInstance(mcts.model, SymmetricModel)
+        probs = mcts.search(self.states[10])
+        self.assertTrue(
+            np.all(probs[self.helper.get_valid_moves(self.states[10]) == 0] == 0)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
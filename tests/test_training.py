@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+from typing import Dict, List, Tuple
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.agent import Agent
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.replay_buffer import ReplayBuffer
+from src.ai.res_net import ResNet
+from src.ai.training import (
+    ReplayBufferDataset,
+    create_data_loader,
+    load_training_state,
+    loss_terms,
+    train,
+    train_step,
+)
+from src.config.settings import AI_ARGS
+from src.game_state import GameState
+
+
+def fill_buffer(directory: str, count: int) -> None:
+    """Positions whose targets the network can learn from the input planes."""
+    rng = np.random.default_rng(67)
+    states = np.zeros((count, 16, 4, 8), np.uint8)
+    pieces = rng.integers(0, 16, size=(count, 4, 8))
+    np.put_along_axis(states, pieces[:, None], 1, axis=1)
+    policies = np.zeros((count, 456), np.float32)
+    policies[np.arange(count), pieces[:, 0, 0]] = 1
+    values = np.where(pieces[:, 0, 1] < 8, 1, -1).astype(np.float32)
+    ReplayBuffer(directory, shard_size=64).append(states, policies, values)
+
+
+class TestTraining(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(67)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.buffer_dir = os.path.join(self.temporary_directory.name, "buffer")
+        self.output_dir = os.path.join(self.temporary_directory.name, "checkpoints")
+        fill_buffer(self.buffer_dir, 200)
+        self.helper = AIGameStateTransitionHelper()
+        self.device = torch.device("cpu")
+
+    def test_loss_terms(self) -> None:
+        logits = torch.tensor([[0.0, 0.0], [2.0, 0.0]])
+        targets = torch.tensor([[1.0, 0.0], [0.5, 0.5]])
+        policy_loss, value_loss = loss_terms(
+            logits, torch.tensor([[0.5], [-1.0]]), targets, torch.tensor([1.0, 1.0])
+        )
+        expected = -(targets * torch.log_softmax(logits, dim=1)).sum(1).mean()
+        self.assertAlmostEqual(policy_loss.item(), expected.item(), places=6)
+        self.assertAlmostEqual(value_loss.item(), (0.25 + 4) / 2, places=6)
+
+    def test_loss_decreases(self) -> None:
+        for bfloat16 in (False, True):
+            model = ResNet(self.helper, 1, 16, self.device)
+            optimizer = torch.optim.AdamW(model.parameters(), lr=1e-2)
+            batches = iter(ReplayBufferDataset(self.buffer_dir, 64, seed=67))
+            losses = [
+                train_step(model, optimizer, next(batches), bfloat16)["loss"]
+                for _ in range(40)
+            ]
+            self.assertLess(np.mean(losses[-5:]), np.mean(losses[:5]) * 0.7)
+
+    def test_workers_draw_distinct_batches(self) -> None:
+        loader = create_data_loader(
+            ReplayBufferDataset(self.buffer_dir, 32, seed=67), 2, 2, self.device
+        )
+        batches = iter(loader)
+        first, second = next(batches), next(batches)
+        del batches, loader
+        self.assertEqual(first[0].shape, (32, 16, 4, 8))
+        self.assertEqual(first[1].shape, (32, 456))
+        self.assertEqual(first[2].dtype, torch.float32)
+        self.assertFalse(torch.equal(first[2], second[2]))
+
+    def test_metrics_are_averaged_over_log_interval(self) -> None:
+        model = ResNet(self.helper, 1, 8, self.device)
+        optimizer = torch.optim.AdamW(model.parameters(), lr=1e-3)
+        loader = create_data_loader(
+            ReplayBufferDataset(self.buffer_dir, 8), 0, 2, self.device
+        )
+        logged: List[Tuple[int, Dict[str, float]]] = []
+        train(
+            model,
+            optimizer,
+            loader,
+            4,
+            self.output_dir,
+            10,
+            log_interval=2,
+            on_metrics=lambda step, metrics: logged.append((step, metrics)),
+        )
+        self.assertEqual([step for step, _ in logged], [2, 4])
+        for _, metrics in logged:
+            self.assertEqual(set(metrics), {"loss", "policy_loss", "value_loss"})
+            self.assertGreater(metrics["loss"], 0)
+
+    def test_checkpoints_load_into_agent_and_resume(self) -> None:
+        model = ResNet(self.helper, 9, 128, self.device)
+        optimizer = torch.optim.AdamW(model.parameters(), lr=1e-3)
+        loader = create_data_loader(
+            ReplayBufferDataset(self.buffer_dir, 8), 0, 2, self.device
+        )
+        self.assertEqual(train(model, optimizer, loader, 3, self.output_dir, 2), 3)
+        self.assertEqual(
+            sorted(name for name in os.listdir(self.output_dir)),
+            [
+                "latest.json",
+                "model-0000002.pt",
+                "model-0000003.pt",
+                "model.pt",
+                "training_state.pt",
+            ],
+        )
+        with patch.dict(AI_ARGS, {"num_searches": 20}):
+            agent = Agent(os.path.join(self.output_dir, "model.pt"), backend="eager")
+            game_state = GameState()
+            self.assertTrue(game_state.is_valid_action(agent.predict(game_state)))
+
+        resumed = ResNet(self.helper, 9, 128, self.device)
+        resumed_optimizer = torch.optim.AdamW(resumed.parameters(), lr=1e-3)
+        self.assertEqual(
+            load_training_state(resumed, resumed_optimizer, self.output_dir), 3
+        )
+        for name, tensor in model.state_dict().items():
+            torch.testing.assert_close(resumed.state_dict()[name], tensor)
+
+
+if __name__ == "__main__":
+    unittest.main()
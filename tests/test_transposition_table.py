@@ -0,0 +1,28 @@
+import unittest
+import numpy as np
+from src.ai.transposition_table import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_hits_and_misses(self) -> None:
+        table = TranspositionTable(4)
+        self.assertIsNone(table.lookup(1))
+        entry = table.store(1, np.ones(3), 0.5)
+        self.assertIs(table.lookup(1), entry)
+        self.assertEqual((table.hits, table.misses), (1, 1))
+        self.assertEqual(table.hit_rate(), 0.5)
+
+    def test_replaces_least_recently_used(self) -> None:
+        table = TranspositionTable(2)
+        table.store(1, np.ones(3), 0.0)
+        table.store(2, np.ones(3), 0.0)
+        table.lookup(1)
+        table.store(3, np.ones(3), 0.0)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.evictions, 1)
+        self.assertIsNotNone(table.lookup(1))
+        self.assertIsNone(table.lookup(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
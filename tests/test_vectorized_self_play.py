@@ -0,0 +1,104 @@
+import random
+import unittest
+from unittest.mock import patch
+import numpy as np
+import torch  # type: ignore
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.mcts import MCTS
+from src.ai.res_net import ResNet
+from src.ai.search_pool import create_search_pool
+from src.ai.vectorized_self_play import VectorizedSelfPlay, play_lockstep_games
+from src.game_state import GameState
+from tests.helpers import mcts_args
+
+
+class TestVectorizedSelfPlay(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(59)
+        np.random.seed(59)
+        torch.manual_seed(59)
+        self.helper = AIGameStateTransitionHelper()
+        self.model = ResNet(self.helper, 1, 8, torch.device("cpu"))
+        self.model.eval()
+
+    def test_batched_terminal_checks_match_helper(self) -> None:
+        states, actions = [], []
+        for _ in range(30):
+            state = self.helper.get_initial_state(GameState())
+            while True:
+                valid_actions = self.helper.calculate_valid_action(
+                    state, state[2][0][0]
+                )
+                if not valid_actions or state[2][0][5] >= 30:
+                    break
+                action = random.choice(valid_actions)
+                state = self.helper.change_perspective(
+                    self.helper.get_next_state(state, action)
+                )
+                states.append(state.copy())
+                actions.append(action)
+        values, terminated = self.helper.get_values_and_terminated_batch(
+            np.stack(states)
+        )
+        self.assertTrue(np.any(terminated))
+        for state, action, value, is_terminal in zip(
+            states, actions, values, terminated
+        ):
+            self.assertEqual(
+                self.helper.get_value_and_terminated(state, action, current=True),
+                (value, is_terminal),
+            )
+
+    def test_games_share_forward_passes(self) -> None:
+        mcts = MCTS(mcts_args(num_searches=8), self.helper, self.model)
+        self_play = VectorizedSelfPlay(mcts, num_games=4, temperature_moves=4)
+        records = list(self_play.play(6))
+        self.assertEqual(len(records), 6)
+        positions = 0
+        for states, policies, values in records:
+            self.assertEqual(len(states), len(policies))
+            self.assertTrue(np.all(states.sum(axis=1) == 1))
+            np.testing.assert_allclose(policies.sum(axis=1), 1, rtol=1e-5)
+            self.assertTrue(set(np.unique(values)) <= {-1, 0, 1})
+            positions += len(states)
+        # searched one by one, a position takes a pass for the root and one
+        # per simulation
+        self.assertLess(self_play.forward_passes * 2, positions * 9)
+
+    def test_policies_only_cover_legal_actions(self) -> None:
+        mcts = MCTS(mcts_args(num_searches=8), self.helper, self.model)
+        self_play = VectorizedSelfPlay(mcts, num_games=2, temperature_moves=0)
+        played = []
+        original_play_move = self_play.play_move
+
+        def play_move(game, probs):
+            played.append((game.state.copy(), probs))
+            original_play_move(game, probs)
+
+        self_play.play_move = play_move  # type: ignore
+        list(self_play.play(2))
+        for state, probs in played:
+            self.assertTrue(np.all(probs[self.helper.get_valid_moves(state) == 0] == 0))
+
+    def test_games_keep_transposition_entries_between_moves(self) -> None:
+        mcts = MCTS(
+            mcts_args(num_searches=8, transposition_table_size=100_000),
+            self.helper,
+            self.model,
+        )
+        new_game = mcts.new_game
+        with patch.object(mcts, "new_game", side_effect=new_game) as cleared:
+            list(VectorizedSelfPlay(mcts, num_games=2, temperature_moves=4).play(3))
+        cleared.assert_called_once()
+        assert mcts.transposition_table is not None
+        self.assertGreater(mcts.transposition_table.hits, 0)
+
+    def test_lockstep_games_of_pool_workers(self) -> None:
+        args = mcts_args(num_searches=4)
+        with create_search_pool(args, self.model, 2) as pool:
+            records = list(play_lockstep_games(pool, 5, 2, temperature_moves=4))
+        self.assertEqual(len(records), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+from src.ai.ai_game_state_transition_helper import AIGameStateTransitionHelper
+from src.ai.compact_state import CompactState
+from src.game_state import GameState
+from tests.helpers import play_random_action, rules_engine_actions
+
+
+class TestZobrist(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(13)
+        self.helper = AIGameStateTransitionHelper()
+
+    def test_game_state_hash_is_incremental_and_matches_ai_state(self) -> None:
+        for _ in range(20):
+            game_state = GameState()
+            for _ in range(150):
+                self.assertEqual(
+                    game_state.state_hash(), game_state.compute_state_hash()
+                )
+                self.assertEqual(
+                    game_state.state_hash(),
+                    self.helper.state_hash(self.helper.get_initial_state(game_state)),
+                )
+                if not rules_engine_actions(game_state):
+                    break
+                play_random_action(game_state)
+
+    def test_ai_state_hash_is_incremental(self) -> None:
+        for _ in range(20):
+            state = self.helper.get_initial_state(GameState())
+            compact_state = CompactState.from_array(state)
+            for _ in range(150):
+                key = self.helper.state_hash(state)
+                self.assertEqual(key, self.helper.compute_state_hash(state))
+                self.assertEqual(key, compact_state.state_hash())
+                actions = self.helper.calculate_valid_action(state, state[2][0][0])
+                if not actions:
+                    break
+                action = random.choice(actions)
+                state = self.helper.change_perspective(
+                    self.helper.get_next_state(state, action)
+                )
+                compact_state.make(action)
+
+    def test_side_to_move_changes_hash(self) -> None:
+        state = self.helper.get_initial_state(GameState())
+        key = self.helper.state_hash(state)
+        self.helper.change_perspective(state)
+        self.assertNotEqual(self.helper.state_hash(state), key)
+        self.helper.change_perspective(state)
+        self.assertEqual(self.helper.state_hash(state), key)
+
+
+if __name__ == "__main__":
+    unittest.main()